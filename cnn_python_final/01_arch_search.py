@@ -0,0 +1,248 @@
+# arch_search.py
+import os
+import csv
+import json
+import time
+import argparse
+import itertools
+import multiprocessing as mp
+import numpy as np
+
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [구조/하이퍼파라미터 탐색 - 정확도 목표를 만족하는 가장 작은 shift-only CNN]
+#
+# 01_train_export_shift_only.py 의 모델은 3ch / 5x5 / 48->10 고정.
+# README 대로 필터 수/커널 크기는 DSP/가산기 수와 정확도를 맞바꾸는 선택이라
+# 여기서는 config 격자 전체를 짧은 schedule로 학습해서 비교한다.
+#
+# ====== 동작 ======
+# 1) --f1/--f2/--k1/--k2/--bias/--wq/--shift 의 곱집합 -> config 목록 (qat_model.layer_shapes 로 크기 검사)
+# 2) spawn worker 프로세스 -j개가 config 하나씩 학습
+#    - qat_model.build_model(config, fused=True) + u8 tf.data + XLA (= 01 --fast 와 같은 경로)
+#    - worker당 TF intra/inter thread 수 제한 (-j x threads <= 코어 수 권장)
+#    - IntExactAccuracy(val) 최고 epoch의 가중치를 int_engine 으로 test 10k 정수 추론
+# 3) 점수: val_int_acc (train 에서 떼어 낸 val 의 최고 정수 정확도)  vs  model_cost (MAC 수, weight 바이트)
+#    -> Pareto front (정확도 최대 / MAC 최소 / 바이트 최소 에서 지배당하지 않는 후보)
+#    -> --target 이상인 후보 중 MAC(동률이면 바이트, 그다음 val 정확도) 최소를 "추천"으로 표시
+#    -> test_int_acc 는 선택에 쓰지 않음 (held-out 으로 표 / JSON / CSV 에만 기록)
+#
+# ====== 출력 (export/arch_search/) ======
+#   f{f1}k{k1}_f{f2}k{k2}_b{0|1}[_p2].npz : 후보별 export (02_export_hex_for_fpga.py 입력 형식 그대로, _p2 = pow2 weight, _sl/_sc = 학습 shift)
+#   results.json / results.csv        : 후보별 config, macs, weight_bytes, val/test int acc, pareto
+#
+# 사용 예:
+#   python 01_arch_search.py                                  # 기본 격자, 5 epoch
+#   python 01_arch_search.py --f1 2,3,4 --f2 2,3,4 --k1 3,5 --k2 3,5 -j 4 --target 0.97
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+VAL_SPLIT = 0.1
+SEED = 0
+
+
+# ----------------------------
+# 1) 후보 목록
+# ----------------------------
+def parse_list(s: str) -> list:
+    """'2,3,4' 또는 '2-4'"""
+    if "-" in s:
+        a, b = s.split("-")
+        return list(range(int(a), int(b) + 1))
+    return [int(v) for v in s.split(",")]
+
+def config_tag(c: dict) -> str:
+    tag = f"f{c['f1']}k{c['k1']}_f{c['f2']}k{c['k2']}_b{int(c['dense_bias'])}"
+    tag += "_p2" if c.get("weight_quant") == "pow2" else ""
+    return tag + {"layer": "_sl", "channel": "_sc"}.get(c.get("shift_mode"), "")
+
+def make_configs(f1s, k1s, f2s, k2s, biases, layer_shapes, wqs=("i8",), shift_modes=("fixed",)) -> list:
+    """격자 곱집합 중 28x28 입력에서 성립하는 config만"""
+    out = []
+    for f1, k1, f2, k2, b, wq, sm in itertools.product(f1s, k1s, f2s, k2s, biases, wqs, shift_modes):
+        c = {"f1": f1, "k1": k1, "f2": f2, "k2": k2, "dense_bias": bool(b), "weight_quant": wq,
+             "shift_mode": sm}
+        try:
+            layer_shapes(c)
+        except ValueError:
+            print(f"[SKIP] {config_tag(c)}: kernel too large")
+            continue
+        out.append(c)
+    return out
+
+
+# ----------------------------
+# 2) worker (spawn 프로세스 안에서 TF import)
+# ----------------------------
+def _init_worker(threads: int):
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def train_candidate(job: dict) -> dict:
+    """config 하나 학습 -> val/test 정수 정확도 + export npz"""
+    import tensorflow as tf
+    import qat_model as qm
+    from int_engine import predict_batch
+
+    c, out_dir = job["config"], job["out_dir"]
+    tf.keras.utils.set_random_seed(SEED)
+
+    x_train_u8, y_train = load_mnist_u8("train")
+    x_test_u8, y_test = load_mnist_u8("test")
+    y_train = y_train.astype(np.int32)
+    n_fit = int(len(x_train_u8) * (1.0 - VAL_SPLIT))
+
+    model = qm.build_model(c, fused=True)
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(job["lr"]),
+        loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True),
+        metrics=["accuracy"],
+        jit_compile=True
+    )
+
+    int_acc = qm.IntExactAccuracy(x_train_u8[n_fit:], y_train[n_fit:], verbose=0)
+    t0 = time.time()
+    model.fit(
+        qm.make_u8_dataset(x_train_u8[:n_fit], y_train[:n_fit], job["batch"], shuffle=True, seed=SEED),
+        epochs=job["epochs"],
+        callbacks=[int_acc],
+        verbose=0
+    )
+    train_sec = time.time() - t0
+
+    pack = int_acc.best_pack
+    pred = predict_batch(x_test_u8, pack["W1_q"], pack["W2_q"], pack["Wd_q"], pack["bd_q15"],
+                         shifts=(pack["s1"], pack["s2"]))
+    test_acc = float(np.mean(pred == y_test))
+
+    npz_path = os.path.join(out_dir, config_tag(c) + ".npz")
+    np.savez(npz_path, **pack)
+
+    r = dict(c)
+    r.update(qm.model_cost(c))
+    r.update({
+        "tag": config_tag(c),
+        "val_int_acc": float(int_acc.best),
+        "test_int_acc": test_acc,
+        "best_epoch": int(int_acc.best_epoch),
+        "train_sec": round(train_sec, 1),
+        "npz": npz_path,
+    })
+    return r
+
+
+# ----------------------------
+# 3) Pareto front / 추천
+# ----------------------------
+def dominates(a: dict, b: dict) -> bool:
+    """a가 b를 지배: 모든 축에서 같거나 좋고, 하나 이상에서 엄격히 좋음"""
+    ge = (a["val_int_acc"] >= b["val_int_acc"] and a["macs"] <= b["macs"]
+          and a["weight_bytes"] <= b["weight_bytes"])
+    gt = (a["val_int_acc"] > b["val_int_acc"] or a["macs"] < b["macs"]
+          or a["weight_bytes"] < b["weight_bytes"])
+    return ge and gt
+
+def mark_pareto(rows: list):
+    for r in rows:
+        r["pareto"] = not any(dominates(o, r) for o in rows if o is not r)
+
+def pick_cheapest(rows: list, target: float):
+    """val_int_acc >= target 중 MAC 최소 (동률이면 weight_bytes, 그다음 val 정확도 높은 쪽)"""
+    ok = [r for r in rows if r["val_int_acc"] >= target]
+    if not ok:
+        return None
+    return min(ok, key=lambda r: (r["macs"], r["weight_bytes"], -r["val_int_acc"]))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="parallel QAT architecture search with integer-accuracy Pareto front")
+    ap.add_argument("--f1", default="2,3,4", help="conv1 필터 수 목록")
+    ap.add_argument("--f2", default="2,3,4", help="conv2 필터 수 목록")
+    ap.add_argument("--k1", default="3,5", help="conv1 커널 크기 목록")
+    ap.add_argument("--k2", default="3,5", help="conv2 커널 크기 목록")
+    ap.add_argument("--bias", default="1", help="dense bias on/off 목록 (예: 0,1)")
+    ap.add_argument("--wq", default="i8", help="weight 양자화 목록 (i8,pow2)")
+    ap.add_argument("--shift", default="fixed", help="requant shift 목록 (fixed,layer,channel)")
+    ap.add_argument("--epochs", type=int, default=5, help="후보당 epoch (짧은 schedule)")
+    ap.add_argument("--batch", type=int, default=128)
+    ap.add_argument("--lr", type=float, default=2e-3)
+    ap.add_argument("-j", "--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    ap.add_argument("--threads", type=int, default=0, help="worker당 TF thread 수 (0=코어 수/-j)")
+    ap.add_argument("--target", type=float, default=0.97, help="추천 기준 val 정수 정확도 (test 는 선택에 안 씀)")
+    ap.add_argument("--out-dir", default=os.path.join(BASE, "export", "arch_search"))
+    args = ap.parse_args()
+
+    from qat_model import layer_shapes
+    configs = make_configs(parse_list(args.f1), parse_list(args.k1), parse_list(args.f2),
+                           parse_list(args.k2), parse_list(args.bias), layer_shapes,
+                           args.wq.split(","), args.shift.split(","))
+    if not configs:
+        print("[ERROR] 후보 없음")
+        return
+
+    # MNIST 캐시를 부모에서 먼저 만들어 둠 (worker들이 동시에 만들지 않도록)
+    load_mnist_u8("all")
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.jobs)
+    jobs = [{"config": c, "out_dir": args.out_dir, "epochs": args.epochs,
+             "batch": args.batch, "lr": args.lr} for c in configs]
+    print(f"[INFO] {len(jobs)} candidates, {args.epochs} epochs each, "
+          f"{args.jobs} workers x {threads} threads")
+
+    t0 = time.time()
+    rows = []
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(args.jobs, initializer=_init_worker, initargs=(threads,), maxtasksperchild=1) as pool:
+        for r in pool.imap_unordered(train_candidate, jobs):
+            rows.append(r)
+            print(f"  [{len(rows):>3}/{len(jobs)}] {r['tag']:<22} val_int_acc={r['val_int_acc']:.4f} "
+                  f"macs={r['macs']:>7} bytes={r['weight_bytes']:>5} ({r['train_sec']:.0f} sec)")
+    print(f"[INFO] total {time.time() - t0:.0f} sec")
+
+    mark_pareto(rows)
+    rows.sort(key=lambda r: (r["macs"], r["weight_bytes"]))
+    best = pick_cheapest(rows, args.target)
+
+    print("\n======================== ARCH SEARCH (by MACs) ========================")
+    print(f" {'config':<22} {'macs':>8} {'bytes':>6} {'val_int':>8} {'test_int':>9} {'ep':>3}  pareto")
+    for r in rows:
+        mark = "*" if r["pareto"] else ""
+        if r is best:
+            mark += f"  <- 추천 (>= {args.target})"
+        if (r["f1"], r["k1"], r["f2"], r["k2"], r["dense_bias"], r["weight_quant"],
+                r["shift_mode"]) == (3, 5, 3, 5, True, "i8", "fixed"):
+            mark += "  <- 현재 RTL"
+        print(f" {r['tag']:<22} {r['macs']:>8} {r['weight_bytes']:>6} {r['val_int_acc']:>8.4f} "
+              f"{r['test_int_acc']:>9.4f} {r['best_epoch']:>3}  {mark}")
+    print("=======================================================================")
+    if best is None:
+        print(f"[WARN] val_int_acc >= {args.target} 후보 없음 (--epochs 늘리거나 격자 확장)")
+    else:
+        print(f"[PICK] {best['tag']}: val_acc={best['val_int_acc']:.4f} (held-out test {best['test_int_acc']:.4f}), "
+              f"macs={best['macs']}, bytes={best['weight_bytes']} -> {best['npz']}")
+
+    json_path = os.path.join(args.out_dir, "results.json")
+    with open(json_path, "w") as f:
+        json.dump({"target": args.target, "epochs": args.epochs,
+                   "pick": best["tag"] if best else None, "results": rows}, f, indent=2)
+
+    csv_path = os.path.join(args.out_dir, "results.csv")
+    keys = ["tag", "f1", "k1", "f2", "k2", "dense_bias", "weight_quant", "shift_mode", "macs", "weight_bytes",
+            "val_int_acc", "test_int_acc", "best_epoch", "train_sec", "pareto", "npz"]
+    with open(csv_path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: r[k] for k in keys})
+    print(f"Saved: {json_path}\nSaved: {csv_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 # train_export_shift_only.py
 import os
+import argparse
 import numpy as np
 import tensorflow as tf
 
+from qat_model import (
+    DEFAULT_CONFIG, build_model, make_u8_dataset, quantize_export, EpochTimer, IntExactAccuracy,
+)
+
 # =============================================================================
 # [목표: FPGA와 1:1로 맞는 "Shift-only" CNN 학습 + Export]
 #
@@ -38,9 +43,41 @@ import tensorflow as tf
 # ====== 추가(최소 변경) ======
 # - epoch <= 200에서 validation 기준으로 "최선 epoch" 자동 선택
 #   * EarlyStopping(restore_best_weights=True)
+#     - 기준은 float val_accuracy가 아니라 정수-exact val_int_accuracy (5-2)
 #   * ReduceLROnPlateau(선택, 수렴 안정화)
+#
+# ====== --fast (CPU 학습 속도 개선) ======
+# - 입력은 u8 그대로 tf.data에 올려 cache/prefetch, float(/256) 변환은 배치 단위로 그때그때
+#   (float32 60k장 복사본을 메모리에 두지 않음)
+# - fake-quant(round -> clip -> STE)를 tf.custom_gradient 하나로 합침 (gradient는 기존과 동일)
+# - model.compile(jit_compile=True) -> train step 전체를 XLA로 컴파일
+# - validation은 기존 validation_split=0.1 과 같은 "train 뒤쪽 10%"
+#   python 01_train_export_shift_only.py --fast
+#
+# ====== --pow2 (곱셈기 없는 datapath 평가) ======
+# - weight를 0 / ±2^e (Q1.7 위, e=0..6) 로만 제한하는 fake-quant (qat_model.fake_quant_pow2_q17)
+# - MAC = ±(u8 << e) -> DSP 없이 시프트+덧셈. activation/requant(>>7)/bias는 그대로
+# - export npz의 w_quant="pow2" -> 02_export_hex_for_fpga.py 가 4bit code(sign+exponent)도 저장
+#   python 01_train_export_shift_only.py --fast --pow2
+#
+# ====== --learn-shift layer|channel (학습되는 requant shift) ======
+# - 전역 >>7 대신 conv 출력 activation scale(레이어별)과 weight scale(레이어별/출력 채널별)을
+#   2의 거듭제곱으로 학습 (qat_model 1-2) -> requant shift = 입력 frac + weight frac - 출력 frac
+# - export npz에 s1/s2(채널별 shift), act_frac 저장, dense bias는 2^(f_c2+7) 도메인
+#   02_export_hex_for_fpga.py -> requant_shift.vh,  int_engine / 검증기들은 npz의 s1/s2 사용
+#   python 01_train_export_shift_only.py --fast --learn-shift channel
 # =============================================================================
 
+ap = argparse.ArgumentParser(description="shift-only CNN QAT + FPGA export")
+ap.add_argument("--fast", action="store_true", help="u8 tf.data + fused fake-quant + XLA")
+ap.add_argument("--epochs", type=int, default=200)
+ap.add_argument("--batch", type=int, default=128)
+ap.add_argument("--pow2", action="store_true", help="power-of-two weight (shift-only MAC)")
+ap.add_argument("--learn-shift", choices=["fixed", "layer", "channel"], default="fixed",
+                help="conv requant shift 학습 (fixed = 전역 >>7)")
+args, _ = ap.parse_known_args()   # 노트북(ipykernel 인자)에서도 동작하도록
+FAST = args.fast
+
 # ----------------------------
 # 0) 재현성(대충 고정)
 # ----------------------------
@@ -56,163 +93,26 @@ np.random.seed(SEED)
 mnist = tf.keras.datasets.mnist
 (x_train_u8, y_train), (x_test_u8, y_test) = mnist.load_data()
 
-x_train = (x_train_u8.astype(np.float32) / 256.0)[..., None]  # (N,28,28,1)
-x_test  = (x_test_u8.astype(np.float32)  / 256.0)[..., None]
+if not FAST:
+    x_train = (x_train_u8.astype(np.float32) / 256.0)[..., None]  # (N,28,28,1)
+    x_test  = (x_test_u8.astype(np.float32)  / 256.0)[..., None]
 
 y_train = y_train.astype(np.int32)
 y_test  = y_test.astype(np.int32)
 
 # ----------------------------
-# 2) STE(학습용 라운딩)
-#    - forward: round
-#    - backward: gradient는 identity로 흘림
+# 2) fake-quant / QuantConv2D / QuantDense -> qat_model.py
+#    - STE(round) + clip 으로 u8(Q0.8) / i8(Q1.7) 격자를 흉내냄
+#    - --fast 이면 fused(custom_gradient) 버전 사용
 # ----------------------------
-def ste_round(x: tf.Tensor) -> tf.Tensor:
-    return x + tf.stop_gradient(tf.round(x) - x)
-
-def fake_quant_u8_q08(x: tf.Tensor) -> tf.Tensor:
-    """
-    activation을 u8(Q0.8) 격자에 '강제'하는 함수
-      - real -> u8: u8 = round(real*256)
-      - clamp 0..255
-      - 다시 real로: u8/256
-    """
-    # ReLU 가정(음수는 0으로)
-    x = tf.maximum(x, 0.0)
-
-    q = ste_round(x * 256.0)           # u8 grid로 스냅
-    q = tf.clip_by_value(q, 0.0, 255.0)
-    return q / 256.0                   # 다시 real로(격자는 Q0.8)
-
-def fake_quant_i8_q17(w: tf.Tensor) -> tf.Tensor:
-    """
-    weight를 int8(Q1.7) 격자에 '강제'
-      - real -> i8: i8 = round(real*128)
-      - clamp -128..127
-      - 다시 real로: i8/128
-    """
-    q = ste_round(w * 128.0)
-    q = tf.clip_by_value(q, -128.0, 127.0)
-    return q / 128.0
-
-# ----------------------------
-# 3) QuantConv2D / QuantDense
-#    - 내부 파라미터는 float로 학습
-#    - forward에서만 fake-quant로 "정수 세계관"을 흉내냄
-# ----------------------------
-class QuantConv2D(tf.keras.layers.Layer):
-    def __init__(self, filters, kernel_size, use_bias=False, name=None):
-        super().__init__(name=name)
-        self.filters = int(filters)
-        self.kernel_size = tuple(kernel_size)
-        self.use_bias = bool(use_bias)
-
-    def build(self, input_shape):
-        kh, kw = self.kernel_size
-        cin = int(input_shape[-1])
-
-        self.w = self.add_weight(
-            name="kernel",
-            shape=(kh, kw, cin, self.filters),
-            initializer="glorot_uniform",
-            trainable=True
-        )
-        if self.use_bias:
-            self.b = self.add_weight(
-                name="bias",
-                shape=(self.filters,),
-                initializer="zeros",
-                trainable=True
-            )
-        else:
-            self.b = None
-
-    def call(self, x):
-        # 입력 activation을 u8(Q0.8) 격자에 맞춤
-        xq = fake_quant_u8_q08(x)
-
-        # weight를 i8(Q1.7) 격자에 맞춤
-        wq = fake_quant_i8_q17(self.w)
-
-        # conv 연산(실제는 float지만, 값은 Q격자에 맞춰져 있음)
-        y = tf.nn.conv2d(xq, wq, strides=1, padding="VALID")
-
-        # conv bias는 FPGA에서 안 쓰는 게 목표(use_bias=False)라서 보통 없음
-        if self.b is not None:
-            y = y + self.b
-
-        return y
-
-class QuantDense(tf.keras.layers.Layer):
-    def __init__(self, units, use_bias=True, name=None):
-        super().__init__(name=name)
-        self.units = int(units)
-        self.use_bias = bool(use_bias)
-
-    def build(self, input_shape):
-        cin = int(input_shape[-1])
-        self.w = self.add_weight(
-            name="kernel",
-            shape=(cin, self.units),
-            initializer="glorot_uniform",
-            trainable=True
-        )
-        if self.use_bias:
-            self.b = self.add_weight(
-                name="bias",
-                shape=(self.units,),
-                initializer="zeros",
-                trainable=True
-            )
-        else:
-            self.b = None
-
-    def call(self, x):
-        # 입력 activation u8(Q0.8)
-        xq = fake_quant_u8_q08(x)
-        # weight i8(Q1.7)
-        wq = fake_quant_i8_q17(self.w)
-
-        y = tf.matmul(xq, wq)
-        if self.b is not None:
-            # (선택) bias도 Q15로 fake-quant하면 더 1:1에 가까워짐
-            # bq = ste_round(self.b * 32768.0) / 32768.0
-            # y = y + bq
-            y = y + self.b
-        return y
 
 # ----------------------------
-# 4) 모델 구성 (Keras 기본 레이어로 형태는 동일)
+# 3) 모델 구성 (qat_model.build_model, 기본 config = 현재 RTL 구조)
 #    - conv bias 없음(=FPGA 동일)
 #    - loss에서 from_logits=True 사용 => 마지막 Dense는 softmax 없이 logits 출력
 # ----------------------------
-inp = tf.keras.Input(shape=(28, 28, 1), name="in")
-
-# ---- conv1 ----
-x = QuantConv2D(3, (5, 5), use_bias=False, name="qconv1")(inp)
-x = tf.keras.layers.ReLU()(x)
-# conv1 결과는 FPGA에서 u8로 저장된다고 가정 => Q0.8로 스냅
-x = fake_quant_u8_q08(x)
-
-# ---- pool1 ----
-x = tf.keras.layers.MaxPooling2D((2, 2))(x)
-# pool 출력도 FPGA에서 u8로 저장(단순화/안정)
-x = fake_quant_u8_q08(x)
-
-# ---- conv2 ----
-x = QuantConv2D(3, (5, 5), use_bias=False, name="qconv2")(x)
-x = tf.keras.layers.ReLU()(x)
-x = fake_quant_u8_q08(x)
-
-# ---- pool2 ----
-x = tf.keras.layers.MaxPooling2D((2, 2))(x)
-x = fake_quant_u8_q08(x)
-
-# ---- flatten + dense ----
-x = tf.keras.layers.Flatten()(x)            # 4*4*3 = 48
-logits = QuantDense(10, use_bias=True, name="qdense")(x)
-
-model = tf.keras.Model(inp, logits, name="shift_only_cnn")
+CONFIG = dict(DEFAULT_CONFIG, weight_quant="pow2" if args.pow2 else "i8", shift_mode=args.learn_shift)
+model = build_model(CONFIG, fused=FAST)
 model.summary()
 
 # ----------------------------
@@ -221,15 +121,27 @@ model.summary()
 model.compile(
     optimizer=tf.keras.optimizers.Adam(1e-3),
     loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True),
-    metrics=["accuracy"]
+    metrics=["accuracy"],
+    jit_compile=FAST
 )
 
+# ----------------------------
+# 5-0) (--fast) u8 tf.data 파이프라인 (qat_model.make_u8_dataset)
+#   - cache: u8 원본(47MB)만 캐시, float 변환은 batch 뒤 map에서 (배치 단위 벡터 연산)
+#   - validation: validation_split=0.1 과 동일하게 train 뒤쪽 10%
+# ----------------------------
+VAL_SPLIT = 0.1
+N_FIT = int(len(x_train_u8) * (1.0 - VAL_SPLIT))
+
+epoch_timer = EpochTimer()
+
 # ----------------------------
 # 5-1) (추가) epoch <= 200에서 best epoch 자동 선택
 #   - QAT는 val이 들쭉날쭉할 수 있어서 patience를 너무 짧게 두면 손해
+#   - monitor = val_int_accuracy (5-2 IntExactAccuracy 가 logs에 넣어줌)
 # ----------------------------
 early_stop = tf.keras.callbacks.EarlyStopping(
-    monitor="val_accuracy",
+    monitor="val_int_accuracy",
     mode="max",
     patience=10,
     restore_best_weights=True,
@@ -244,59 +156,70 @@ reduce_lr = tf.keras.callbacks.ReduceLROnPlateau(
     verbose=1
 )
 
-EPOCHS = 200
-history = model.fit(
-    x_train, y_train,
-    epochs=EPOCHS,
-    batch_size=128,
-    validation_split=0.1,
-    callbacks=[early_stop, reduce_lr],
-    verbose=1
-)
+# ----------------------------
+# 5-2) (추가) epoch마다 정수-exact 정확도
+#   - float val_accuracy 최고 epoch != 정수(>>7) 정확도 최고 epoch 인 경우가 있어서
+#     매 epoch 가중치를 float_to_i8_q17 / bd_q15 로 양자화 -> int_engine 으로 validation split 추론
+#   - logs["val_int_accuracy"] 에 기록 -> EarlyStopping이 이 값을 봄 (callback 리스트 맨 앞에 둬야 함)
+#   - 최고 기록이 갱신될 때마다 export npz 저장 (학습이 중간에 끊겨도 best가 남음)
+#   (구현: qat_model.IntExactAccuracy)
+# ----------------------------
+export_dir = "export"
+os.makedirs(export_dir, exist_ok=True)
+EXPORT_PATH = os.path.join(export_dir, "mnist_shift_only_fpga_export.npz")
 
-# (추가) best epoch 로그(발표/리포트용)
-best_epoch = int(np.argmax(history.history["val_accuracy"]) + 1)
-best_val_acc = float(np.max(history.history["val_accuracy"]))
-print(f"\n[Best Epoch by val_accuracy] epoch={best_epoch}, val_acc={best_val_acc:.4f}")
+int_acc = IntExactAccuracy(x_train_u8[N_FIT:], y_train[N_FIT:], EXPORT_PATH)
+
+EPOCHS = args.epochs
+if FAST:
+    train_ds = make_u8_dataset(x_train_u8[:N_FIT], y_train[:N_FIT], args.batch, shuffle=True, seed=SEED)
+    val_ds = make_u8_dataset(x_train_u8[N_FIT:], y_train[N_FIT:], args.batch, shuffle=False)
+    history = model.fit(
+        train_ds,
+        epochs=EPOCHS,
+        validation_data=val_ds,
+        callbacks=[int_acc, early_stop, reduce_lr, epoch_timer],
+        verbose=1
+    )
+else:
+    history = model.fit(
+        x_train, y_train,
+        epochs=EPOCHS,
+        batch_size=args.batch,
+        validation_split=VAL_SPLIT,
+        callbacks=[int_acc, early_stop, reduce_lr, epoch_timer],
+        verbose=1
+    )
+
+# 첫 epoch은 tracing/XLA 컴파일 포함이라 제외
+steady = epoch_timer.times[1:] or epoch_timer.times
+print(f"\n[Speed] {'fast' if FAST else 'default'}: {np.mean(steady):.2f} sec/epoch "
+      f"({1.0 / np.mean(steady):.3f} epochs/sec, first epoch {epoch_timer.times[0]:.1f} sec)")
 
-loss, acc = model.evaluate(x_test, y_test, verbose=0)
+# (추가) best epoch 로그(발표/리포트용)
+best_epoch = int(np.argmax(history.history["val_int_accuracy"]) + 1)
+best_val_acc = float(np.max(history.history["val_int_accuracy"]))
+best_float = float(history.history["val_accuracy"][best_epoch - 1])
+print(f"\n[Best Epoch by val_int_accuracy] epoch={best_epoch}, val_int_acc={best_val_acc:.4f} "
+      f"(float val_acc={best_float:.4f})")
+
+if FAST:
+    loss, acc = model.evaluate(make_u8_dataset(x_test_u8, y_test, 1024, shuffle=False), verbose=0)
+else:
+    loss, acc = model.evaluate(x_test, y_test, verbose=0)
 print(f"\n[Q-world Train/Eval] loss={loss:.4f}, acc={acc:.4f}")
 
 # ----------------------------
 # 6) Export: FPGA가 바로 먹을 형태
 #    - weights: int8(Q1.7)
 #    - dense bias: int32(Q15)
+#    - val_int_accuracy 최고 epoch 의 pack (5-2 IntExactAccuracy.best_pack) 을 저장
+#      (EarlyStopping 의 restore_best_weights 는 조기 종료가 실제로 일어날 때만 복원하므로
+#       마지막 model 가중치는 최고 epoch 가 아닐 수 있음)
 # ----------------------------
-def float_to_i8_q17(w_float: np.ndarray) -> np.ndarray:
-    q = np.round(w_float * 128.0)
-    q = np.clip(q, -128, 127).astype(np.int8)
-    return q
-
-export_dir = "export"
-os.makedirs(export_dir, exist_ok=True)
-
-W1_f = model.get_layer("qconv1").w.numpy()         # (5,5,1,3)
-W2_f = model.get_layer("qconv2").w.numpy()         # (5,5,3,3)
-Wd_f = model.get_layer("qdense").w.numpy()         # (48,10)
-bd_f = model.get_layer("qdense").b.numpy()         # (10,) float
+pack = int_acc.best_pack if int_acc.best_pack is not None else quantize_export(model)
+np.savez(EXPORT_PATH, **pack)
 
-W1_q = float_to_i8_q17(W1_f)
-W2_q = float_to_i8_q17(W2_f)
-Wd_q = float_to_i8_q17(Wd_f)
-
-# Dense bias를 acc 도메인(Q15=1/32768)으로 저장
-bd_q15 = np.round(bd_f * 32768.0).astype(np.int32)
-
-EXPORT_PATH = os.path.join(export_dir, "mnist_shift_only_fpga_export.npz")
-np.savez(
-    EXPORT_PATH,
-    W1_q=W1_q,
-    W2_q=W2_q,
-    Wd_q=Wd_q,
-    bd_q15=bd_q15
-)
-
-print(f"\nSaved FPGA export: {EXPORT_PATH}")
+print(f"\nSaved FPGA export: {EXPORT_PATH} (epoch {int_acc.best_epoch}, val_int_acc={int_acc.best:.4f})")
 print("  - weights: int8(Q1.7)")
 print("  - dense bias: int32(Q15)")
-
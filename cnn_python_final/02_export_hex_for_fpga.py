@@ -2,6 +2,9 @@
 import os
 import numpy as np
 
+from hex_io import save_hex
+from int_engine import pow2_encode, load_shifts
+
 # =============================================================================
 # [FPGA 검증용 가중치/바이어스 HEX 덤프 - 최종 수정본]
 #
@@ -9,6 +12,10 @@ import numpy as np
 # [수정 내역]
 # 1. Conv2: (5,5,3) -> (3,5,5)로 Transpose 후 저장 (RTL이 채널별 블록 읽기 때문)
 # 2. Dense: (48,10) 그대로 저장 (RTL 병렬 구조)
+# 3. (pow2 모드 npz) 같은 순서로 4bit code {sign, exp[2:0]} 파일 추가 (*_p2.txt)
+#    weight = sign ? -(1<<exp) : (1<<exp),  exp=7 -> 0   => RTL MAC = ±(u8 << exp)
+# 4. requant shift (npz s1/s2, 예전 npz는 전부 7) -> requant_shift.vh
+#    conv{1,2}_calc 인스턴스별 `(sum + (1 <<< (S-1))) >>> S` 의 S 로 사용 (채널 번호 = weight 파일 번호)
 # =============================================================================
 
 # 경로 설정
@@ -27,26 +34,23 @@ W1 = pack["W1_q"].astype(np.int8)          # (5, 5, 1, 3)
 W2 = pack["W2_q"].astype(np.int8)          # (5, 5, 3, 3)
 Wd = pack["Wd_q"].astype(np.int8)          # (48, 10)
 bd = pack["bd_q15"].astype(np.int32)       # (10,)
+S1, S2 = load_shifts(NPZ_PATH)             # (3,) (3,) 출력 채널별 requant shift
+POW2 = "w_quant" in pack and str(pack["w_quant"]) == "pow2"
 
 print("=== 모델 데이터 로드 완료 ===")
 print(f"W1 shape: {W1.shape}")
 print(f"W2 shape: {W2.shape}")
 print(f"Wd shape: {Wd.shape}")
 print(f"bd shape: {bd.shape}")
+print(f"weight  : {'pow2 (4bit code 추가 저장)' if POW2 else 'int8 Q1.7'}")
+print(f"shift   : conv1 {S1.tolist()}, conv2 {S2.tolist()}")
 print("==============================")
 
-def to_hex_i8(val):
-    return f"{val & 0xFF:02X}"
-
-def to_hex_i32(val):
-    return f"{val & 0xFFFFFFFF:08X}"
-
-def save_txt(filename, data_list):
+def save_txt(filename, data, width_bits=8):
+    """data를 flatten 순서대로 저장 (8bit: i8 -> 2자리, 32bit: i32 -> 8자리 HEX)"""
     path = os.path.join(OUT_DIR, filename)
-    with open(path, "w") as f:
-        for val in data_list:
-            f.write(f"{val}\n")
-    print(f"Saved: {filename} (Lines: {len(data_list)})")
+    lines = save_hex(path, data, width_bits)
+    print(f"Saved: {filename} (Lines: {lines})")
 
 # ---------------------------------------------------------
 # 1. Conv1 Weights Export
@@ -55,9 +59,9 @@ def save_txt(filename, data_list):
 print("\n--- Exporting Conv1 ---")
 for out_c in range(3):
     kernel = W1[:, :, :, out_c] # (5, 5, 1)
-    flat_data = kernel.flatten()
-    hex_data = [to_hex_i8(x) for x in flat_data]
-    save_txt(f"conv1_weight_{out_c+1}.txt", hex_data)
+    save_txt(f"conv1_weight_{out_c+1}.txt", kernel)
+    if POW2:
+        save_txt(f"conv1_weight_{out_c+1}_p2.txt", pow2_encode(kernel), width_bits=4)
 
 # ---------------------------------------------------------
 # 2. Conv2 Weights Export [★핵심 수정★]
@@ -72,26 +76,42 @@ for out_c in range(3):
     # (H, W, Cin) -> (Cin, H, W) 순서로 변경
     kernel_ch_first = kernel.transpose(2, 0, 1) # Shape: (3, 5, 5)
     
-    flat_data = kernel_ch_first.flatten()
-    hex_data = [to_hex_i8(x) for x in flat_data]
-    save_txt(f"conv2_weight_{out_c+1}.txt", hex_data)
+    save_txt(f"conv2_weight_{out_c+1}.txt", kernel_ch_first)
+    if POW2:
+        save_txt(f"conv2_weight_{out_c+1}_p2.txt", pow2_encode(kernel_ch_first), width_bits=4)
 
 # ---------------------------------------------------------
 # 3. Dense Weights Export
 #    RTL 병렬 구조에 맞춰 (48, 10) 순서 유지
 # ---------------------------------------------------------
 print("\n--- Exporting Dense Weights ---")
-flat_data = Wd.flatten() 
-hex_data = [to_hex_i8(x) for x in flat_data]
-save_txt("Wd.txt", hex_data)
+save_txt("Wd.txt", Wd)
+if POW2:
+    save_txt("Wd_p2.txt", pow2_encode(Wd), width_bits=4)
 
 # ---------------------------------------------------------
 # 4. Dense Bias Export
 # ---------------------------------------------------------
 print("\n--- Exporting Dense Bias ---")
-flat_data = bd.flatten()
-hex_data = [to_hex_i32(x) for x in flat_data]
-save_txt("bd.txt", hex_data)
+save_txt("bd.txt", bd, width_bits=32)
+
+# ---------------------------------------------------------
+# 5. Requant Shift Parameters
+#    RTL은 >>> (오른쪽 산술 시프트)만 있으므로 1..31 범위만 허용
+# ---------------------------------------------------------
+print("\n--- Exporting Requant Shifts ---")
+for name, s in (("conv1", S1), ("conv2", S2)):
+    if np.any(s < 1) or np.any(s > 31):
+        raise ValueError(f"{name} shift out of range 1..31: {s.tolist()}")
+
+vh_path = os.path.join(OUT_DIR, "requant_shift.vh")
+with open(vh_path, "w", encoding="cp949") as f:   # 저장소 .v 파일과 같은 인코딩
+    f.write("// requant shift (02_export_hex_for_fpga.py 자동 생성)\n")
+    f.write("// out_u8 = clamp( (acc + (1 << (S-1))) >>> S ),  S = 7 이면 기존 (acc + 64) >>> 7\n")
+    for tag, s in (("C1", S1), ("C2", S2)):
+        for c, v in enumerate(s):
+            f.write(f"localparam integer {tag}_SHIFT_{c+1} = {int(v)};\n")
+print(f"Saved: requant_shift.vh (conv1 {S1.tolist()}, conv2 {S2.tolist()})")
 
 print("\n=== 모든 파일 생성 완료 ===")
 print(f"저장 위치: {OUT_DIR}")
\ No newline at end of file
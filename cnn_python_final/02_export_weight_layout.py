@@ -0,0 +1,113 @@
+# export_weight_layout.py
+import os
+import json
+import argparse
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, load_weights, pow2_encode
+from weight_layout import LAYOUTS, MEM_FORMATS, layout_words, order_flat, word_bits, words_hex, unpack_hex, write_mem
+
+# =============================================================================
+# [병렬도 맞춤 weight ROM export - wide word / .coe / .mem]
+#
+# 02_export_hex_for_fpga.py 는 1줄 = 1 byte ($readmemh) 고정.
+# 여기서는 weight_layout.LAYOUTS 의 descriptor(순서 / unroll / word 폭)대로
+# 여러 원소를 word 1개로 묶어서 저장 -> ROM 폭 = 병렬 MAC 개수, 깊이는 줄어듦
+#
+# ====== 출력 (export/hex_layout/<layout>/) ======
+#   conv1_weight_{1..3}.{txt,coe,mem}  : 출력 채널별 (conv1_calc WEIGHT_FILE 과 같은 이름)
+#   conv2_weight_{1..3}.{txt,coe,mem}
+#   Wd.{txt,coe,mem}, bd.{txt,coe,mem}
+#   *_p2.*                              : (pow2 npz) 4bit code 같은 순서
+#                                         마지막 word 빈 칸은 0 weight code (POW2_ZERO = 7) 로 채움
+#                                         (code 0 은 weight +1 이라 0 으로 채우면 가짜 +1 weight 가 생김)
+#   layout.json                         : 파일별 descriptor, depth(word 수), width(bit)
+#
+#   --layout rtl --formats txt 는 02_export_hex_for_fpga.py 출력과 같은 바이트
+#
+# 사용 예:
+#   python 02_export_weight_layout.py --layout wide --formats txt,coe,mem
+#   python 02_export_weight_layout.py --layout interleaved --set dense.unroll=10 --set dense.word_bits=96
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+POW2_ZERO = int(pow2_encode(np.zeros(1, dtype=np.int8))[0])   # weight 0 의 4bit code
+
+
+def parse_overrides(items: list, layout: dict) -> dict:
+    """'conv2.unroll=3' / 'dense.order=output_major' -> layout 복사본에 반영"""
+    out = {k: dict(v) for k, v in layout.items()}
+    for it in items:
+        key, _, val = it.partition("=")
+        layer, _, field = key.partition(".")
+        if layer not in out or field not in ("order", "unroll", "elem_bits", "word_bits") or not val:
+            raise ValueError(f"bad --set '{it}' (예: conv2.unroll=3, dense.order=output_major)")
+        out[layer][field] = val if field == "order" else int(val)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="pack weight ROMs into wide words ($readmemh / .coe / .mem)")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--layout", choices=sorted(LAYOUTS), default="wide")
+    ap.add_argument("--set", action="append", default=[], metavar="LAYER.FIELD=V",
+                    help="descriptor 덮어쓰기 (order/unroll/elem_bits/word_bits)")
+    ap.add_argument("--formats", default="txt,coe,mem", help=f"쉼표 구분: {','.join(MEM_FORMATS)}")
+    ap.add_argument("--out-dir", default=None, help="기본 export/hex_layout/<layout>")
+    args = ap.parse_args()
+
+    formats = [f for f in args.formats.split(",") if f]
+    for f in formats:
+        if f not in MEM_FORMATS:
+            raise ValueError(f"unknown format '{f}' (지원: {MEM_FORMATS})")
+    layout = parse_overrides(args.set, LAYOUTS[args.layout])
+    out_dir = args.out_dir or os.path.join(BASE, "export", "hex_layout", args.layout)
+    os.makedirs(out_dir, exist_ok=True)
+
+    W1, W2, Wd, bd = load_weights(args.npz)
+    pack = np.load(args.npz)
+    pow2 = "w_quant" in pack and str(pack["w_quant"]) == "pow2"
+
+    # (파일 이름, layer, 배열) - conv는 출력 채널마다 파일 1개
+    items = [(f"conv1_weight_{c+1}", "conv1", W1[..., c]) for c in range(W1.shape[-1])]
+    items += [(f"conv2_weight_{c+1}", "conv2", W2[..., c]) for c in range(W2.shape[-1])]
+    items += [("Wd", "dense", Wd), ("bd", "bias", bd)]
+    if pow2:
+        items += [(name + "_p2", layer, pow2_encode(w)) for name, layer, w in items if layer != "bias"]
+
+    print(f"=== layout: {args.layout}  ({'pow2' if pow2 else 'int8'}, formats {formats}) ===")
+    print(f" {'file':<20} {'order':<14} {'unroll':>6} {'width':>6} {'depth':>6} {'bits':>7}")
+    report = {}
+    for name, layer, w in items:
+        desc = dict(layout[layer])
+        if name.endswith("_p2"):
+            desc["elem_bits"] = 4
+            desc["pad"] = POW2_ZERO
+            desc.pop("word_bits", None)
+        words = layout_words(w, layer, desc)
+        info = write_mem(os.path.join(out_dir, name), words, desc, formats)
+
+        # round-trip: 저장한 word를 다시 풀어서 원래 순서와 비교
+        flat = order_flat(w, layer, desc["order"]).astype(np.int64)
+        back = unpack_hex(words_hex(words, desc["elem_bits"], word_bits(desc)),
+                          desc["unroll"], desc["elem_bits"], signed=not name.endswith("_p2"))
+        if not np.array_equal(back[:len(flat)], flat):
+            raise RuntimeError(f"{name}: pack/unpack mismatch")
+        if np.any(words.reshape(-1)[len(flat):] != desc.get("pad", 0)):
+            raise RuntimeError(f"{name}: padding != {desc.get('pad', 0)}")
+
+        report[name] = dict(desc, layer=layer, **info)
+        print(f" {name:<20} {desc['order']:<14} {desc['unroll']:>6} {info['width']:>6} {info['depth']:>6} "
+              f"{info['width'] * info['depth']:>7}")
+
+    with open(os.path.join(out_dir, "layout.json"), "w") as f:
+        json.dump({"layout": args.layout, "npz": args.npz, "formats": formats, "files": report}, f, indent=2)
+    print("[OK] pack/unpack round-trip")
+    print(f"Saved: {out_dir} (layout.json)")
+
+if __name__ == "__main__":
+    main()
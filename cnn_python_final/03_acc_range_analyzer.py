@@ -0,0 +1,233 @@
+# acc_range_analyzer.py
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, DEFAULT_BATCH, load_weights, load_shifts, forward_batch
+from int_stats import SatStats
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [누산기 비트폭 / 범위 분석기]
+#
+# RTL(conv1_calc / conv2_calc / fc48x10_stream / argmax10_stream)과 main.c 는
+# 누산기를 전부 signed 32bit로 두지만, 실제 곱 25개(conv1) / 75개(conv2) / 48개(fc)의
+# 합은 훨씬 좁은 범위. 여기서 레이어/채널별로 두 가지 범위를 구해서 최소 비트폭을 제안.
+#
+# ====== 1) worst-case (정적, interval arithmetic) ======
+# 입력 구간 [lo, hi] (u8: 채널별) 과 실제 weight 부호로
+#   w > 0 : w*[lo, hi],   w < 0 : w*[hi, lo]   -> 탭마다 더함
+# conv1 입력 = [0, 255],  conv 출력 구간 = clamp(requant(acc 구간)) -> maxpool은 구간 그대로
+# -> 다음 레이어 입력 구간으로 전파 (그래서 어떤 입력 이미지에도 절대 넘지 않는 범위)
+#
+# 부분합(RTL의 part_sum / ps_ch / fc 누적 중간값)도 이 구간 안에 들어감:
+#   입력 하한이 0 이상이므로 탭 하나의 구간은 항상 0을 포함 -> 탭을 더할수록 구간이 넓어지기만 함
+#   (fc는 acc = bias 에서 시작하므로 bias 포함 구간으로 계산)
+#
+# ====== 2) dataset-observed (MNIST 70k 전체, int_engine 배치 추론) ======
+# conv acc: int_stats.SatStats 의 채널별 min/max
+# fc      : bias부터 시작하는 RTL 누적 순서(위치 0..15, 위치마다 3채널) 그대로 prefix 최소/최대
+# logit   : argmax10_stream 비교기 입력
+#
+# ====== 비트폭 ======
+#   signed N bit 가 [lo, hi] 를 담으려면  -2^(N-1) <= lo  and  hi <= 2^(N-1)-1
+#   requant 입력은 acc + 2^(s-1) (반올림 상수) 까지 포함해서 계산
+#
+# 사용 예:
+#   python 03_acc_range_analyzer.py                  # train+test 70k
+#   python 03_acc_range_analyzer.py --split test     # 빠르게 10k만
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+RTL_ACC_BITS = 32   # 현재 RTL / main.c 누산기 폭
+
+
+# ----------------------------
+# 1) 비트폭 / 구간 유틸
+# ----------------------------
+def signed_bits(lo: int, hi: int) -> int:
+    """[lo, hi] 를 담는 최소 signed 비트 수"""
+    n = 1
+    while lo < -(1 << (n - 1)) or hi > (1 << (n - 1)) - 1:
+        n += 1
+    return n
+
+def requant_interval(lo: np.ndarray, hi: np.ndarray, shift: np.ndarray):
+    """acc 구간 -> (acc + 2^(s-1)) 구간 + clamp 후 u8 구간 (채널별)"""
+    rnd = np.where(shift > 0, 1 << np.maximum(shift - 1, 0), 0)
+    r_lo, r_hi = lo + rnd, hi + rnd
+    sr, sl = np.maximum(shift, 0), np.maximum(-shift, 0)
+    u_lo = np.clip((r_lo >> sr) << sl, 0, 255)
+    u_hi = np.clip((r_hi >> sr) << sl, 0, 255)
+    return r_lo, r_hi, u_lo, u_hi
+
+def conv_interval(W: np.ndarray, in_lo: np.ndarray, in_hi: np.ndarray):
+    """
+    W: (Kh,Kw,Cin,Cout), in_lo/in_hi: (Cin,) 입력 채널별 구간
+    return: (lo, hi) (Cout,) int64
+    """
+    W = W.astype(np.int64)
+    a = W * in_lo[None, None, :, None]
+    b = W * in_hi[None, None, :, None]
+    return np.minimum(a, b).sum(axis=(0, 1, 2)), np.maximum(a, b).sum(axis=(0, 1, 2))
+
+def dense_interval(Wd: np.ndarray, bd: np.ndarray, in_lo: np.ndarray, in_hi: np.ndarray):
+    """Wd: (flat,10), in_lo/in_hi: (flat,) -> bias 포함 (lo, hi) (10,)"""
+    W = Wd.astype(np.int64)
+    a, b = W * in_lo[:, None], W * in_hi[:, None]
+    bd = bd.astype(np.int64)
+    return bd + np.minimum(a, b).sum(axis=0), bd + np.maximum(a, b).sum(axis=0)
+
+def product_interval(W: np.ndarray, in_hi: int = 255):
+    """u8 * i8 곱 하나의 구간 (RTL mult 레지스터)"""
+    w = W.astype(np.int64)
+    return int(min(0, w.min()) * in_hi), int(max(0, w.max()) * in_hi)
+
+
+# ----------------------------
+# 2) worst-case 전파
+# ----------------------------
+def worst_case(W1, W2, Wd, bd_q15, s1, s2) -> dict:
+    out = {}
+    x_lo, x_hi = np.zeros(W1.shape[2], np.int64), np.full(W1.shape[2], 255, np.int64)
+
+    lo, hi = conv_interval(W1, x_lo, x_hi)
+    r_lo, r_hi, u_lo, u_hi = requant_interval(lo, hi, s1)
+    out["c1"] = {"acc_lo": lo, "acc_hi": hi, "rnd_lo": r_lo, "rnd_hi": r_hi,
+                 "u8_lo": u_lo, "u8_hi": u_hi, "prod": product_interval(W1)}
+
+    # maxpool: 채널별 구간 그대로
+    lo, hi = conv_interval(W2, u_lo, u_hi)
+    r_lo, r_hi, u2_lo, u2_hi = requant_interval(lo, hi, s2)
+    out["c2"] = {"acc_lo": lo, "acc_hi": hi, "rnd_lo": r_lo, "rnd_hi": r_hi,
+                 "u8_lo": u2_lo, "u8_hi": u2_hi, "prod": product_interval(W2)}
+
+    # flatten (H,W,C) 순서 -> flat index i 의 채널 = i % C
+    C2 = W2.shape[-1]
+    f_lo = np.tile(u2_lo, Wd.shape[0] // C2)
+    f_hi = np.tile(u2_hi, Wd.shape[0] // C2)
+    lo, hi = dense_interval(Wd, bd_q15, f_lo, f_hi)
+    out["fc"] = {"acc_lo": lo, "acc_hi": hi, "prod": product_interval(Wd)}
+    return out
+
+
+# ----------------------------
+# 3) dataset-observed
+# ----------------------------
+def observed(x_u8, W1, W2, Wd, bd_q15, shifts, batch_size: int = DEFAULT_BATCH) -> dict:
+    """SatStats(conv acc) + fc 누적 prefix (RTL 순서: 위치 t=0..15, 위치마다 C2채널)"""
+    stats = SatStats()
+    C2 = W2.shape[-1]
+    Wd3 = Wd.astype(np.int64).reshape(-1, C2, Wd.shape[1])           # (16, C2, 10)
+    fc_lo = np.full(Wd.shape[1], np.iinfo(np.int64).max)
+    fc_hi = np.full(Wd.shape[1], np.iinfo(np.int64).min)
+
+    for s in range(0, len(x_u8), batch_size):
+        g = forward_batch(x_u8[s:s + batch_size], W1, W2, Wd, bd_q15, stats=stats, shifts=shifts)
+        p2 = g["p2"].reshape(len(g["p2"]), -1, C2).astype(np.int64)     # (N, 16, C2)
+        step = np.einsum("ntc,tcj->ntj", p2, Wd3)                      # 위치별 3채널 합
+        run = bd_q15.astype(np.int64) + np.cumsum(step, axis=1)        # acc 누적 (bias 시작)
+        fc_lo = np.minimum(fc_lo, run.min(axis=(0, 1)))
+        fc_hi = np.maximum(fc_hi, run.max(axis=(0, 1)))
+
+    return {
+        "c1": {"acc_lo": stats.acc_min["c1"], "acc_hi": stats.acc_max["c1"]},
+        "c2": {"acc_lo": stats.acc_min["c2"], "acc_hi": stats.acc_max["c2"]},
+        "fc": {"acc_lo": fc_lo, "acc_hi": fc_hi},
+        "logit": {"lo": stats.fc["logit_min"], "hi": stats.fc["logit_max"]},
+        "images": stats.images,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="worst-case / observed accumulator ranges and minimum RTL bit widths")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--split", choices=["test", "train", "all"], default="all")
+    ap.add_argument("--out", default=os.path.join(BASE, "export", "acc_range.json"))
+    args = ap.parse_args()
+
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    s1, s2 = load_shifts(args.npz)
+    s1, s2 = s1.astype(np.int64), s2.astype(np.int64)
+    x_u8, _ = load_mnist_u8(args.split)
+
+    wc = worst_case(W1, W2, Wd, bd_q15, s1, s2)
+    t0 = time.time()
+    ob = observed(x_u8, W1, W2, Wd, bd_q15, (s1, s2))
+    print(f"[INFO] observed: {ob['images']} images ({args.split}), {time.time() - t0:.1f} sec")
+
+    # ----------------------------
+    # 채널별 표
+    # ----------------------------
+    print("\n===================== ACCUMULATOR RANGE (per channel) =====================")
+    print(f" {'layer':<6} {'ch':>3} {'worst lo':>10} {'worst hi':>10} {'bits':>5} | "
+          f"{'obs lo':>10} {'obs hi':>10} {'bits':>5}")
+    for tag in ("c1", "c2", "fc"):
+        w, o = wc[tag], ob[tag]
+        for c in range(len(w["acc_lo"])):
+            lo, hi = (w["rnd_lo"][c], w["rnd_hi"][c]) if tag != "fc" else (w["acc_lo"][c], w["acc_hi"][c])
+            olo, ohi = int(o["acc_lo"][c]), int(o["acc_hi"][c])
+            print(f" {tag:<6} {c:>3} {int(lo):>10} {int(hi):>10} {signed_bits(int(lo), int(hi)):>5} | "
+                  f"{olo:>10} {ohi:>10} {signed_bits(olo, ohi):>5}")
+    print(" (worst conv 는 반올림 상수 2^(s-1) 포함, fc 는 bias부터 시작하는 누적 전체)")
+
+    # ----------------------------
+    # RTL 레지스터별 제안
+    # ----------------------------
+    def span(lo_arr, hi_arr):
+        return int(np.min(lo_arr)), int(np.max(hi_arr))
+
+    lg_lo, lg_hi = span(wc["fc"]["acc_lo"], wc["fc"]["acc_hi"])
+    rows = [
+        ("conv1_calc mult[0:24]",           wc["c1"]["prod"]),
+        ("conv1_calc part_sum / sum / raw", span(wc["c1"]["rnd_lo"], wc["c1"]["rnd_hi"])),
+        ("conv2_calc mult_ch*[0:24]",       wc["c2"]["prod"]),
+        ("conv2_calc ps / sum / total_sum", span(wc["c2"]["rnd_lo"], wc["c2"]["rnd_hi"])),
+        ("fc48x10_stream m1..m3",           wc["fc"]["prod"]),
+        ("fc48x10_stream acc / out_logit",  (lg_lo, lg_hi)),
+        ("argmax10_stream best_logit",      (lg_lo, lg_hi)),
+    ]
+    obs = {
+        "conv1_calc part_sum / sum / raw": span(ob["c1"]["acc_lo"], ob["c1"]["acc_hi"]),
+        "conv2_calc ps / sum / total_sum": span(ob["c2"]["acc_lo"], ob["c2"]["acc_hi"]),
+        "fc48x10_stream acc / out_logit":  span(ob["fc"]["acc_lo"], ob["fc"]["acc_hi"]),
+        "argmax10_stream best_logit":      span(ob["logit"]["lo"], ob["logit"]["hi"]),
+    }
+
+    print("\n========================= MINIMUM SAFE WIDTHS (RTL) =========================")
+    print(f" {'register':<34} {'worst range':>25} {'safe':>5} {'obs':>4} {'now':>4}")
+    report = []
+    for name, (lo, hi) in rows:
+        bits = signed_bits(lo, hi)
+        ob_bits = signed_bits(*obs[name]) if name in obs else None
+        now = 16 if "m1..m3" in name else RTL_ACC_BITS
+        print(f" {name:<34} {f'[{lo}, {hi}]':>25} {bits:>5} {ob_bits if ob_bits else '-':>4} {now:>4}")
+        report.append({"register": name, "worst_lo": lo, "worst_hi": hi, "safe_bits": bits,
+                       "observed": list(obs[name]) if name in obs else None,
+                       "observed_bits": ob_bits, "current_bits": now})
+    print("=============================================================================")
+    print(" safe = 어떤 u8 입력에도 넘치지 않는 폭 (worst-case), obs = MNIST에서 실제로 필요했던 폭")
+    print(" * weight/shift가 바뀌면(재학습) 다시 돌려서 확인")
+
+    def to_list(d):
+        return {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in d.items()}
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump({
+            "npz": args.npz, "split": args.split, "images": ob["images"],
+            "shifts": {"s1": s1.tolist(), "s2": s2.tolist()},
+            "worst_case": {k: to_list(v) for k, v in wc.items()},
+            "observed": {k: to_list(v) for k, v in ob.items() if k != "images"},
+            "rtl": report,
+        }, f, indent=2)
+    print(f"Saved: {args.out}")
+
+if __name__ == "__main__":
+    main()
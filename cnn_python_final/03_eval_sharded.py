@@ -0,0 +1,155 @@
+# eval_sharded.py
+import os
+import time
+import argparse
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, infer_batch
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [정수-only / Shift-only] 멀티프로세스 샤딩 평가
+#
+# 03_infer_int_only_shift.py 의 정확도 측정은 코어 1개만 사용함.
+# 여기서는 test set(10k) / train set(60k)을 샤드로 나눠 프로세스 풀에 뿌린다.
+#
+# ====== 구조 ======
+# - 가중치(W1/W2/Wd/bd_q15, requant shift s1/s2), 이미지, 라벨, 출력(pred/logits)을 전부 shared memory에 올림
+#   -> worker에는 shm 이름/shape/dtype만 넘어가고 배열 자체는 pickle되지 않음
+# - 각 worker는 자기 샤드 [s, e) 결과를 출력 shm의 같은 위치에 바로 씀
+#   -> 병합 순서가 자동으로 이미지 순서와 동일
+# - 계산은 int_engine.infer_batch (loop 버전과 bit-exact)
+#
+# 사용 예:
+#   python 03_eval_sharded.py                       # test 10k, 코어 전부
+#   python 03_eval_sharded.py --split all -j 16     # train 60k + test 10k
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+
+# ----------------------------
+# 1) shared memory 유틸
+#    spec = {key: (shm_name, shape, dtype_str)}
+# ----------------------------
+def shm_create(arrays: dict):
+    """dict[str, ndarray] -> (spec, shm 핸들 리스트). 값은 shm으로 복사됨"""
+    spec, handles = {}, []
+    for key, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+        np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+        spec[key] = (shm.name, a.shape, a.dtype.str)
+        handles.append(shm)
+    return spec, handles
+
+def shm_attach(spec: dict):
+    """spec -> (dict[str, ndarray view], shm 핸들 리스트)"""
+    views, handles = {}, []
+    for key, (name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=name)
+        views[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        handles.append(shm)
+    return views, handles
+
+
+# ----------------------------
+# 2) worker
+#    - initializer에서 shm을 한 번만 attach (샤드마다 다시 열지 않음)
+# ----------------------------
+_W = None
+_W_HANDLES = None
+
+def _worker_init(spec: dict):
+    global _W, _W_HANDLES
+    _W, _W_HANDLES = shm_attach(spec)
+
+def _worker_run(shard):
+    s, e = shard
+    logits = infer_batch(_W["x"][s:e], _W["W1"], _W["W2"], _W["Wd"], _W["bd_q15"],
+                         shifts=(_W["s1"], _W["s2"]))
+    pred = np.argmax(logits, axis=1).astype(np.int32)
+
+    _W["logits"][s:e] = logits
+    _W["pred"][s:e] = pred
+    return s, e, int(np.count_nonzero(pred == _W["y"][s:e]))
+
+
+# ----------------------------
+# 3) 샤딩 평가
+# ----------------------------
+def eval_sharded(x_u8, y, W1, W2, Wd, bd_q15, workers: int, shard_size: int, shifts=None):
+    """
+    shifts: (s1, s2) 출력 채널별 requant shift (None = 7)
+    return: (pred (N,) int32, logits (N,10) int32, correct)
+    """
+    s1, s2 = shifts if shifts is not None else (7, 7)
+    N = len(x_u8)
+    shards = [(s, min(s + shard_size, N)) for s in range(0, N, shard_size)]
+
+    spec, handles = shm_create({
+        "x": x_u8, "y": y,
+        "W1": W1, "W2": W2, "Wd": Wd, "bd_q15": bd_q15,
+        "s1": np.broadcast_to(np.asarray(s1, np.int32), (W1.shape[-1],)),
+        "s2": np.broadcast_to(np.asarray(s2, np.int32), (W2.shape[-1],)),
+        "pred": np.zeros((N,), dtype=np.int32),
+        "logits": np.zeros((N, 10), dtype=np.int32),
+    })
+
+    try:
+        ctx = mp.get_context("spawn")
+        correct = 0
+        with ctx.Pool(workers, initializer=_worker_init, initargs=(spec,)) as pool:
+            for done, (s, e, c) in enumerate(pool.imap_unordered(_worker_run, shards), 1):
+                correct += c
+                print(f"  [shard {done}/{len(shards)}] images {s}..{e-1} done")
+
+        out, out_handles = shm_attach({k: spec[k] for k in ("pred", "logits")})
+        pred, logits = out["pred"].copy(), out["logits"].copy()
+        for h in out_handles:
+            h.close()
+    finally:
+        for h in handles:
+            h.close()
+            h.unlink()
+
+    return pred, logits, correct
+
+
+def main():
+    ap = argparse.ArgumentParser(description="multi-process sharded shift-only INT evaluation")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--split", choices=["test", "train", "all"], default="test")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--shard-size", type=int, default=1000)
+    ap.add_argument("--out", default=None, help="per-image pred/logits 저장 경로 (.npz)")
+    args = ap.parse_args()
+
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    shifts = load_shifts(args.npz)
+    x_u8, y = load_mnist_u8(args.split)
+    y = y.astype(np.int32)
+    print(f"[INFO] split={args.split} N={len(x_u8)} workers={args.workers} shard={args.shard_size}")
+
+    t0 = time.time()
+    pred, logits, correct = eval_sharded(x_u8, y, W1, W2, Wd, bd_q15, args.workers, args.shard_size, shifts)
+    elapsed = time.time() - t0
+
+    N = len(x_u8)
+    print("\n================ RESULT ================")
+    print(f"[SHIFT-ONLY INT / SHARDED] acc={correct / N:.4f} (N={N}, split={args.split})")
+    print(f"elapsed = {elapsed:.1f} sec ({N / elapsed:.0f} img/s, workers={args.workers})")
+    print("========================================")
+
+    out = args.out or os.path.join(BASE, "export", f"eval_{args.split}_preds.npz")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    np.savez(out, pred=pred, logits=logits, label=y)
+    print(f"Saved per-image results: {out}")
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 import os
 import time
 import numpy as np
-import tensorflow as tf
+from int_engine import infer_batch, crosscheck, is_pow2, load_shifts
+from mnist_data import load_mnist_u8
 
 # =============================================================================
 # [정수-only / Shift-only] FPGA 검증 스크립트
@@ -15,6 +16,7 @@ import tensorflow as tf
 #   acc = Σ(u8 * i8)                      (signed int32 누산)
 #   out_u8 = clamp( round(acc/128) )      (ReLU + clamp 0..255 포함)
 #         = clamp( (acc + 64) >> 7 )
+#   (npz에 학습된 s1/s2가 있으면 출력 채널별 (acc + 2^(s-1)) >> s, 없으면 전부 7)
 #
 # Dense:
 #   acc = Σ(u8 * i8)                      (signed int32)
@@ -39,14 +41,13 @@ W1 = pack["W1_q"].astype(np.int8)         # (5,5,1,3)
 W2 = pack["W2_q"].astype(np.int8)         # (5,5,3,3)
 Wd = pack["Wd_q"].astype(np.int8)         # (48,10)
 bd_q15 = pack["bd_q15"].astype(np.int32)  # (10,)
+S1, S2 = load_shifts(NPZ)                 # (3,) (3,) requant shift
 
 # ----------------------------
 # 1) MNIST u8 로드
 # ----------------------------
-mnist = tf.keras.datasets.mnist
-(_, _), (x_test_u8, y_test) = mnist.load_data()
-
-x_test_u8 = x_test_u8.astype(np.uint8)   # (10000,28,28)
+#    - TensorFlow 없이 캐시(.npy)를 mmap으로 바로 엶 (mnist_data.py)
+x_test_u8, y_test = load_mnist_u8("test")   # (10000,28,28) u8
 y_test = y_test.astype(np.int32)
 
 # ----------------------------
@@ -70,13 +71,21 @@ def requant_shift7(acc: int) -> int:
     tmp = (acc + 64) >> 7
     return clamp_u8(tmp)
 
+def requant_shift(acc: int, s: int) -> int:
+    """requant_shift7 의 shift 일반화: clamp( (acc + 2^(s-1)) >> s ), s<=0 이면 왼쪽 시프트"""
+    if s == 7:
+        return requant_shift7(acc)
+    tmp = ((acc + (1 << (s - 1))) >> s) if s > 0 else (acc << -s)
+    return clamp_u8(tmp)
+
 # ----------------------------
 # 3) Conv / Pool / Dense (RTL처럼 "기본 for-loop"로 작성)
 # ----------------------------
-def conv5x5_valid_u8_i8_to_u8(x_u8_hw_c: np.ndarray, W_i8: np.ndarray) -> np.ndarray:
+def conv5x5_valid_u8_i8_to_u8(x_u8_hw_c: np.ndarray, W_i8: np.ndarray, shift=None) -> np.ndarray:
     """
     x: (H,W,Cin)  uint8
     W: (5,5,Cin,Cout) int8
+    shift: (Cout,) 출력 채널별 requant shift (None = 7)
     out: (H-4, W-4, Cout) uint8
     """
     H, Ww, Cin = x_u8_hw_c.shape
@@ -100,7 +109,8 @@ def conv5x5_valid_u8_i8_to_u8(x_u8_hw_c: np.ndarray, W_i8: np.ndarray) -> np.nda
                             w = int(W_i8[ky, kx, ic, oc])             # -128..127
                             acc += a * w
 
-                out[oy, ox, oc] = np.uint8(requant_shift7(acc))
+                s = 7 if shift is None else int(shift[oc])
+                out[oy, ox, oc] = np.uint8(requant_shift(acc, s))
 
     return out
 
@@ -146,38 +156,49 @@ def dense_u8_i8_logits_q15(flat_u8_48: np.ndarray, Wd_i8: np.ndarray, bd_q15: np
 # ----------------------------
 # 4) 전체 추론 (RTL 데이터 흐름 그대로)
 # ----------------------------
-def infer_one(img_u8_28x28: np.ndarray) -> int:
+def infer_one_logits(img_u8_28x28: np.ndarray) -> np.ndarray:
     # 입력 (28,28) u8 -> (28,28,1)
     a0 = img_u8_28x28.reshape(28, 28, 1)
 
     # conv1 -> u8
-    c1 = conv5x5_valid_u8_i8_to_u8(a0, W1)     # (24,24,3)
+    c1 = conv5x5_valid_u8_i8_to_u8(a0, W1, S1)  # (24,24,3)
     p1 = maxpool2x2_u8(c1)                     # (12,12,3)
 
     # conv2 -> u8
-    c2 = conv5x5_valid_u8_i8_to_u8(p1, W2)     # (8,8,3)
+    c2 = conv5x5_valid_u8_i8_to_u8(p1, W2, S2)  # (8,8,3)
     p2 = maxpool2x2_u8(c2)                     # (4,4,3)
 
     # flatten
     flat = p2.reshape(48)
 
-    # dense logits(q15) -> argmax
-    logits = dense_u8_i8_logits_q15(flat, Wd, bd_q15)
-    return int(np.argmax(logits))
+    # dense logits(q15)
+    return dense_u8_i8_logits_q15(flat, Wd, bd_q15)
+
+def infer_one(img_u8_28x28: np.ndarray) -> int:
+    return int(np.argmax(infer_one_logits(img_u8_28x28)))
+
+# ----------------------------
+# 5) 교차검증: 배치 엔진(int_engine) vs 위 for-loop 구현
+#    - loop 버전은 느리므로 앞쪽 N_CHECK장만 비교
+#    - 한 장이라도 logits가 다르면 엔진 쪽 버그 -> 바로 중단
+# ----------------------------
+N_CHECK = 100
+
+t0 = time.time()
+bad = crosscheck(x_test_u8, infer_one_logits, W1, W2, Wd, bd_q15, n=N_CHECK, shifts=(S1, S2))
+if bad:
+    raise RuntimeError(f"[ERROR] batch engine != loop reference at images {bad[:10]} ({len(bad)} total)")
+print(f"[CHECK] batch engine == loop reference (N={N_CHECK}, {time.time()-t0:.1f} sec)")
 
 # ----------------------------
-# 5) 정확도 측정
+# 6) 정확도 측정 (배치 엔진, test set 전체)
 # ----------------------------
-N_TEST = 1000# 느리면 2000 등으로 줄여도 됨
-correct = 0
+N_TEST = len(x_test_u8)
 t0 = time.time()
 
-for i in range(N_TEST):
-    pred = infer_one(x_test_u8[i])
-    if pred == int(y_test[i]):
-        correct += 1
-    if (i + 1) % 100 == 0:
-        print(f"[{i+1}/{N_TEST}] acc_so_far={correct/(i+1):.4f}")
+logits = infer_batch(x_test_u8[:N_TEST], W1, W2, Wd, bd_q15, shifts=(S1, S2))
+pred = np.argmax(logits, axis=1)
+correct = int(np.count_nonzero(pred == y_test[:N_TEST]))
 
 acc = correct / N_TEST
 print("\n================ RESULT ================")
@@ -185,3 +206,16 @@ print(f"[SHIFT-ONLY INT] acc={acc:.4f} (N={N_TEST})")
 print(f"elapsed = {time.time()-t0:.1f} sec")
 print("========================================")
 
+# ----------------------------
+# 7) (pow2 weight npz) 곱셈 없는 MAC 확인
+#    - weight가 전부 0 / ±2^e 이면 MAC = ±(u8 << e) 로 다시 계산 (int_engine mac="shift")
+#    - 곱셈 버전과 logits가 1:1 같아야 함 -> 이 정확도가 DSP 없는 datapath의 정확도
+# ----------------------------
+if all(is_pow2(W) for W in (W1, W2, Wd)):
+    t0 = time.time()
+    logits_sh = infer_batch(x_test_u8[:N_TEST], W1, W2, Wd, bd_q15, mac="shift", shifts=(S1, S2))
+    if not np.array_equal(logits_sh, logits):
+        raise RuntimeError("[ERROR] shift MAC != multiply MAC")
+    acc_sh = np.count_nonzero(np.argmax(logits_sh, axis=1) == y_test[:N_TEST]) / N_TEST
+    print(f"[POW2 SHIFT MAC] acc={acc_sh:.4f} (== multiply MAC, {time.time()-t0:.1f} sec)")
+
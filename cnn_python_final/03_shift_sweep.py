@@ -0,0 +1,141 @@
+# shift_sweep.py
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+from int_engine import (
+    DEFAULT_NPZ, ROUNDING_MODES, load_weights, conv5x5_acc_batch, requant_tmp,
+    clamp_u8_batch, maxpool2x2_batch, dense_acc_batch, align_bias_q15,
+)
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [Requant shift 스윕]
+#
+# 03_infer_shift_only_int_stats.py 의 목적은 ">>7 이 맞는 shift인가?" 판단이지만
+# 다른 shift를 보려면 코드를 고치고 전체를 다시 돌려야 했음.
+# 여기서는 conv1/conv2 shift (예: 5..9) x rounding(half_up / floor) 조합 전체를
+# 한 번에 평가해서 정확도 + clamp 비율 순위표를 출력.
+#
+# ====== 캐시 구조 (upstream 선택이 바뀔 때만 downstream 재계산) ======
+#   acc1 = conv1 누산(int32)                  : 1번만 계산
+#   (s1, r1)  -> c1, p1, acc2 = conv2 누산     : conv1 선택마다 1번
+#   (s2, r2)  -> c2, p2, dense acc             : 조합마다 (가장 싼 부분)
+#
+# ====== bias 정렬 ======
+#   shift가 7이 아니면 dense 누산 스케일이 2^(s1+s2-14)배 바뀌므로
+#   bd_q15도 int_engine.align_bias_q15 로 같은 도메인에 맞춤 (역시 shift-only)
+#
+# 사용 예:
+#   python 03_shift_sweep.py                          # shift 5..9, half_up/floor
+#   python 03_shift_sweep.py --shifts 6,7,8 --modes half_up --top 10
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+
+# ----------------------------
+# 1) 유틸
+# ----------------------------
+def parse_shifts(s: str) -> list:
+    """'5-9' 또는 '5,7,9'"""
+    if "-" in s:
+        a, b = s.split("-")
+        return list(range(int(a), int(b) + 1))
+    return [int(v) for v in s.split(",")]
+
+
+# ----------------------------
+# 2) 스윕
+# ----------------------------
+def clamp_rates(tmp: np.ndarray):
+    """(relu0 %, hi_clamp %)"""
+    n = tmp.size
+    return (np.count_nonzero(tmp < 0) / n * 100.0,
+            np.count_nonzero(tmp > 255) / n * 100.0)
+
+def sweep(x_u8, y, W1, W2, Wd, bd_q15, shifts: list, modes: list) -> list:
+    t0 = time.time()
+    acc1 = conv5x5_acc_batch(x_u8.reshape(-1, 28, 28, 1), W1)
+    print(f"[CACHE] conv1 acc {acc1.shape} ({time.time() - t0:.1f} sec)")
+
+    rows = []
+    for s1 in shifts:
+        for r1 in modes:
+            tmp1 = requant_tmp(acc1, s1, r1)
+            c1_relu0, c1_hic = clamp_rates(tmp1)
+            p1 = maxpool2x2_batch(clamp_u8_batch(tmp1))
+            acc2 = conv5x5_acc_batch(p1, W2)
+
+            for s2 in shifts:
+                bd = align_bias_q15(bd_q15, s1, s2)
+                for r2 in modes:
+                    tmp2 = requant_tmp(acc2, s2, r2)
+                    c2_relu0, c2_hic = clamp_rates(tmp2)
+                    p2 = maxpool2x2_batch(clamp_u8_batch(tmp2))
+
+                    logits = dense_acc_batch(p2.reshape(len(p2), -1), Wd) + bd
+                    acc = np.count_nonzero(np.argmax(logits, axis=1) == y) / len(y)
+
+                    rows.append({
+                        "s1": s1, "r1": r1, "s2": s2, "r2": r2, "acc": float(acc),
+                        "c1_relu0": c1_relu0, "c1_hi_clamp": c1_hic,
+                        "c2_relu0": c2_relu0, "c2_hi_clamp": c2_hic,
+                    })
+            print(f"  conv1 s={s1} {r1:<7} done ({time.time() - t0:.1f} sec)")
+
+    # 정확도 내림차순, 동률이면 포화(hi_clamp)가 적은 쪽
+    rows.sort(key=lambda r: (-r["acc"], r["c1_hi_clamp"] + r["c2_hi_clamp"]))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="requant shift / rounding sweep with cached accumulators")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--split", choices=["test", "train"], default="test")
+    ap.add_argument("--n", type=int, default=0, help="앞에서부터 N장만 (0=전체)")
+    ap.add_argument("--shifts", default="5-9")
+    ap.add_argument("--modes", default=",".join(ROUNDING_MODES))
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--out", default=os.path.join(BASE, "export", "shift_sweep.json"))
+    args = ap.parse_args()
+
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    x_u8, y = load_mnist_u8(args.split)
+    y = y.astype(np.int32)
+    if args.n:
+        x_u8, y = x_u8[:args.n], y[:args.n]
+
+    shifts = parse_shifts(args.shifts)
+    modes = args.modes.split(",")
+    print(f"[INFO] N={len(x_u8)} shifts={shifts} modes={modes} "
+          f"-> {len(shifts) ** 2 * len(modes) ** 2} combinations")
+
+    rows = sweep(x_u8, y, W1, W2, Wd, bd_q15, shifts, modes)
+
+    print("\n======================== SHIFT SWEEP (ranked) ========================")
+    print(f" {'#':>3} {'conv1':>12} {'conv2':>12} {'acc':>8} "
+          f"{'c1 relu0':>9} {'c1 hi':>7} {'c2 relu0':>9} {'c2 hi':>7}")
+    for i, r in enumerate(rows[:args.top], 1):
+        base = "  <- 현재 RTL" if (r["s1"], r["r1"], r["s2"], r["r2"]) == (7, "half_up", 7, "half_up") else ""
+        print(f" {i:>3} {r['s1']:>3} {r['r1']:<8} {r['s2']:>3} {r['r2']:<8} {r['acc']:>8.4f} "
+              f"{r['c1_relu0']:>8.2f}% {r['c1_hi_clamp']:>6.2f}% "
+              f"{r['c2_relu0']:>8.2f}% {r['c2_hi_clamp']:>6.2f}%{base}")
+    print("=======================================================================")
+
+    for i, r in enumerate(rows, 1):
+        if (r["s1"], r["r1"], r["s2"], r["r2"]) == (7, "half_up", 7, "half_up"):
+            print(f"[BASELINE] >>7 half_up/half_up: rank {i}/{len(rows)}, acc={r['acc']:.4f}")
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(rows, f, indent=2)
+    print(f"Saved: {args.out}")
+
+if __name__ == "__main__":
+    main()
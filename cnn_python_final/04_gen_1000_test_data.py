@@ -1,52 +1,60 @@
 import os
+import argparse
 import numpy as np
-import tensorflow as tf
+
+from mnist_data import load_mnist_u8
+from hex_io import HexWriter, save_hex
 
 # =============================================================================
 # [FPGA 대규모 검증용 데이터 생성기]
 #
 # 목적: MNIST Testset 중 앞선 1,000장을 추출하여
 #       RTL 시뮬레이션용 연속 입력 파일 생성
+# --n 10000 이면 input_10k.txt / label_10k.txt (784만 줄, hex_io 스트리밍 쓰기)
+#   -> NPU_CAM_GRAY.srcs/sim_1/new/tb_cnn_10k_verify.v (N_TEST = 10000) 가 그대로 읽음
 # =============================================================================
 
+ap = argparse.ArgumentParser(description="continuous input/label hex for tb_cnn_1k_verify.v (--n 1000) "
+                                         "/ tb_cnn_10k_verify.v (--n 10000)")
+ap.add_argument("--n", type=int, default=1000, help="앞에서부터 N장 (1000 -> *_1k.txt, 10000 -> *_10k.txt)")
+args = ap.parse_args()
+
 # 경로 설정
 BASE = os.getcwd()
 OUT_DIR = os.path.join(BASE, "export", "golden_data")
 os.makedirs(OUT_DIR, exist_ok=True)
 
 # MNIST 로드 (Test set)
-(_, _), (x_test_u8, y_test) = tf.keras.datasets.mnist.load_data()
+x_test_u8, y_test = load_mnist_u8("test")
 
-# 1,000장만 선택
-N_TEST = 1000
-x_sel = x_test_u8[:N_TEST]  # (1000, 28, 28)
-y_sel = y_test[:N_TEST]     # (1000,)
+# N장만 선택 (기본 1,000장)
+N_TEST = args.n
+SUFFIX = f"{N_TEST // 1000}k" if N_TEST % 1000 == 0 else str(N_TEST)
+x_sel = x_test_u8[:N_TEST]  # (N, 28, 28)
+y_sel = y_test[:N_TEST]     # (N,)
 
 print(f"=== {N_TEST}장 데이터 생성 시작 ===")
 
 # ---------------------------------------------------------
 # 1. 입력 데이터 병합 (input_1k.txt)
 #    - 구조: 이미지 0(784줄) -> 이미지 1(784줄) ... 순서대로 쭉 이어서 저장
+#    - 1000장 단위로 잘라서 스트리밍 (10k 세트도 메모리는 청크 크기만)
 # ---------------------------------------------------------
-input_file = os.path.join(OUT_DIR, "input_1k.txt")
+input_file = os.path.join(OUT_DIR, f"input_{SUFFIX}.txt")
 print(f"Generating inputs: {input_file} ...")
 
-with open(input_file, "w") as f:
-    for i in range(N_TEST):
-        # (28, 28) -> (784,)
-        flat_img = x_sel[i].flatten()
-        for pixel in flat_img:
-            f.write(f"{pixel:02X}\n")
+with HexWriter(input_file, width_bits=8) as w:
+    for s in range(0, N_TEST, 1000):
+        w.write(x_sel[s:s + 1000])   # (B, 28, 28) -> B*784줄
 
 # ---------------------------------------------------------
 # 2. 정답 라벨 저장 (label_1k.txt)
+#    - 0~9 한 자리 (기존 포맷 그대로)
 # ---------------------------------------------------------
-label_file = os.path.join(OUT_DIR, "label_1k.txt")
+label_file = os.path.join(OUT_DIR, f"label_{SUFFIX}.txt")
 print(f"Generating labels: {label_file} ...")
 
-with open(label_file, "w") as f:
-    for label in y_sel:
-        f.write(f"{label}\n")
+save_hex(label_file, y_sel, width_bits=4)
 
 print("\n=== 생성 완료 ===")
 print(f"Input Lines: {N_TEST * 784}")
@@ -1,6 +1,11 @@
 import os
+import argparse
 import numpy as np
-import tensorflow as tf
+
+import hex_io
+import golden_vectors as gv
+from int_engine import predict_batch, load_shifts
+from mnist_data import load_mnist_u8
 
 # =============================================================================
 # [FPGA 검증용 Golden Vector 생성기]
@@ -8,8 +13,19 @@ import tensorflow as tf
 # 목적: RTL 시뮬레이션 결과와 비교할 "정답지" 생성
 # 대상: MNIST Test set 중 첫 번째 이미지 (숫자 7)
 # 흐름: Input -> Conv1 -> Pool1 -> Conv2 -> Pool2 -> Flatten -> FC -> Argmax
+#
+# --idx 로 여러 장 선택 가능 ('0,5,9' / '100-199' / 'all' / 'fail' = 엔진 오답 전부)
+#   - 첫 번째 이미지: 기존처럼 input_img.txt ~ final_pred.txt (tb_cnn_core_top.v 용)
+#   - 2장 이상이면 추가로 golden_vectors.save_set -> golden_*.txt + golden_index.csv
+#     (int_engine 배치 계산, 10k장도 수 초)
 # =============================================================================
 
+ap = argparse.ArgumentParser(description="per-layer golden vectors for RTL simulation")
+ap.add_argument("--idx", default="0", help="이미지 선택: '0' / '0,5,9' / '100-199' / 'all' / 'fail'")
+ap.add_argument("--prefix", default="golden", help="여러 장 출력 파일 접두어")
+ap.add_argument("--shard-size", type=int, default=0, help="N장마다 파일 분할 (0=분할 없음)")
+args = ap.parse_args()
+
 # 경로 설정
 BASE = os.getcwd()
 NPZ_PATH = os.path.join(BASE, "export", "mnist_shift_only_fpga_export.npz")
@@ -27,12 +43,19 @@ W1 = pack["W1_q"].astype(np.int8)          # (5,5,1,3)
 W2 = pack["W2_q"].astype(np.int8)          # (5,5,3,3)
 Wd = pack["Wd_q"].astype(np.int8)          # (48,10)
 bd_q15 = pack["bd_q15"].astype(np.int32)   # (10,)
+S1, S2 = load_shifts(NPZ_PATH)             # (3,) (3,) requant shift (예전 npz는 7)
 
 # MNIST 로드 (Test set)
-(_, _), (x_test_u8, y_test) = tf.keras.datasets.mnist.load_data()
-
-# ★ 검증할 이미지 인덱스 선택 (0번: 숫자 7) ★
-TEST_IDX = 0
+x_test_u8, y_test = load_mnist_u8("test")
+
+# ★ 검증할 이미지 인덱스 선택 (기본 0번: 숫자 7) ★
+y_test = y_test.astype(np.int32)
+SEL_IDX = gv.parse_index_spec(
+    args.idx, len(x_test_u8),
+    fail_fn=lambda: np.flatnonzero(predict_batch(x_test_u8, W1, W2, Wd, bd_q15, shifts=(S1, S2)) != y_test))
+if len(SEL_IDX) == 0:
+    raise SystemExit(f"선택된 이미지 없음: --idx {args.idx}")
+TEST_IDX = int(SEL_IDX[0])
 input_img = x_test_u8[TEST_IDX].astype(np.uint8)  # (28, 28)
 label_gold = y_test[TEST_IDX]
 
@@ -50,10 +73,17 @@ def requant_shift7(acc):
     """ (acc + 64) >> 7 """
     return clamp_u8((acc + 64) >> 7)
 
-def conv5x5_fpga(x_in, w_in):
+def requant_shift(acc, s):
+    """ (acc + 2^(s-1)) >> s  (학습된 shift, s=7 이면 requant_shift7) """
+    if s == 7:
+        return requant_shift7(acc)
+    return clamp_u8(((acc + (1 << (s - 1))) >> s) if s > 0 else (acc << -s))
+
+def conv5x5_fpga(x_in, w_in, shift):
     """
     x_in: (H, W, Cin)
     w_in: (5, 5, Cin, Cout)
+    shift: (Cout,) 출력 채널별 requant shift
     return: (H-4, W-4, Cout)
     """
     H, W_img, Cin = x_in.shape
@@ -74,7 +104,7 @@ def conv5x5_fpga(x_in, w_in):
                             wt = int(w_in[kr, kc, ch_in, ch_out])
                             acc += px * wt
                 # 결과 Requant (ReLU 포함)
-                out[r, c, ch_out] = requant_shift7(acc)
+                out[r, c, ch_out] = requant_shift(acc, int(shift[ch_out]))
     return out
 
 def maxpool2x2_fpga(x_in):
@@ -124,20 +154,14 @@ img_in = input_img.reshape(28, 28, 1)
 
 def save_hex(name, data, width_bits=8):
     path = os.path.join(OUT_DIR, name)
-    data_flat = data.flatten()
-    with open(path, "w") as f:
-        for val in data_flat:
-            if width_bits == 8:
-                f.write(f"{int(val) & 0xFF:02X}\n")
-            elif width_bits == 32:
-                f.write(f"{int(val) & 0xFFFFFFFF:08X}\n")
+    hex_io.save_hex(path, data, width_bits)   # 8bit: & 0xFF, 32bit: & 0xFFFFFFFF
     print(f"[{name}] Saved. Shape: {data.shape}")
 
 save_hex("input_img.txt", img_in)
 
 # (2) Conv1 -> u8
 # ----------------------------
-conv1_out = conv5x5_fpga(img_in, W1)  # (24, 24, 3)
+conv1_out = conv5x5_fpga(img_in, W1, S1)  # (24, 24, 3)
 save_hex("conv1_out.txt", conv1_out)
 
 # (3) Pool1 -> u8
@@ -147,7 +171,7 @@ save_hex("pool1_out.txt", pool1_out)
 
 # (4) Conv2 -> u8
 # ----------------------------
-conv2_out = conv5x5_fpga(pool1_out, W2) # (8, 8, 3)
+conv2_out = conv5x5_fpga(pool1_out, W2, S2) # (8, 8, 3)
 save_hex("conv2_out.txt", conv2_out)
 
 # (5) Pool2 -> u8
@@ -172,4 +196,25 @@ print(f"Golden Vector 생성 완료: {OUT_DIR}")
 print(f"FPGA 예상 결과(Pred): {pred} (정답: {label_gold})")
 print("------------------------------------------------")
 print("FC Logits (10진수 확인용):")
-print(fc_out)
\ No newline at end of file
+print(fc_out)
+
+# ---------------------------------------------------------
+# 4. 여러 장 (배치 엔진) - 레이어별 연결 파일 + offset index
+# ---------------------------------------------------------
+if len(SEL_IDX) > 1:
+    # 첫 장은 위 for-loop 결과와 1:1 비교 (엔진이 같은 '세계관'인지 확인)
+    g0 = gv.golden_forward(x_test_u8[TEST_IDX:TEST_IDX + 1], W1, W2, Wd, bd_q15, (S1, S2))
+    for ref, key in [(conv1_out, "c1"), (pool1_out, "p1"), (conv2_out, "c2"),
+                     (pool2_out, "p2"), (fc_out, "logits")]:
+        if not np.array_equal(ref, g0[key][0]):
+            raise RuntimeError(f"[CROSSCHECK] loop vs int_engine mismatch at {key}")
+
+    shards = gv.save_set(OUT_DIR, x_test_u8, SEL_IDX, y_test, W1, W2, Wd, bd_q15,
+                         prefix=args.prefix, shard_size=args.shard_size, shifts=(S1, S2))
+    lines = sum(l for _, _, l, _ in gv.GOLDEN_LAYERS)
+    print("\n------------------------------------------------")
+    print(f"Multi-image golden: {len(SEL_IDX)}장, {len(shards)}개 파일 세트 ({lines}줄/이미지)")
+    for sh in shards:
+        n_ok = int(np.count_nonzero(sh["pred"] == y_test[sh["images"]]))
+        print(f"  {sh['tag']}_*.txt : {sh['n']}장 (정답 {n_ok}/{sh['n']}), index = {sh['tag']}_index.csv")
+    print("------------------------------------------------")
\ No newline at end of file
@@ -0,0 +1,182 @@
+# throughput_analyzer.py
+import json
+import os
+import argparse
+import numpy as np
+
+from rtl_timing_model import CLK_NS, STAGES, CnnCoreTimingModel, frame_pattern
+
+# =============================================================================
+# [cnn_core_top 연속 이미지 처리량 / initiation interval(II) 분석]
+#
+# NPU_CAM_GRAY.srcs/sim_1/new/tb_cnn_10k_verify.v 는 이미지마다 out_valid 를 기다린 뒤 20클럭 쉬고 다음 784픽셀을 넣음.
+# 이게 필요한지 (line buffer / maxpool2_layer / fully_connected(16 입력 -> 10 출력) 가
+# 프레임 겹침을 허용하는지) 를 rtl_timing_model 의 valid 경로 모델로 긴 스트림을 돌려서 확인.
+#
+# ====== 판정 (valid 경로 기준, 데이터 값은 다루지 않음) ======
+#   1) 단별 valid 개수 = 프레임 수 x 단일 프레임 개수   (누락 / 중복 없음)
+#   2) 단별 프레임 간 slack = 프레임 i+1 첫 valid - 프레임 i 마지막 valid - 1 >= 0
+#      (한 단 안에서 두 프레임이 섞이지 않음, 음수면 겹침)
+#   3) 마지막 픽셀 -> out_valid 지연이 모든 프레임에서 같음 (앞뒤 프레임 간섭 없음)
+#   -> 셋 다 만족하면 host 는 out_valid 를 기다릴 필요 없이 다음 프레임을 바로 넣어도 됨
+#      (단, line buffer / pool / fc 카운터는 프레임마다 정확히 784픽셀이 들어와야 다시 정렬됨)
+#
+# ====== 출력 ======
+#   II (out_valid 간격, 중앙값/평균), 125 MHz 기준 images/sec, 동시에 처리 중인 프레임 수
+#   단별 occupancy (valid 비율), 프레임당 활성 구간 / II, 최소 slack, 병목 단
+#   TB 방식 (out_valid 대기 + 20클럭) 과 비교
+#
+# 사용 예:
+#   python 04_throughput_analyzer.py                           # back-to-back 200 프레임
+#   python 04_throughput_analyzer.py --gap 16 --stall-prob 0.05
+#   python 04_throughput_analyzer.py --sweep                   # gap / stall 조합 표
+# =============================================================================
+
+PIX = 784
+# tb_cnn_10k_verify.v: wait(out_valid) -> @(posedge clk) 1 + repeat(20) + 다음 루프 첫 @(posedge clk) 1
+TB_EXTRA = 22
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+
+def single_frame():
+    """단일 프레임 -> (단별 valid 개수, latency = 첫 픽셀 -> out_valid)"""
+    cyc = CnnCoreTimingModel().run(frame_pattern(1), drain=128)
+    counts = {k: len(v) for k, v in cyc.items()}
+    return counts, int(cyc["out_valid"][0] - cyc["data_valid"][0])
+
+def tb_gap(latency: int) -> int:
+    """TB 핸드셰이크가 만드는 프레임 사이 data_valid=0 클럭 수"""
+    return latency + TB_EXTRA - PIX
+
+
+def analyze(dv: np.ndarray, counts: dict, clk_ns: float = CLK_NS) -> dict:
+    cyc = CnnCoreTimingModel().run(dv, drain=256)
+    n = len(cyc["data_valid"]) // counts["data_valid"]
+    res = {"frames": n, "ok_counts": True, "stages": {}}
+
+    for k in ["data_valid"] + STAGES:
+        c = cyc[k]
+        per = counts[k]
+        if len(c) != n * per:
+            res["ok_counts"] = False
+            res["stages"][k] = {"count": int(len(c)), "expected": n * per}
+            continue
+        f = c.reshape(n, per)
+        first, last = f[:, 0], f[:, -1]
+        slack = first[1:] - last[:-1] - 1 if n > 1 else np.array([0])
+        res["stages"][k] = {
+            "per_frame": per,
+            "window": float(np.median(last - first + 1)),
+            "min_slack": int(slack.min()),
+        }
+
+    if not res["ok_counts"]:
+        return res
+
+    pix = cyc["data_valid"].reshape(n, PIX)
+    ov = cyc["out_valid"]
+    tail = ov - pix[:, -1]
+    res["latency_first"] = (int((ov - pix[:, 0]).min()), int((ov - pix[:, 0]).max()))
+    res["latency_tail"] = (int(tail.min()), int(tail.max()))
+    d = np.diff(ov[1:]) if n > 2 else np.diff(ov)            # 첫 프레임 (파이프 채움) 제외
+    ii = float(np.median(d)) if len(d) else float(ov[0] - pix[0, 0] + 1)
+    res["ii"] = ii
+    res["ii_mean"] = float(d.mean()) if len(d) else ii
+    res["images_per_sec"] = 1e9 / (res["ii_mean"] * clk_ns)
+    res["in_flight"] = (res["latency_first"][1] + 1) / ii
+    for k, s in res["stages"].items():
+        s["occupancy"] = s["per_frame"] / res["ii_mean"]
+        s["window_ratio"] = s["window"] / res["ii_mean"]
+    res["bottleneck"] = max(res["stages"], key=lambda k: res["stages"][k]["window_ratio"])
+    res["ok_slack"] = all(s["min_slack"] >= 0 for s in res["stages"].values())
+    res["ok_tail"] = res["latency_tail"][0] == res["latency_tail"][1]
+    res["overlap_safe"] = res["ok_counts"] and res["ok_slack"] and res["ok_tail"]
+    return res
+
+
+def print_report(res: dict, title: str, clk_ns: float):
+    print(f"\n================ {title} ================")
+    if not res["ok_counts"]:
+        print(" [FAIL] valid 개수 불일치 (프레임 누락/중복):")
+        for k, s in res["stages"].items():
+            if "expected" in s:
+                print(f"   {k:<14} {s['count']} != {s['expected']}")
+        return
+    print(f" frames      : {res['frames']}")
+    print(f" II          : {res['ii']:.0f} cyc (mean {res['ii_mean']:.1f})  -> "
+          f"{res['images_per_sec']:,.0f} images/sec @ {1e3 / clk_ns:.0f} MHz")
+    print(f" latency     : first pixel -> out_valid {res['latency_first'][0]}..{res['latency_first'][1]} cyc, "
+          f"last pixel -> out_valid {res['latency_tail'][0]}..{res['latency_tail'][1]} cyc")
+    print(f" in flight   : {res['in_flight']:.2f} frames")
+    print("-----------------------------------------------------------------")
+    print(f" {'stage':<14}{'valid/frame':>12}{'occupancy':>11}{'window':>9}{'win/II':>8}{'min slack':>11}")
+    for k, s in res["stages"].items():
+        mark = "  <- bottleneck" if k == res["bottleneck"] else ""
+        print(f" {k:<14}{s['per_frame']:>12}{s['occupancy'] * 100:>10.1f}%{s['window']:>9.0f}"
+              f"{s['window_ratio'] * 100:>7.1f}%{s['min_slack']:>11}{mark}")
+    print("-----------------------------------------------------------------")
+    verdict = "OK - out_valid 대기 없이 연속 입력 가능" if res["overlap_safe"] else "FAIL - 프레임 간섭"
+    print(f" overlap     : {verdict}  (counts {res['ok_counts']}, slack>=0 {res['ok_slack']}, "
+          f"tail const {res['ok_tail']})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="back-to-back throughput / initiation interval analysis of cnn_core_top")
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--gap", type=int, default=0, help="프레임 사이 data_valid=0 클럭 수")
+    ap.add_argument("--stall-every", type=int, default=0, help="유효 픽셀 N개마다 stall (0=없음)")
+    ap.add_argument("--stall-len", type=int, default=1)
+    ap.add_argument("--stall-prob", type=float, default=0.0, help="픽셀마다 랜덤 1클럭 bubble 확률")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--clk-ns", type=float, default=CLK_NS)
+    ap.add_argument("--sweep", action="store_true", help="gap / stall 조합별 II 표")
+    ap.add_argument("--out", default=os.path.join(BASE, "export", "throughput.json"))
+    args = ap.parse_args()
+
+    counts, latency = single_frame()
+    gap_tb = tb_gap(latency)
+
+    dv = frame_pattern(args.frames, args.gap, args.stall_every, args.stall_len, args.stall_prob, args.seed)
+    res = analyze(dv, counts, args.clk_ns)
+    print_report(res, "cnn_core_top THROUGHPUT", args.clk_ns)
+
+    tb = analyze(frame_pattern(args.frames, gap_tb, args.stall_every, args.stall_len, args.stall_prob, args.seed),
+                 counts, args.clk_ns)
+    if res["ok_counts"] and tb["ok_counts"]:
+        print(f" vs TB       : tb_cnn_10k_verify.v 방식 (gap {gap_tb}) II {tb['ii_mean']:.1f} cyc, "
+              f"{tb['images_per_sec']:,.0f} images/sec -> 현재 설정 {tb['ii_mean'] / res['ii_mean']:.3f}x")
+    print("=================================================================")
+
+    rows = []
+    if args.sweep:
+        configs = [(g, 0, 1, 0.0) for g in (0, 4, 16, 32, gap_tb)]
+        configs += [(0, 28, 1, 0.0), (0, 28, 8, 0.0), (0, 0, 1, 0.05), (0, 0, 1, 0.25)]
+        print(f"\n {'gap':>5}{'stall_every':>12}{'stall_len':>10}{'stall_prob':>11}{'II':>8}{'img/s':>11}"
+              f"{'in_flight':>10}  overlap")
+        for g, se, sl, sp in configs:
+            r = analyze(frame_pattern(min(args.frames, 64), g, se, sl, sp, args.seed), counts, args.clk_ns)
+            if not r["ok_counts"]:
+                print(f" {g:>5}{se:>12}{sl:>10}{sp:>11.2f}  count mismatch")
+                continue
+            rows.append({"gap": g, "stall_every": se, "stall_len": sl, "stall_prob": sp,
+                         "ii": r["ii_mean"], "images_per_sec": r["images_per_sec"],
+                         "overlap_safe": r["overlap_safe"]})
+            print(f" {g:>5}{se:>12}{sl:>10}{sp:>11.2f}{r['ii_mean']:>8.1f}{r['images_per_sec']:>11,.0f}"
+                  f"{r['in_flight']:>10.2f}  {'OK' if r['overlap_safe'] else 'FAIL'}")
+
+    if res["ok_counts"]:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        keep = ("frames", "ii", "ii_mean", "images_per_sec", "in_flight", "latency_first", "latency_tail",
+                "bottleneck", "overlap_safe", "stages")
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "single_frame_latency": latency, "tb_gap": gap_tb,
+                       "result": {k: res[k] for k in keep}, "tb_ii": tb.get("ii_mean"), "sweep": rows},
+                      f, indent=2)
+        print(f"Saved: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# triage_10k_fail.py
+import os
+import re
+import argparse
+import numpy as np
+
+import golden_vectors as gv
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [RTL 대량 검증 실패 분류기]
+#
+# NPU_CAM_GRAY.srcs/sim_1/new/tb_cnn_10k_verify.v 로그의
+#   [FAIL] Image #N: Expected=  7, Got= 2
+# 줄만 골라서, 해당 이미지들에 대해서만 bit-exact 모델(int_engine)을 돌리고 분류.
+#   Expected = 정답 라벨, Got = RTL decision
+#
+# ====== 주의: TB 의 [FAIL] 출력 상한 ======
+#   tb_cnn_10k_verify.v 는 error_cnt <= 20 일 때만 [FAIL] 줄을 찍고, 마지막에
+#   "Errors       : N" 으로 전체 실패 수를 찍음.
+#   N > [FAIL] 줄 수 이면 앞 20개만 분류한 것이므로 경고를 출력하고 exit code 2 로 끝남
+#   -> 전부 분류하려면 TB 의 `if (error_cnt <= 20)` 조건을 늘리거나 지우고 다시 시뮬레이션
+#
+# ====== 분류 ======
+#   model_error    : 모델 pred == Got  -> RTL은 모델과 같음, 모델 자체가 틀린 것 (RTL 정상)
+#   rtl_divergence : 모델 pred != Got  -> RTL이 모델과 다르게 계산함 (RTL 디버깅 대상)
+#     - near_tie   : Got 이 모델의 2등 클래스이고 logit margin(1등-2등)이 --tie 이하
+#                    -> 누산/반올림 1~2 LSB 차이 가능성
+#     - Got 이 x/z  : X 전파 (리셋/초기화 문제)
+#
+# ====== 출력 (export/triage/) ======
+#   triage.csv              : 실패 이미지별 image, expected, got, model_pred, runner_up, margin, category
+#   diverge_*.txt / .csv    : rtl_divergence 이미지들의 레이어별 연결 golden (golden_vectors.save_set)
+#   img_NNNNN/*.txt         : 이미지별 기존 파일 이름(input_img.txt ~ final_pred.txt)
+#                             -> 해당 폴더를 작업 폴더로 tb_cnn_core_top.v 만 다시 돌리면 됨
+#
+# 사용 예:
+#   python 04_triage_10k_fail.py sim_10k.log
+#   python 04_triage_10k_fail.py sim_10k.log --tie 256 --max-dirs 20
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+FAIL_RE = re.compile(r"\[FAIL\]\s*Image\s*#\s*(\d+)\s*:\s*Expected\s*=\s*(\w+)\s*,\s*Got\s*=\s*(\w+)")
+ERRORS_RE = re.compile(r"^\s*Errors\s*:\s*(\d+)")
+
+
+# ----------------------------
+# 1) 로그 파싱
+# ----------------------------
+def parse_fail_log(path: str) -> tuple:
+    """
+    return: ([(image, expected, got)], total_errors)
+      got 이 x/z 면 -1, total_errors = 마지막 "Errors       : N" 값 (없으면 None)
+    """
+    fails, total = [], None
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            m = FAIL_RE.search(line)
+            if m:
+                img, exp, got = m.groups()
+                fails.append((int(img), int(exp) if exp.isdigit() else -1, int(got) if got.isdigit() else -1))
+                continue
+            m = ERRORS_RE.match(line)
+            if m:
+                total = int(m.group(1))
+    return fails, total
+
+def warn_truncated(log: str, n_fail: int, total: int):
+    print("\n" + "!" * 72)
+    print(f"[WARN] {log}: Errors = {total} 인데 [FAIL] 줄은 {n_fail} 개뿐 "
+          f"-> 나머지 {total - n_fail} 개는 분류되지 않음")
+    print("       tb_cnn_10k_verify.v 가 error_cnt <= 20 일 때만 [FAIL] 을 출력함.")
+    print("       `if (error_cnt <= 20)` 상한을 늘리거나 지우고 다시 시뮬레이션한 로그로 돌리세요.")
+    print("!" * 72)
+
+
+# ----------------------------
+# 2) 분류
+# ----------------------------
+def top2(logits: np.ndarray):
+    """return: (pred, runner_up, margin) - 동점이면 낮은 클래스 우선 (RTL comparator의 strict >)"""
+    order = np.argsort(-logits.astype(np.int64), axis=1, kind="stable")
+    rows = np.arange(len(logits))
+    pred, second = order[:, 0], order[:, 1]
+    margin = logits[rows, pred].astype(np.int64) - logits[rows, second]
+    return pred.astype(np.int32), second.astype(np.int32), margin
+
+def classify(got: np.ndarray, pred: np.ndarray, second: np.ndarray, margin: np.ndarray, tie: int) -> list:
+    cats = []
+    for g, p, s, m in zip(got, pred, second, margin):
+        if g == p:
+            cats.append("model_error")
+        elif g < 0:
+            cats.append("rtl_divergence/x")
+        elif g == s and m <= tie:
+            cats.append("rtl_divergence/near_tie")
+        else:
+            cats.append("rtl_divergence")
+    return cats
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="triage [FAIL] lines of tb_cnn_10k_verify.v against the bit-exact model "
+                    "(exit 2 if the log's 'Errors : N' exceeds the printed [FAIL] lines - "
+                    "raise/remove the TB's error_cnt <= 20 cap)")
+    ap.add_argument("log", help="tb_cnn_10k_verify.v 시뮬레이터 로그 (xsim/vivado/iverilog 출력)")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--tie", type=int, default=128, help="near_tie 판정 logit margin (Q15, 128 = 1/256)")
+    ap.add_argument("--out-dir", default=os.path.join(BASE, "export", "triage"))
+    ap.add_argument("--max-dirs", type=int, default=50, help="이미지별 폴더 최대 개수 (0=만들지 않음)")
+    args = ap.parse_args()
+
+    fails, total = parse_fail_log(args.log)
+    truncated = total is not None and total > len(fails)
+    if truncated:
+        warn_truncated(args.log, len(fails), total)
+    if not fails:
+        print(f"[INFO] {args.log}: [FAIL] 줄 없음")
+        if truncated:
+            raise SystemExit(2)
+        return
+
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    shifts = load_shifts(args.npz)
+    x_u8, y = load_mnist_u8("test")
+    y = y.astype(np.int32)
+
+    img = np.array([f[0] for f in fails], dtype=np.int64)
+    exp = np.array([f[1] for f in fails], dtype=np.int32)
+    got = np.array([f[2] for f in fails], dtype=np.int32)
+
+    # 로그의 Expected 가 MNIST 라벨과 다르면 입력 세트가 어긋난 것 (다른 split/오프셋)
+    bad_lbl = np.flatnonzero(exp != y[img])
+    if len(bad_lbl):
+        print(f"[WARN] Expected != MNIST test label for {len(bad_lbl)} images "
+              f"(예: #{img[bad_lbl[0]]}) -> 입력 세트가 test[0:N] 이 맞는지 확인")
+
+    g = gv.golden_forward(x_u8[img], W1, W2, Wd, bd_q15, shifts)
+    pred, second, margin = top2(g["logits"])
+    cats = classify(got, pred, second, margin, args.tie)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    csv_path = os.path.join(args.out_dir, "triage.csv")
+    with open(csv_path, "w") as f:
+        f.write("image,expected,got,model_pred,runner_up,margin,category\n")
+        for k in range(len(img)):
+            f.write(f"{img[k]},{exp[k]},{got[k]},{pred[k]},{second[k]},{margin[k]},{cats[k]}\n")
+
+    # ----------------------------
+    # 리포트
+    # ----------------------------
+    names = sorted(set(cats))
+    print("\n================ TRIAGE ================")
+    print(f" log     : {args.log}")
+    print(f" [FAIL]  : {len(img)} images" + (f" (log Errors = {total})" if total is not None else ""))
+    for c in names:
+        sel = [k for k in range(len(cats)) if cats[k] == c]
+        m = margin[sel]
+        print(f" {c:<26}: {len(sel):>5}  (margin min/median = {m.min()}/{int(np.median(m))})")
+    print("----------------------------------------")
+    print(f" {'image':>6} {'exp':>4} {'got':>4} {'model':>6} {'2nd':>4} {'margin':>8}  category")
+    for k in np.argsort(margin, kind="stable")[:20]:
+        got_s = str(got[k]) if got[k] >= 0 else "x"
+        print(f" {img[k]:>6} {exp[k]:>4} {got_s:>4} {pred[k]:>6} {second[k]:>4} {margin[k]:>8}  {cats[k]}")
+    print("========================================")
+    print(f"Saved: {csv_path}")
+
+    # ----------------------------
+    # RTL divergence -> golden 재생성 (해당 이미지만 재시뮬레이션)
+    # ----------------------------
+    div = np.array([k for k in range(len(cats)) if cats[k] != "model_error"], dtype=np.int64)
+    if len(div) == 0:
+        print("[OK] 로그에 찍힌 실패는 모두 model_error (RTL == bit-exact model)")
+    else:
+        gv.save_set(args.out_dir, x_u8, img[div], y, W1, W2, Wd, bd_q15, prefix="diverge", shifts=shifts)
+        print(f"Saved: {args.out_dir}/diverge_*.txt ({len(div)} images, index = diverge_index.csv)")
+
+        for k in div[:args.max_dirs]:
+            gv.save_single(os.path.join(args.out_dir, f"img_{img[k]:05d}"), g, int(k))
+        if args.max_dirs:
+            print(f"Saved: {min(len(div), args.max_dirs)} per-image dirs "
+                  f"(img_NNNNN/, tb_cnn_core_top.v 작업 폴더로 사용)")
+
+    if truncated:
+        warn_truncated(args.log, len(fails), total)
+        raise SystemExit(2)
+
+if __name__ == "__main__":
+    main()
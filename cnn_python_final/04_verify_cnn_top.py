@@ -1,6 +1,9 @@
 import os
 import numpy as np
 
+from hex_io import load_hex
+from int_engine import load_shifts
+
 # =============================================================================
 # [FPGA 최종 검증용 파이썬 스크립트]
 # - 입력: input_image.txt (RTL 시뮬레이션에 쓴 것과 동일한 파일)
@@ -10,16 +13,9 @@ import numpy as np
 
 def load_hex_image(filepath):
     """ input_image.txt (Hex string)을 읽어서 (28,28) uint8 배열로 변환 """
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    
-    # 빈 줄 제거 및 16진수 변환
-    vals = [int(line.strip(), 16) for line in lines if line.strip()]
-    
-    if len(vals) != 784:
-        raise ValueError(f"Image file size mismatch! Expected 784, got {len(vals)}")
-        
-    return np.array(vals, dtype=np.uint8).reshape(28, 28)
+    # 빈 줄 무시, 784줄이 아니면 ValueError (hex_io.load_hex 에서 검사)
+    vals = load_hex(filepath, width_bits=8, count=784)
+    return vals.reshape(28, 28)
 
 def clamp_u8(v):
     return max(0, min(255, v))
@@ -28,10 +24,16 @@ def requant_shift7(acc):
     """ (acc + 64) >> 7 """
     return clamp_u8((acc + 64) >> 7)
 
+def requant_shift(acc, s):
+    """ (acc + 2^(s-1)) >> s  (npz의 학습된 shift, s=7 이면 requant_shift7) """
+    if s == 7:
+        return requant_shift7(acc)
+    return clamp_u8(((acc + (1 << (s - 1))) >> s) if s > 0 else (acc << -s))
+
 # ----------------------------
 # 레이어 연산 함수 (RTL 동작과 100% 동일)
 # ----------------------------
-def conv5x5_valid(x, W):
+def conv5x5_valid(x, W, shift):
     H, Ww, Cin = x.shape
     Kh, Kw, _, Cout = W.shape
     Hout, Wout = H - 4, Ww - 4
@@ -45,7 +47,7 @@ def conv5x5_valid(x, W):
                     for j in range(5):
                         for ch in range(Cin):
                             acc += int(x[r+i, c+j, ch]) * int(W[i, j, ch, k])
-                out[r, c, k] = requant_shift7(acc)
+                out[r, c, k] = requant_shift(acc, int(shift[k]))
     return out
 
 def maxpool2x2(x):
@@ -93,6 +95,7 @@ def main():
     W2 = pack["W2_q"].astype(np.int8)
     Wd = pack["Wd_q"].astype(np.int8)
     bd = pack["bd_q15"].astype(np.int32)
+    s1, s2 = load_shifts(npz_path)
 
     # 3. 이미지 로드
     img_u8 = load_hex_image(img_path)
@@ -103,11 +106,11 @@ def main():
     x = img_u8.reshape(28, 28, 1)
 
     # [Conv1]
-    c1 = conv5x5_valid(x, W1)
+    c1 = conv5x5_valid(x, W1, s1)
     p1 = maxpool2x2(c1)
     
     # [Conv2]
-    c2 = conv5x5_valid(p1, W2)
+    c2 = conv5x5_valid(p1, W2, s2)
     p2 = maxpool2x2(c2)
 
     # [Flatten]
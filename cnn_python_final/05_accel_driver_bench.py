@@ -0,0 +1,91 @@
+# accel_driver_bench.py
+import argparse
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, infer_batch
+from accel_device import EmulatedAccelerator, core_timing
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [호스트 드라이버 전략 비교 - accel_device.EmulatedAccelerator 위에서]
+#
+#   sync        : submit -> wait -> submit ... (버퍼 1개, 한 번에 1장)
+#   queued x1   : ring 에 계속 넣고 poll 로 회수, 디바이스 입력 버퍼 1개 (업로드와 계산이 안 겹침)
+#   queued x2   : 위와 같고 입력 버퍼 2개 (double buffering, k+1 업로드 || k 계산)
+#   이미지마다 host 작업 --host-cycles (전처리 등) 를 넣어 host / 디바이스 오버랩도 확인
+#
+# ====== 출력 ======
+#   images/sec (가상 125 MHz 기준), cycles/image, 지연 p50/p99,
+#   입력 DMA / 코어 / 결과 DMA 사용률, 입력 DMA-코어 동시 사용 비율
+#   모든 전략의 결과 class / logits 를 infer_batch 와 비트 단위 비교
+#
+# 사용 예:
+#   python 05_accel_driver_bench.py
+#   python 05_accel_driver_bench.py -n 2000 --host-cycles 600 --ring 16
+#   python 05_accel_driver_bench.py --dma-bytes 1 --dma-setup 64      # 느린 DMA (8bit)
+# =============================================================================
+
+def run_sync(dev, x_u8, host_cycles: int) -> list:
+    out = []
+    for img in x_u8:
+        dev.host_work(host_cycles)
+        out.append(dev.wait(dev.submit(img)))
+    return out
+
+def run_queued(dev, x_u8, host_cycles: int) -> list:
+    out = []
+    for img in x_u8:
+        dev.host_work(host_cycles)
+        dev.submit(img)
+        out.extend(dev.poll())
+    out.extend(dev.drain())
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="driver strategies on the emulated cnn_core_top accelerator")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("-n", type=int, default=1000, help="이미지 수")
+    ap.add_argument("--ring", type=int, default=8, help="descriptor ring 크기")
+    ap.add_argument("--host-cycles", type=int, default=0, help="이미지마다 host 작업 cycle")
+    ap.add_argument("--dma-bytes", type=int, default=4, help="DMA byte/cycle (32bit AXI = 4)")
+    ap.add_argument("--dma-setup", type=int, default=32, help="DMA 전송마다 고정 오버헤드 cycle")
+    args = ap.parse_args()
+
+    x_all, _ = load_mnist_u8("test")
+    x_u8 = x_all[:args.n]
+    ref = infer_batch(x_u8, *load_weights(args.npz), shifts=load_shifts(args.npz))
+    timing = core_timing()
+
+    strategies = [
+        ("sync", 1, 1, run_sync),
+        ("queued x1", 1, args.ring, run_queued),
+        ("queued x2", 2, args.ring, run_queued),
+    ]
+
+    print("\n================ ACCELERATOR DRIVER (emulated) ================")
+    print(f" core latency {timing[0]} cyc, II {timing[1]} cyc | DMA {args.dma_bytes} B/cyc + {args.dma_setup} setup"
+          f" | host {args.host_cycles} cyc/img | {args.n} images")
+    print("---------------------------------------------------------------")
+    print(f" {'strategy':<11}{'img/s':>9}{'cyc/img':>9}{'p50 us':>8}{'p99 us':>8}"
+          f"{'dma_in':>8}{'core':>7}{'dma_out':>8}{'overlap':>8}  verify")
+    all_ok = True
+    for name, nb, ring, fn in strategies:
+        dev = EmulatedAccelerator(args.npz, n_buffers=nb, ring_size=ring, dma_bytes_per_cycle=args.dma_bytes,
+                                  dma_setup=args.dma_setup, timing=timing)
+        comps = sorted(fn(dev, x_u8, args.host_cycles), key=lambda c: c.tag)
+        got = np.stack([c.logits for c in comps])
+        ok = (len(comps) == args.n and np.array_equal(got, ref)
+              and all(c.cls == int(np.argmax(r)) for c, r in zip(comps, ref)))
+        all_ok &= ok
+        r = dev.report()
+        print(f" {name:<11}{r['images_per_sec']:>9.0f}{r['cycles_per_image']:>9.1f}"
+              f"{r['latency_p50_us']:>8.2f}{r['latency_p99_us']:>8.2f}"
+              f"{r['util_dma_in'] * 100:>7.1f}%{r['util_core'] * 100:>6.1f}%{r['util_dma_out'] * 100:>7.1f}%"
+              f"{r['overlap_dma_core'] * 100:>7.1f}%  {'OK' if ok else 'MISMATCH'}")
+    print("===============================================================")
+    if not all_ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
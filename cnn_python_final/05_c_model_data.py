@@ -1,27 +1,58 @@
  # gen_header_for_vitis.py
+import argparse
 import numpy as np
 import os
 
+from hex_io import load_hex
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, predict_batch
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [C 벤치마크용 model_data.h 생성]
+#
+# main.c (Cortex-A9, Vitis) : img_in / w1 / w2 / wd / bd  (기존 그대로)
+# bench_portable.c (gcc/pthreads 또는 보드) 용으로 추가:
+#   w1t / w2t : conv weight를 커널 루프 순서로 미리 transpose
+#               (Kh,Kw,Cin,Cout) -> (Cout,Kh,Kw,Cin)  => 출력 채널 1개의 탭이 연속 (stride 1)
+#   wdt       : (48,10) -> (10,48)                   => 출력 1개의 weight가 연속
+#   s1 / s2   : 출력 채널별 requant shift (예전 npz는 전부 7)
+#   test_img / test_label / test_pred : MNIST test 앞 N장, 라벨, bit-exact 모델(int_engine) 예측
+#     -> C 결과가 test_pred 와 1:1 같으면 정수 datapath가 동일
+#
+# 사용 예:
+#   python 05_c_model_data.py                 # N = 1000
+#   python 05_c_model_data.py --n-images 10000
+# =============================================================================
+
+ap = argparse.ArgumentParser(description="model_data.h for main.c / bench_portable.c")
+ap.add_argument("--npz", default=DEFAULT_NPZ)
+ap.add_argument("--n-images", type=int, default=1000, help="test 세트 앞 N장 (0 = 배치 세트 없음)")
+ap.add_argument("--out", default="model_data.h")
+args, _ = ap.parse_known_args()
+
 # 데이터 로드 (경로 확인 필수!)
-pack = np.load("export/mnist_shift_only_fpga_export.npz")
-W1 = pack["W1_q"].astype(np.int8).flatten()
-W2 = pack["W2_q"].astype(np.int8).flatten()
-Wd = pack["Wd_q"].astype(np.int8).flatten()
-bd = pack["bd_q15"].astype(np.int32).flatten()
+W1_q, W2_q, Wd_q, bd_q15 = load_weights(args.npz)
+W1 = W1_q.flatten()
+W2 = W2_q.flatten()
+Wd = Wd_q.flatten()
+bd = bd_q15.astype(np.int32).flatten()
+S1, S2 = load_shifts(args.npz)
 
 # 검증용 이미지 1장 로드
-with open("export/golden_data/input_img.txt", "r") as f:
-    lines = f.readlines()
-img_data = [int(x.strip(), 16) for x in lines]
+img_data = load_hex("export/golden_data/input_img.txt", width_bits=8, count=784)
 
 def write_array(f, name, data, dtype):
+    """16개씩 한 줄 ('v, ' 반복). 10k장(784만 값)도 줄 단위 join으로 처리"""
+    data = np.asarray(data).reshape(-1)
     f.write(f"const {dtype} {name}[{len(data)}] = {{\n")
-    for i, val in enumerate(data):
-        f.write(f"{val}, ")
-        if (i+1) % 16 == 0: f.write("\n")
+    s = data.astype(str)
+    for i in range(0, len(s), 16):
+        row = s[i:i + 16]
+        f.write(", ".join(row) + ", ")
+        if len(row) == 16: f.write("\n")
     f.write("};\n\n")
 
-with open("model_data.h", "w") as f:
+with open(args.out, "w") as f:
     f.write("#ifndef MODEL_DATA_H\n#define MODEL_DATA_H\n\n")
     f.write("#include <stdint.h>\n\n")
     
@@ -30,7 +61,26 @@ with open("model_data.h", "w") as f:
     write_array(f, "w2", W2, "int8_t")
     write_array(f, "wd", Wd, "int8_t")
     write_array(f, "bd", bd, "int32_t")
+
+    # 커널 루프 순서 (Cout, Kh, Kw, Cin) / (Out, In)
+    write_array(f, "w1t", W1_q.transpose(3, 0, 1, 2), "int8_t")
+    write_array(f, "w2t", W2_q.transpose(3, 0, 1, 2), "int8_t")
+    write_array(f, "wdt", Wd_q.T, "int8_t")
+    write_array(f, "s1", S1, "uint8_t")
+    write_array(f, "s2", S2, "uint8_t")
+
+    if args.n_images > 0:
+        x_u8, y = load_mnist_u8("test")
+        x_u8, y = x_u8[:args.n_images], y[:args.n_images]
+        pred = predict_batch(x_u8, W1_q, W2_q, Wd_q, bd_q15, shifts=(S1, S2))
+        f.write(f"#define N_TEST_IMAGES {len(x_u8)}\n\n")
+        write_array(f, "test_img", x_u8, "uint8_t")
+        write_array(f, "test_label", y, "uint8_t")
+        write_array(f, "test_pred", pred, "uint8_t")
     
     f.write("#endif\n")
 
-print("model_data.h 생성 완료! 내용을 복사해서 Vitis에 붙여넣으세요.")
+print(f"{args.out} 생성 완료! 내용을 복사해서 Vitis에 붙여넣으세요.")
+if args.n_images > 0:
+    print(f"  - 배치 세트: test 앞 {len(x_u8)}장 (bit-exact 모델 정확도 {np.mean(pred == y):.4f})")
+    print("  - host 벤치: gcc -O2 -pthread bench_portable.c -o bench_portable && ./bench_portable 4")
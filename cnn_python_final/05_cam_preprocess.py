@@ -0,0 +1,126 @@
+# cam_preprocess_bench.py
+import os
+import time
+import argparse
+import numpy as np
+
+from cam_preprocess import FRAME_SHAPE, FrameRing, Preprocessor, open_source
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, infer_batch
+from int_cache import InferenceCache
+
+# =============================================================================
+# [카메라 프레임 -> 전처리 -> 정수 엔진, frames/sec 측정]
+#
+# cam_preprocess.FrameRing 에 프레임을 push -> 가득 차면 Preprocessor.process (배치 벡터화)
+# -> (N,28,28) u8 을 int_engine.infer_batch 로 바로 추론
+#
+# ====== 출력 ======
+#   전처리만 / 전처리+추론 frames/sec, (synthetic) 정답 라벨 대비 정확도
+#   --save 지정 시 전처리 결과 (N,28,28) u8 과 pred 를 npz로 저장 (검증/데모용)
+#   --cache N 이면 infer_batch 대신 int_cache.InferenceCache (같은 crop 은 재계산 없이 hit)
+#   --repeat K 는 소스 프레임마다 K번 반복 (정지 장면 흉내)
+#
+# 사용 예:
+#   python 05_cam_preprocess.py                                  # synthetic 640x480 512장
+#   python 05_cam_preprocess.py --source frames/ --size 640x480  # .npy/.pgm/.raw 디렉터리
+#   python 05_cam_preprocess.py --source cam_dump.raw --batch 64 --save export/cam/pre.npz
+#   python 05_cam_preprocess.py --repeat 8 --cache 256
+# =============================================================================
+
+def parse_size(s: str) -> tuple:
+    """'640x480' -> (H, W)"""
+    w, h = s.lower().split("x")
+    return int(h), int(w)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="camera frame preprocessing -> int_engine, frames/sec")
+    ap.add_argument("--source", default="synthetic", help="synthetic / 파일 / 디렉터리")
+    ap.add_argument("--size", default=f"{FRAME_SHAPE[1]}x{FRAME_SHAPE[0]}", help="WxH (raw 파일, synthetic)")
+    ap.add_argument("-n", "--frames", type=int, default=512, help="최대 프레임 수")
+    ap.add_argument("--batch", type=int, default=32, help="링 버퍼 크기 (= 전처리/추론 배치)")
+    ap.add_argument("--invert", choices=["auto", "yes", "no"], default="auto")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--no-infer", action="store_true", help="전처리 속도만")
+    ap.add_argument("--save", default=None, help="전처리 결과 npz (x_u8, pred, label)")
+    ap.add_argument("--cache", type=int, default=0, help="추론 LRU 캐시 크기 (0 = 캐시 없음)")
+    ap.add_argument("--repeat", type=int, default=1, help="소스 프레임마다 반복 횟수 (정지 장면)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    shape = parse_size(args.size)
+    invert = {"auto": "auto", "yes": True, "no": False}[args.invert]
+    ring = FrameRing(args.batch, shape)
+    pre = Preprocessor(args.batch, shape, invert=invert)
+    cache = None
+    if not args.no_infer:
+        W1, W2, Wd, bd_q15 = load_weights(args.npz)
+        shifts = load_shifts(args.npz)
+        if args.cache:
+            cache = InferenceCache(args.npz, capacity=args.cache)
+
+    xs, preds, labels = [], [], []
+    batch_labels = []
+    t_pre = t_inf = t_src = 0.0
+
+    def flush():
+        nonlocal t_pre, t_inf
+        t0 = time.perf_counter()
+        x = pre.process(ring.view())
+        t1 = time.perf_counter()
+        if not args.no_infer:
+            if cache is not None:
+                logits = cache.infer(x)
+            else:
+                logits = infer_batch(x, W1, W2, Wd, bd_q15, shifts=shifts)
+            preds.append(np.argmax(logits, axis=1).astype(np.int32))
+        t_pre += t1 - t0
+        t_inf += time.perf_counter() - t1
+        xs.append(x.copy())
+        labels.extend(batch_labels)
+        batch_labels.clear()
+        ring.clear()
+
+    t0 = time.perf_counter()
+    n_src = -(-args.frames // max(args.repeat, 1))
+    pushed = 0
+    for frame, label in open_source(args.source, shape, n=n_src, seed=args.seed):
+        t_src += time.perf_counter() - t0
+        for _ in range(min(max(args.repeat, 1), args.frames - pushed)):   # 마지막 소스 프레임은 -n 까지만 반복
+            batch_labels.append(label)
+            pushed += 1
+            if ring.push(frame):
+                flush()
+        t0 = time.perf_counter()
+    if len(ring):
+        flush()
+
+    n = sum(len(x) for x in xs)
+    if n == 0:
+        print(f"[INFO] {args.source}: 프레임 없음")
+        return
+    x_all = np.concatenate(xs)
+    y = np.array(labels, dtype=np.int32)
+
+    print("\n================ CAMERA PREPROCESS ================")
+    print(f" source      : {args.source} ({shape[1]}x{shape[0]}, {n} frames, batch {args.batch})")
+    print(f" source read : {t_src:.2f} sec (측정 제외)")
+    print(f" preprocess  : {n / t_pre:10.1f} frames/sec  ({t_pre * 1e3 / n:.2f} ms/frame)")
+    if not args.no_infer:
+        pred = np.concatenate(preds)
+        print(f" + int infer : {n / (t_pre + t_inf):10.1f} frames/sec  (추론 {t_inf * 1e3 / n:.3f} ms/frame)")
+        if cache is not None:
+            print(f" cache       : {cache.report()}")
+        if np.all(y >= 0):
+            print(f" accuracy    : {np.mean(pred == y):.4f} (synthetic label)")
+        else:
+            print(f" pred hist   : {np.bincount(pred, minlength=10).tolist()}")
+    print("===================================================")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        np.savez(args.save, x_u8=x_all, label=y, **({} if args.no_infer else {"pred": pred}))
+        print(f"Saved: {args.save}")
+
+if __name__ == "__main__":
+    main()
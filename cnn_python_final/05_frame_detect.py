@@ -0,0 +1,212 @@
+# frame_detect.py
+import os
+import time
+import argparse
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from int_engine import DEFAULT_NPZ, FRAME_STRIDE, load_weights, load_shifts, forward_frame, infer_batch
+
+# =============================================================================
+# [full-frame 글씨 검출 - conv feature map 공유 sliding window]
+#
+# 프레임 안 어디에 있는 글씨든 찾으려면 28x28 crop 마다 infer_one 을 돌려야 했음
+# -> 겹치는 crop 끼리 같은 conv1/conv2 출력을 수천 번 다시 계산.
+#
+# int_engine.forward_frame:
+#   conv1 / pool / conv2 / pool 을 프레임 전체에 1번 (같은 bit-exact requant)
+#   dense(48->10) 를 p2 맵 위 4x4 창으로 -> 4픽셀 stride 위치마다 logits (class / logit heatmap)
+#   결과는 위치 (4i, 4j) 의 28x28 crop 을 따로 추론한 것과 비트 단위로 같음 (--verify 로 확인)
+#
+# ====== 검출 ======
+#   margin = top1 - top2 logit, margin >= --thr 이고 주변 (2r+1)^2 창에서 최대인 위치 = 검출
+#   단, 창 평균 밝기(ink)가 --min-ink 미만이면 제외 (빈 배경도 bias 때문에 한 class로 큰 margin이 나옴)
+#   canvas 소스는 정답 위치/라벨이 있으므로 글씨마다 가장 가까운 검출의 class 로 정확도 계산
+#
+# ====== 출력 ======
+#   export/frame_detect.npz : logits (N,Ho,Wo,10), cls, margin, detections (frame, y, x, class, margin)
+#
+# 사용 예:
+#   python 05_frame_detect.py                               # 240x320 검은 캔버스에 MNIST 글씨 6개
+#   python 05_frame_detect.py --compare                     # crop-by-crop 과 속도/MAC/결과 비교
+#   python 05_frame_detect.py --source frames/ --invert     # 카메라 프레임 (종이 위 검은 글씨)
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+WIN = 28
+
+
+# ----------------------------
+# 1) 소스
+# ----------------------------
+def canvas_frames(n: int, shape: tuple, digits_per_frame: int, seed: int = 0):
+    """
+    검은 캔버스에 MNIST test 글씨(원래 크기 28x28)를 겹치지 않게 배치
+    return: frames (n,H,W) u8, truth [(frame, y, x, label)] (y, x = 28x28 창 좌상단)
+    """
+    from mnist_data import load_mnist_u8
+    x_u8, y = load_mnist_u8("test")
+    H, W = shape
+    rng = np.random.default_rng(seed)
+    frames = np.zeros((n, H, W), dtype=np.uint8)
+    truth = []
+    for f in range(n):
+        boxes = []
+        for _ in range(digits_per_frame * 20):
+            if len(boxes) == digits_per_frame:
+                break
+            oy, ox = int(rng.integers(0, H - WIN + 1)), int(rng.integers(0, W - WIN + 1))
+            if any(abs(oy - by) < WIN and abs(ox - bx) < WIN for by, bx in boxes):
+                continue
+            idx = int(rng.integers(len(x_u8)))
+            frames[f, oy:oy + WIN, ox:ox + WIN] = x_u8[idx]
+            boxes.append((oy, ox))
+            truth.append((f, oy, ox, int(y[idx])))
+    return frames, truth
+
+def file_frames(spec: str, shape: tuple, n: int, invert: bool) -> np.ndarray:
+    from cam_preprocess import open_source
+    frames = np.array([fr for fr, _ in open_source(spec, shape, n=n)], dtype=np.uint8)
+    return 255 - frames if invert else frames
+
+
+# ----------------------------
+# 2) heatmap -> 검출
+# ----------------------------
+def top2_margin(logits: np.ndarray):
+    """(...,10) -> cls (동점이면 낮은 클래스), margin = top1 - top2"""
+    cls = np.argmax(logits, axis=-1).astype(np.int32)
+    part = np.partition(logits.astype(np.int64), -2, axis=-1)
+    return cls, part[..., -1] - part[..., -2]
+
+def window_ink(frames: np.ndarray, Ho: int, Wo: int) -> np.ndarray:
+    """stride 4 위치마다 28x28 창 평균 밝기 (N,Ho,Wo) - 적분 영상"""
+    S = np.zeros((len(frames), frames.shape[1] + 1, frames.shape[2] + 1), dtype=np.int64)
+    S[:, 1:, 1:] = frames.cumsum(axis=1, dtype=np.int64).cumsum(axis=2)
+    y = np.arange(Ho) * FRAME_STRIDE
+    x = np.arange(Wo) * FRAME_STRIDE
+    box = (S[:, y[:, None] + WIN, x[None, :] + WIN] - S[:, y[:, None], x[None, :] + WIN]
+           - S[:, y[:, None] + WIN, x[None, :]] + S[:, y[:, None], x[None, :]])
+    return box / (WIN * WIN)
+
+def detect(cls: np.ndarray, margin: np.ndarray, thr: int, radius: int = 3, valid=None) -> list:
+    """
+    margin 이 thr 이상이고 (2r+1)^2 이웃 최대인 위치 -> [(frame, y, x, class, margin)] (y, x = 픽셀)
+    valid: (N,Ho,Wo) bool - False 인 위치는 후보/이웃 비교 모두에서 제외
+    """
+    if valid is not None:
+        margin = np.where(valid, margin, np.iinfo(np.int64).min)
+    pad = np.pad(margin, ((0, 0), (radius, radius), (radius, radius)), constant_values=np.iinfo(np.int64).min)
+    local_max = sliding_window_view(pad, (2 * radius + 1, 2 * radius + 1), axis=(1, 2)).max(axis=(-2, -1))
+    f, i, j = np.nonzero((margin >= thr) & (margin == local_max))
+    return [(int(a), int(b) * FRAME_STRIDE, int(c) * FRAME_STRIDE, int(cls[a, b, c]), int(margin[a, b, c]))
+            for a, b, c in zip(f, i, j)]
+
+def match_truth(dets: list, truth: list) -> float:
+    """정답 글씨마다 같은 프레임의 가장 가까운 검출 (stride 이내) class 비교 -> 정확도"""
+    hit = 0
+    for f, ty, tx, label in truth:
+        cand = [(abs(y - ty) + abs(x - tx), c) for ff, y, x, c, _ in dets if ff == f]
+        if cand:
+            d, c = min(cand)
+            hit += int(d <= 2 * FRAME_STRIDE and c == label)
+    return hit / max(len(truth), 1)
+
+def mac_counts(H: int, W: int, W1, W2, Wd, Ho: int, Wo: int) -> tuple:
+    """(full-frame MAC, crop-by-crop MAC) - conv/dense 곱셈 횟수"""
+    k1, k2, c1, c2 = W1.shape[0], W2.shape[0], W1.shape[-1], W2.shape[-1]
+    def net(h, w):
+        h1, w1 = h - k1 + 1, w - k1 + 1
+        h2, w2 = h1 // 2 - k2 + 1, w1 // 2 - k2 + 1
+        return h1 * w1 * c1 * k1 * k1 * W1.shape[2], h2 * w2 * c2 * k2 * k2 * c1
+    full = sum(net(H, W)) + Ho * Wo * Wd.size
+    crop = Ho * Wo * (sum(net(WIN, WIN)) + Wd.size)
+    return full, crop
+
+
+def main():
+    ap = argparse.ArgumentParser(description="full-frame sliding-window digit detection (shared conv maps)")
+    ap.add_argument("--source", default="canvas", help="canvas / 파일 / 디렉터리 (cam_preprocess 소스)")
+    ap.add_argument("--size", default="320x240", help="WxH")
+    ap.add_argument("-n", "--frames", type=int, default=4)
+    ap.add_argument("--digits", type=int, default=6, help="canvas 프레임당 글씨 수")
+    ap.add_argument("--invert", action="store_true", help="파일 소스가 밝은 배경/검은 글씨일 때")
+    ap.add_argument("--thr", type=int, default=2048, help="검출 margin (top1-top2, Q15)")
+    ap.add_argument("--min-ink", type=float, default=16.0, help="창 평균 밝기 하한 (u8, 빈 배경 제외)")
+    ap.add_argument("--verify", type=int, default=64, help="무작위 창 K개를 crop 추론과 비교 (0=생략)")
+    ap.add_argument("--compare", action="store_true", help="모든 창을 crop-by-crop 으로도 추론해서 시간 비교")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--out", default=os.path.join(BASE, "export", "frame_detect.npz"))
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    w, h = args.size.lower().split("x")
+    shape = (int(h), int(w))
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    shifts = load_shifts(args.npz)
+
+    truth = []
+    if args.source == "canvas":
+        frames, truth = canvas_frames(args.frames, shape, args.digits, args.seed)
+    else:
+        frames = file_frames(args.source, shape, args.frames, args.invert)
+    N, H, W = frames.shape
+
+    t0 = time.perf_counter()
+    g = forward_frame(frames, W1, W2, Wd, bd_q15, shifts=shifts)
+    t_full = time.perf_counter() - t0
+    logits = g["logits"]
+    Ho, Wo = logits.shape[1:3]
+    cls, margin = top2_margin(logits)
+    ink = window_ink(frames, Ho, Wo)
+    dets = detect(cls, margin, args.thr, valid=ink >= args.min_ink)
+
+    full_mac, crop_mac = mac_counts(H, W, W1, W2, Wd, Ho, Wo)
+    print("\n================ FULL-FRAME DETECT ================")
+    print(f" frames     : {N} x {W}x{H}  ->  heatmap {Wo}x{Ho} (stride {FRAME_STRIDE})")
+    print(f" full-frame : {t_full * 1e3 / N:.1f} ms/frame")
+    print(f" MAC/frame  : full {full_mac / 1e6:.1f} M  vs  crop-by-crop {crop_mac / 1e6:.1f} M "
+          f"({crop_mac / full_mac:.1f}x)")
+
+    # ----------------------------
+    # 검증: 무작위 창을 28x28 crop 으로 따로 추론 -> 비트 단위 비교
+    # ----------------------------
+    rng = np.random.default_rng(args.seed)
+    if args.verify > 0:
+        f = rng.integers(N, size=args.verify)
+        i, j = rng.integers(Ho, size=args.verify), rng.integers(Wo, size=args.verify)
+        crops = np.stack([frames[a, b * FRAME_STRIDE:b * FRAME_STRIDE + WIN, c * FRAME_STRIDE:c * FRAME_STRIDE + WIN]
+                          for a, b, c in zip(f, i, j)])
+        ref = infer_batch(crops, W1, W2, Wd, bd_q15, shifts=shifts)
+        bad = int(np.count_nonzero(np.any(ref != logits[f, i, j], axis=1)))
+        print(f" verify     : {args.verify} random windows vs crop inference -> "
+              f"{'bit-exact' if bad == 0 else f'{bad} MISMATCH'}")
+
+    if args.compare:
+        crops = sliding_window_view(frames, (WIN, WIN), axis=(1, 2))[:, ::FRAME_STRIDE, ::FRAME_STRIDE]
+        crops = np.ascontiguousarray(crops[:, :Ho, :Wo]).reshape(-1, WIN, WIN)
+        t0 = time.perf_counter()
+        ref = infer_batch(crops, W1, W2, Wd, bd_q15, shifts=shifts).reshape(N, Ho, Wo, -1)
+        t_crop = time.perf_counter() - t0
+        print(f" crop-by-crop: {t_crop * 1e3 / N:.1f} ms/frame ({len(crops) // N} crops/frame) -> "
+              f"{t_crop / t_full:.1f}x slower, {'bit-exact' if np.array_equal(ref, logits) else 'MISMATCH'}")
+
+    print(f" detections : {len(dets)} (margin >= {args.thr}, ink >= {args.min_ink:g})")
+    for d in dets[:12]:
+        print(f"   frame {d[0]}  y={d[1]:>4} x={d[2]:>4}  class {d[3]}  margin {d[4]}")
+    if truth:
+        print(f" accuracy   : {match_truth(dets, truth):.4f} ({len(truth)} digits, nearest detection)")
+    print("===================================================")
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    np.savez(args.out, logits=logits, cls=cls, margin=margin, ink=ink,
+             detections=np.array(dets, dtype=np.int64).reshape(-1, 5),
+             truth=np.array(truth, dtype=np.int64).reshape(-1, 4))
+    print(f"Saved: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,45 @@
 import numpy as np
 import os
+import argparse
 import urllib.request
 
+from hex_io import save_hex
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [데모용 이미지 ROM 생성기]
+#
+# 기본 (인자 없음) : 기존 rom_16_images.v (조합 case문, 16장, 값 > 10 만 기록)
+# --mode bram      : BRAM 추론용 동기 ROM + 초기화 파일 (이미지 수 자유, 픽셀 값 그대로)
+#   <name>.mem  : $readmemh 용, 이미지당 1024줄 (784 픽셀 + 240 패딩 0)
+#                 주소 = {img_idx, pixel_idx} -> 기존 case문과 같은 주소 체계 (곱셈기 없음)
+#   <name>.coe  : Vivado Block Memory Generator 용 (같은 내용)
+#   <name>_bram.v : (* rom_style = "block" *) + always @(posedge clk) data_out <= rom[addr]
+#   <name>_labels.mem : 정답 라벨 (참고용)
+#   -> 이미지를 늘려도 Verilog 소스 크기/합성 시간/LUT 는 그대로 (BRAM만 늘어남)
+#      예) 256장 = 256K x 8bit = 2Mbit (RAMB36 64개), 1024장 = 8Mbit 은 xc7z020 BRAM(4.9Mbit) 초과 -> --rle 사용
+#
+# --rle            : 추가로 run-length 압축 ROM + 디코더
+#   <name>_rle.mem  : 16bit 워드 {run-1[15:8], value[7:0]}, run은 이미지 경계를 넘지 않음 (최대 256)
+#   <name>_rle_idx.mem : 이미지별 시작 워드 주소
+#   <name>_rle.v    : start 펄스 -> pix_valid/pix_data/pix_last 로 784픽셀 스트리밍
+#                     길이 1인 run 직후에만 1클럭 bubble (cnn_core_top 은 data_valid gap 허용)
+#
+# ====== fpga_top_demo.v 연결 시 주의 (동기 ROM = 1클럭 읽기 지연) ======
+#   기존 rom_16_images 는 조합 출력이라 RUN 상태에서 rom_data 가 pixel_cnt 주소의 값.
+#   BRAM 버전은 한 클럭 늦게 나오므로 주소를 한 클럭 앞서 줘야 함:
+#       wire [9:0] rom_addr = (state == RUN) ? pixel_cnt + 10'd1 : 10'd0;
+#       rom_images_bram u_rom (.clk(sys_clk), .img_idx(sw), .pixel_idx(rom_addr), .data_out(rom_data));
+#   (IDLE 에서 주소 0을 미리 읽어 두므로 RUN 첫 클럭에 픽셀 0이 준비됨, 나머지 로직은 그대로)
+#
+# 사용 예:
+#   python 05_gen_rom_16_images_fpga_demo.py                           # 기존 16장 case문
+#   python 05_gen_rom_16_images_fpga_demo.py --mode bram --n 256
+#   python 05_gen_rom_16_images_fpga_demo.py --mode bram --n 1024 --rle
+# =============================================================================
+
+VERILOG_ENCODING = "cp949"   # 저장소의 .v 파일들과 같은 인코딩 (Vivado 프로젝트 한글 주석)
+
 def generate_verilog_rom():
     # ---------------------------------------------------------
     # 1. MNIST 데이터셋 직접 다운로드 (TensorFlow 없어도 됨)
@@ -72,5 +110,246 @@ def generate_verilog_rom():
     print("-> Vivado 프로젝트에 이 파일을 Add Sources 하세요.")
     print("-> 콘솔에 출력된 [정답 라벨]을 꼭 적어두세요!")
 
+
+# ---------------------------------------------------------
+# BRAM 모드
+# ---------------------------------------------------------
+PIX = 784
+STRIDE = 1024   # 이미지당 주소 공간 (pixel_idx 10bit)
+
+def _bits(n: int) -> int:
+    """0..n-1 을 담는 비트 수 (최소 1)"""
+    return max(1, int(n - 1).bit_length())
+
+def save_coe(path: str, words: np.ndarray, digits: int):
+    """Vivado .coe (radix 16)"""
+    w = np.asarray(words, dtype=np.int64).reshape(-1)
+    body = ",\n".join(f"{int(v):0{digits}X}" for v in w)
+    with open(path, "w") as f:
+        f.write("memory_initialization_radix=16;\n")
+        f.write("memory_initialization_vector=\n")
+        f.write(body + ";\n")
+
+def rle_encode(images: np.ndarray):
+    """
+    images: (N,784) u8
+    return: (words (W,) uint16 = (run-1)<<8 | value, starts (N,) 이미지별 시작 워드 주소)
+    """
+    words, starts, n = [], [], 0
+    for img in images:
+        starts.append(n)
+        # 값이 바뀌는 위치 + 256픽셀마다 강제로 끊기
+        change = np.flatnonzero(np.diff(img.astype(np.int16)) != 0) + 1
+        bounds = np.unique(np.concatenate([[0], change, np.arange(0, PIX, 256), [PIX]]))
+        run = np.diff(bounds)
+        val = img[bounds[:-1]]
+        words.append(((run - 1).astype(np.uint16) << 8) | val.astype(np.uint16))
+        n += len(run)
+    return np.concatenate(words), np.array(starts, dtype=np.int64)
+
+def rle_decode(words: np.ndarray, starts: np.ndarray, k: int) -> np.ndarray:
+    """rle_encode 역변환 (검증용) -> (784,) u8"""
+    out, a, n = [], int(starts[k]), 0
+    while n < PIX:
+        w = int(words[a])
+        out.append(np.full((w >> 8) + 1, w & 0xFF, dtype=np.uint8))
+        n += (w >> 8) + 1
+        a += 1
+    return np.concatenate(out)
+
+def write_bram_verilog(path: str, name: str, n_img: int):
+    ib = _bits(n_img)
+    with open(path, "w", encoding=VERILOG_ENCODING) as f:
+        f.write(f"""// 05_gen_rom_16_images_fpga_demo.py --mode bram 으로 생성됨 (직접 수정 X)
+// 동기 ROM: data_out 은 주소를 준 다음 클럭에 나옴 (1클럭 지연)
+module {name}_bram #(
+    parameter N_IMG    = {n_img},
+    parameter IMG_BITS = {ib},
+    parameter MEM_FILE = "{name}.mem"
+)(
+    input  wire                clk,
+    input  wire [IMG_BITS-1:0] img_idx,   // 이미지 번호
+    input  wire [9:0]          pixel_idx, // 0~783 픽셀 위치
+    output reg  [7:0]          data_out   // 픽셀 값 (1클럭 뒤)
+);
+
+    localparam DEPTH = N_IMG * {STRIDE};
+
+    (* rom_style = "block" *) reg [7:0] rom [0:DEPTH-1];
+
+    initial begin
+        $readmemh(MEM_FILE, rom);
+    end
+
+    always @(posedge clk) begin
+        data_out <= rom[{{img_idx, pixel_idx}}];
+    end
+
+endmodule
+""")
+
+def write_rle_verilog(path: str, name: str, n_img: int, n_words: int):
+    ib, ab = _bits(n_img), _bits(n_words)
+    with open(path, "w", encoding=VERILOG_ENCODING) as f:
+        f.write(f"""// 05_gen_rom_16_images_fpga_demo.py --mode bram --rle 로 생성됨 (직접 수정 X)
+// RLE 압축 이미지 ROM + 디코더
+//   워드 = {{run-1[15:8], value[7:0]}}, 이미지 시작 주소는 IDX_FILE
+//   start 펄스(busy=0 일 때) -> 784 픽셀을 pix_valid/pix_data 로 출력, 마지막 픽셀에 pix_last
+//   길이 1인 run 직후에만 1클럭 bubble (pix_valid=0) -> cnn_core_top 의 data_valid 에 그대로 연결 가능
+module {name}_rle #(
+    parameter N_IMG     = {n_img},
+    parameter IMG_BITS  = {ib},
+    parameter N_WORDS   = {n_words},
+    parameter ADDR_BITS = {ab},
+    parameter RLE_FILE  = "{name}_rle.mem",
+    parameter IDX_FILE  = "{name}_rle_idx.mem"
+)(
+    input  wire                clk,
+    input  wire                rst_n,
+    input  wire                start,
+    input  wire [IMG_BITS-1:0] img_idx,
+    output reg                 pix_valid,
+    output reg  [7:0]          pix_data,
+    output reg                 pix_last,
+    output wire                busy
+);
+
+    (* rom_style = "block" *) reg [15:0]          rle_rom [0:N_WORDS-1];
+    (* rom_style = "block" *) reg [ADDR_BITS-1:0] idx_rom [0:N_IMG-1];
+
+    initial begin
+        $readmemh(RLE_FILE, rle_rom);
+        $readmemh(IDX_FILE, idx_rom);
+    end
+
+    // 동기 읽기 (BRAM)
+    reg [ADDR_BITS-1:0] rd_addr;   // 다음에 소비할 워드 주소
+    reg [15:0]          word_q;    // = rle_rom[이전 클럭의 rd_addr]
+    reg [ADDR_BITS-1:0] idx_q;
+
+    always @(posedge clk) begin
+        word_q <= rle_rom[rd_addr];
+        idx_q  <= idx_rom[img_idx];
+    end
+
+    reg       pending;   // start 다음 클럭: idx_q 대기
+    reg       active;
+    reg       have_run;
+    reg [8:0] cnt;       // 현재 run 남은 픽셀 수 (1~256)
+    reg [7:0] val;
+    reg [9:0] pix_cnt;
+    reg       moved;     // 직전 클럭에 rd_addr 가 바뀜 -> word_q 아직 이전 주소 값
+
+    wire emit    = active && have_run;
+    wire is_last = emit && (pix_cnt == 10'd783);
+    wire run_end = !have_run || (cnt == 9'd1);
+    wire load    = active && run_end && !moved && !is_last;
+
+    assign busy = pending || active;
+
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            pending   <= 0;
+            active    <= 0;
+            have_run  <= 0;
+            cnt       <= 0;
+            val       <= 0;
+            pix_cnt   <= 0;
+            rd_addr   <= 0;
+            moved     <= 0;
+            pix_valid <= 0;
+            pix_data  <= 0;
+            pix_last  <= 0;
+        end else begin
+            // 출력 (registered)
+            pix_valid <= emit;
+            pix_data  <= val;
+            pix_last  <= is_last;
+
+            if (!busy) begin
+                if (start) pending <= 1;
+            end else if (pending) begin
+                // idx_q = idx_rom[img_idx] 준비됨
+                pending  <= 0;
+                active   <= 1;
+                have_run <= 0;
+                pix_cnt  <= 0;
+                rd_addr  <= idx_q;
+                moved    <= 1;
+            end else begin
+                if (emit) begin
+                    pix_cnt <= pix_cnt + 10'd1;
+                    cnt     <= cnt - 9'd1;
+                end
+
+                if (load) begin
+                    cnt      <= {{1'b0, word_q[15:8]}} + 9'd1;
+                    val      <= word_q[7:0];
+                    have_run <= 1;
+                    rd_addr  <= rd_addr + 1'b1;
+                    moved    <= 1;
+                end else begin
+                    moved <= 0;
+                    if (run_end) have_run <= 0;
+                end
+
+                if (is_last) active <= 0;
+            end
+        end
+    end
+
+endmodule
+""")
+
+def generate_bram_rom(n_img: int, name: str, out_dir: str, rle: bool):
+    x_test, y_test = load_mnist_u8("test")
+    if n_img > len(x_test):
+        raise ValueError(f"--n {n_img} > test set {len(x_test)}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    images = np.asarray(x_test[:n_img]).reshape(n_img, PIX)
+    labels = np.asarray(y_test[:n_img])
+
+    # 이미지당 1024 주소 (784 픽셀 + 0 패딩)
+    mem = np.zeros((n_img, STRIDE), dtype=np.uint8)
+    mem[:, :PIX] = images
+    save_hex(os.path.join(out_dir, f"{name}.mem"), mem, 8)
+    save_coe(os.path.join(out_dir, f"{name}.coe"), mem, 2)
+    save_hex(os.path.join(out_dir, f"{name}_labels.mem"), labels, 4)
+    write_bram_verilog(os.path.join(out_dir, f"{name}_bram.v"), name, n_img)
+
+    print(f"[BRAM] {n_img} images -> {name}.mem / {name}.coe / {name}_bram.v "
+          f"({n_img * STRIDE * 8 / 1e6:.2f} Mbit, img_idx {_bits(n_img)} bit)")
+
+    if rle:
+        words, starts = rle_encode(images)
+        for k in range(n_img):
+            if not np.array_equal(rle_decode(words, starts, k), images[k]):
+                raise RuntimeError(f"RLE round-trip mismatch at image {k}")
+        save_hex(os.path.join(out_dir, f"{name}_rle.mem"), words, 16)
+        save_coe(os.path.join(out_dir, f"{name}_rle.coe"), words, 4)
+        save_hex(os.path.join(out_dir, f"{name}_rle_idx.mem"), starts, 16 if _bits(len(words)) <= 16 else 32)
+        write_rle_verilog(os.path.join(out_dir, f"{name}_rle.v"), name, n_img, len(words))
+        print(f"[RLE ] {len(words)} words x 16bit = {len(words) * 16 / 1e6:.2f} Mbit "
+              f"(raw {n_img * PIX * 8 / 1e6:.2f} Mbit, {len(words) * 16 / (n_img * PIX * 8) * 100:.1f}%)")
+
+    print(f"★ 정답 라벨 (앞 16장): {labels[:16]}")
+    print(f"[완료] {out_dir} -> fpga_top_demo.v 연결 시 1클럭 읽기 지연 주의 (파일 상단 주석 참고)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="demo image ROM generator (legacy case / BRAM init files)")
+    ap.add_argument("--mode", choices=["case", "bram"], default="case")
+    ap.add_argument("--n", type=int, default=256, help="bram 모드 이미지 수")
+    ap.add_argument("--name", default="rom_images")
+    ap.add_argument("--out-dir", default=os.getcwd())
+    ap.add_argument("--rle", action="store_true", help="RLE 압축 ROM + 디코더도 생성")
+    args = ap.parse_args()
+
+    if args.mode == "case":
+        generate_verilog_rom()
+    else:
+        generate_bram_rom(args.n, args.name, args.out_dir, args.rle)
+
 if __name__ == "__main__":
-    generate_verilog_rom()
\ No newline at end of file
+    main()
\ No newline at end of file
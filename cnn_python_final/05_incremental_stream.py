@@ -0,0 +1,105 @@
+# incremental_stream.py
+import time
+import argparse
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, forward_frame
+from int_incremental import IncrementalEngine
+
+# =============================================================================
+# [카메라 스트림 증분 재추론 벤치 - 바뀐 영역만 다시 계산 vs 매 프레임 전체 계산]
+#
+# 합성 스트림 (모델 입력 도메인: 검은 배경 / 흰 글씨):
+#   고정된 MNIST 글씨 몇 개 + 매 프레임 1~2 px 씩 움직이는 글씨 1개 (--move)
+#   + 프레임마다 임의 픽셀 --noise 개 변경 (센서 노이즈), --static 비율의 프레임은 완전히 동일
+#
+# 프레임마다 int_incremental.IncrementalEngine.update 와 forward_frame(전체)을 둘 다 돌려서
+#   - logits 맵 비트 단위 비교 (--no-verify 면 전체 계산은 시간 측정용으로만)
+#   - 레이어별 재계산 비율, dense 생략 횟수, 시간 비교
+#
+# 사용 예:
+#   python 05_incremental_stream.py                      # 320x240, 200 프레임
+#   python 05_incremental_stream.py --size 28x28 --noise 3
+#   python 05_incremental_stream.py --static 0.5 --no-move
+# =============================================================================
+
+def make_stream(n: int, shape: tuple, digits: int, move: bool, noise: int, static: float, seed: int = 0):
+    """(frame (H,W) u8) 제너레이터"""
+    from mnist_data import load_mnist_u8
+    x_u8, _ = load_mnist_u8("test")
+    H, W = shape
+    rng = np.random.default_rng(seed)
+    base = np.zeros(shape, dtype=np.uint8)
+    for _ in range(digits if H > 28 or W > 28 else 0):
+        oy, ox = int(rng.integers(0, H - 27)), int(rng.integers(0, W - 27))
+        np.maximum(base[oy:oy + 28, ox:ox + 28], x_u8[int(rng.integers(len(x_u8)))],
+                   out=base[oy:oy + 28, ox:ox + 28])
+    sprite = x_u8[int(rng.integers(len(x_u8)))]
+    py, px = (H - 28) // 2, (W - 28) // 2
+    vy, vx = 1, 2
+    frame = base.copy()
+    for t in range(n):
+        if t > 0 and rng.random() < static:
+            yield frame
+            continue
+        frame = base.copy()
+        if move and (H > 28 or W > 28):
+            py, px = py + vy, px + vx
+            if not 0 <= py <= H - 28:
+                vy, py = -vy, min(max(py, 0), H - 28)
+            if not 0 <= px <= W - 28:
+                vx, px = -vx, min(max(px, 0), W - 28)
+        np.maximum(frame[py:py + 28, px:px + 28], sprite, out=frame[py:py + 28, px:px + 28])
+        if noise:
+            idx = rng.integers(0, frame.size, noise)
+            frame.flat[idx] = rng.integers(0, 256, noise)
+        yield frame
+
+
+def main():
+    ap = argparse.ArgumentParser(description="incremental (dirty-rect) re-inference vs full inference on a stream")
+    ap.add_argument("--size", default="320x240", help="WxH (28x28 = 단일 입력 스트림)")
+    ap.add_argument("-n", "--frames", type=int, default=200)
+    ap.add_argument("--digits", type=int, default=6, help="고정 글씨 수")
+    ap.add_argument("--no-move", action="store_true", help="움직이는 글씨 없음")
+    ap.add_argument("--noise", type=int, default=0, help="프레임마다 바뀌는 임의 픽셀 수")
+    ap.add_argument("--static", type=float, default=0.2, help="이전과 완전히 같은 프레임 비율")
+    ap.add_argument("--tile", type=int, default=4, help="dirty rect 타일 크기 (입력 px)")
+    ap.add_argument("--full-above", type=float, default=0.5, help="c2 재계산 면적 비율이 이보다 크면 전체 계산")
+    ap.add_argument("--no-verify", action="store_true", help="logits 비교 생략 (전체 계산 시간은 측정)")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    w, h = args.size.lower().split("x")
+    shape = (int(h), int(w))
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    shifts = load_shifts(args.npz)
+    eng = IncrementalEngine(W1, W2, Wd, bd_q15, shifts=shifts, tile=args.tile, full_above=args.full_above)
+
+    t_inc = t_full = 0.0
+    bad = 0
+    for frame in make_stream(args.frames, shape, args.digits, not args.no_move, args.noise, args.static, args.seed):
+        t0 = time.perf_counter()
+        logits = eng.update(frame)
+        t1 = time.perf_counter()
+        ref = forward_frame(frame[None], W1, W2, Wd, bd_q15, shifts=shifts)["logits"][0]
+        t_full += time.perf_counter() - t1
+        t_inc += t1 - t0
+        if not args.no_verify and not np.array_equal(logits, ref):
+            bad += 1
+
+    st = eng.stats
+    n = st["frames"]
+    print("\n================ INCREMENTAL STREAM ================")
+    print(f" stream      : {n} frames {shape[1]}x{shape[0]}  (full {st['full']}, unchanged {st['unchanged']}, "
+          f"dense skipped {st['dense_skipped']})")
+    print(f" full        : {t_full * 1e3 / n:8.3f} ms/frame")
+    print(f" incremental : {t_inc * 1e3 / n:8.3f} ms/frame  ({t_full / max(t_inc, 1e-12):.1f}x)")
+    print(" recomputed  : " + "  ".join(f"{k} {v * 100:.1f}%" for k, v in eng.work_fraction().items()))
+    if not args.no_verify:
+        print(f" verify      : {'bit-identical' if bad == 0 else f'{bad} MISMATCH'} (vs forward_frame every frame)")
+    print("====================================================")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# infer_cache_bench.py
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, infer_batch
+from int_cache import InferenceCache
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [int_cache.InferenceCache 벤치 / 자가 검증]
+#
+# 1) ROM 데모 : fpga_top_demo.v 처럼 test 앞 --rom 장을 스위치 순서대로 --rounds 번 반복 요청
+#               (요청마다 --req 장 배치) -> 캐시 vs 매번 infer_batch 시간, logits 비트 비교
+# 2) LRU      : 서로 다른 이미지를 capacity 보다 많이 흘려서 eviction 카운터 확인
+# 3) 무효화   : npz 임시 사본으로
+#               - 같은 내용으로 다시 쓰기 (mtime 만 변경) -> 캐시 유지
+#               - W1_q 원소 하나 바꾸기                 -> 캐시 비움 + 새 weight 결과와 일치
+#
+# 사용 예:
+#   python 05_infer_cache.py
+#   python 05_infer_cache.py --rom 16 --rounds 200 --req 4 --capacity 64
+# =============================================================================
+
+def rom_requests(x_u8: np.ndarray, n_rom: int, rounds: int, req: int, seed: int = 0):
+    """스위치로 ROM 이미지를 고르는 요청 (req 장씩) 제너레이터"""
+    rng = np.random.default_rng(seed)
+    for _ in range(rounds):
+        yield x_u8[rng.integers(0, n_rom, req)]
+
+def check_invalidation(npz_path: str, x_u8: np.ndarray) -> bool:
+    tmp = tempfile.mkdtemp(prefix="int_cache_")
+    try:
+        path = os.path.join(tmp, "pack.npz")
+        shutil.copyfile(npz_path, path)
+        cache = InferenceCache(path, capacity=len(x_u8))
+        cache.infer(x_u8)
+
+        # 같은 내용 다시 쓰기 -> mtime 만 바뀜
+        st = os.stat(path)
+        shutil.copyfile(npz_path, path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        cache.infer(x_u8)
+        same_ok = cache.stats["invalidations"] == 0 and cache.stats["hits"] == len(x_u8)
+
+        # weight 하나 변경 -> 무효화
+        pack = dict(np.load(npz_path))
+        W1 = pack["W1_q"].copy()
+        W1.flat[0] = W1.flat[0] + 1 if W1.flat[0] < 127 else W1.flat[0] - 1
+        pack["W1_q"] = W1
+        np.savez(path, **pack)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000))
+        got = cache.infer(x_u8)
+        ref = infer_batch(x_u8, *load_weights(path), shifts=load_shifts(path))
+        changed_ok = cache.stats["invalidations"] == 1 and np.array_equal(got, ref)
+
+        print(f" invalidate  : same content rewrite -> kept {'OK' if same_ok else 'FAIL'}, "
+              f"W1_q changed -> flushed {'OK' if changed_ok else 'FAIL'}  ({cache.report()})")
+        return same_ok and changed_ok
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="content-hash LRU inference cache bench")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--rom", type=int, default=16, help="ROM 이미지 수 (fpga_top_demo = 16)")
+    ap.add_argument("--rounds", type=int, default=500, help="요청 수")
+    ap.add_argument("--req", type=int, default=1, help="요청당 이미지 수")
+    ap.add_argument("--capacity", type=int, default=1024)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    x_u8, _ = load_mnist_u8("test")
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    shifts = load_shifts(args.npz)
+    cache = InferenceCache(args.npz, capacity=args.capacity)
+
+    t_ref = t_cache = 0.0
+    bad = 0
+    for x in rom_requests(x_u8, args.rom, args.rounds, args.req, args.seed):
+        t0 = time.perf_counter()
+        got = cache.infer(x)
+        t1 = time.perf_counter()
+        ref = infer_batch(x, W1, W2, Wd, bd_q15, shifts=shifts)
+        t_ref += time.perf_counter() - t1
+        t_cache += t1 - t0
+        bad += int(not np.array_equal(got, ref))
+
+    print("\n================ INFERENCE CACHE ================")
+    print(f" ROM demo    : {args.rounds} req x {args.req} img from {args.rom} ROM images")
+    print(f" no cache    : {t_ref * 1e6 / args.rounds:9.1f} us/req")
+    print(f" cache       : {t_cache * 1e6 / args.rounds:9.1f} us/req  ({t_ref / max(t_cache, 1e-12):.1f}x)")
+    print(f"               {cache.report()}")
+    print(f" verify      : {'bit-identical' if bad == 0 else f'{bad} MISMATCH'}")
+
+    small = InferenceCache(args.npz, capacity=args.rom)
+    small.infer(x_u8[:4 * args.rom])
+    small.infer(x_u8[3 * args.rom:4 * args.rom])
+    lru_ok = small.stats["evictions"] == 3 * args.rom and small.stats["hits"] == args.rom
+    print(f" LRU         : {'OK' if lru_ok else 'FAIL'}  ({small.report()})")
+
+    ok = check_invalidation(args.npz, x_u8[:args.rom])
+    print("=================================================")
+    if bad or not lru_ok or not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
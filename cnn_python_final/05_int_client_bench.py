@@ -0,0 +1,129 @@
+# int_client_bench.py
+import time
+import asyncio
+import argparse
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, infer_batch
+from int_server import InferServer, send_image, read_result, fetch_stats
+from mnist_data import load_mnist_u8
+
+# =============================================================================
+# [05_int_server.py 부하 테스트 클라이언트]
+#
+# --clients 개 연결이 각자 --depth 개까지 요청을 응답 기다리지 않고 보냄 (pipelining)
+# --rate 지정 시 전체 요청을 포아송 도착(평균 rate req/s)으로 보냄 (지정 안 하면 최대 속도)
+#
+# ====== 출력 ======
+#   클라이언트 기준 처리량 / p50 / p99 지연, 서버 stats (배치 크기, 서버 기준 지연)
+#   결과 class / logits 를 infer_batch 와 비트 단위 비교
+#
+# 사용 예:
+#   python 05_int_client_bench.py --spawn                         # 같은 프로세스에 서버 띄워서 테스트
+#   python 05_int_client_bench.py --port 5555 -n 20000 --clients 16 --depth 4
+#   python 05_int_client_bench.py --spawn --rate 2000 --max-latency-ms 5
+# =============================================================================
+
+async def client(k: int, idx: np.ndarray, x_u8: np.ndarray, connect, depth: int, t_send: np.ndarray,
+                 lat: np.ndarray, got: np.ndarray):
+    reader, writer = await connect()
+    inflight = asyncio.Semaphore(depth)
+    order = asyncio.Queue()
+
+    async def recv():
+        for _ in range(len(idx)):
+            i = await order.get()
+            c, logits = await read_result(reader)
+            lat[i] = time.perf_counter() - t_send[i]
+            got[i, 0], got[i, 1:] = c, logits
+            inflight.release()
+
+    rtask = asyncio.ensure_future(recv())
+    t0 = time.perf_counter()
+    for i in idx:
+        if np.isfinite(t_send[i]):                       # --rate: 예정된 도착 시각까지 대기
+            await asyncio.sleep(max(0.0, t0 + t_send[i] - time.perf_counter()))
+        await inflight.acquire()
+        t_send[i] = time.perf_counter()
+        await send_image(writer, x_u8[i])
+        order.put_nowait(i)
+        await writer.drain()
+    await rtask
+    writer.close()
+
+
+async def run(args):
+    x_all, _ = load_mnist_u8("test")
+    rng = np.random.default_rng(args.seed)
+    ids = rng.integers(0, len(x_all), args.n)
+    x_u8 = x_all[ids]
+
+    srv = None
+    if args.spawn:
+        srv = InferServer(args.npz, max_batch=args.max_batch, max_latency_ms=args.max_latency_ms)
+        await srv.start_tcp("127.0.0.1", 0)
+        port = srv.server.sockets[0].getsockname()[1]
+        connect = lambda: asyncio.open_connection("127.0.0.1", port)
+    elif args.unix:
+        connect = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        connect = lambda: asyncio.open_connection(args.host, args.port)
+
+    if args.rate:
+        arrive = np.cumsum(rng.exponential(1.0 / args.rate, args.n))
+    else:
+        arrive = np.full(args.n, np.inf)
+    t_send = arrive.copy()
+    lat = np.zeros(args.n)
+    got = np.zeros((args.n, 11), dtype=np.int64)
+    shards = [np.arange(k, args.n, args.clients) for k in range(args.clients)]
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(k, s, x_u8, connect, args.depth, t_send, lat, got)
+                           for k, s in enumerate(shards)))
+    wall = time.perf_counter() - t0
+
+    reader, writer = await connect()
+    st = await fetch_stats(reader, writer)
+    writer.close()
+    await writer.wait_closed()
+    if srv is not None:
+        await srv.close()
+
+    W1, W2, Wd, bd_q15 = load_weights(args.npz)
+    ref = infer_batch(x_u8, W1, W2, Wd, bd_q15, shifts=load_shifts(args.npz))
+    bad = int(np.sum((got[:, 0] != np.argmax(ref, axis=1)) | np.any(got[:, 1:] != ref, axis=1)))
+
+    print("\n================ INT SERVER BENCH ================")
+    print(f" load        : {args.n} req, {args.clients} clients x depth {args.depth}"
+          + (f", poisson {args.rate:.0f} req/s" if args.rate else ", closed loop"))
+    print(f" client      : {args.n / wall:10.1f} req/s   p50 {np.percentile(lat, 50) * 1e3:.2f} ms   "
+          f"p99 {np.percentile(lat, 99) * 1e3:.2f} ms")
+    print(f" server      : {st['throughput']:10.1f} req/s   p50 {st['p50_ms']:.2f} ms   p99 {st['p99_ms']:.2f} ms"
+          f"   (batches {st['batches']}, mean {st['mean_batch']:.1f} / max {st['max_batch']}, "
+          f"budget {st['max_latency_ms']:.1f} ms)")
+    print(f" verify      : {'bit-identical' if bad == 0 else f'{bad} MISMATCH'} (class + Q15 logits vs infer_batch)")
+    print("==================================================")
+    if bad:
+        raise SystemExit(1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="load generator for 05_int_server.py")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5555)
+    ap.add_argument("--unix", default=None)
+    ap.add_argument("--spawn", action="store_true", help="같은 프로세스에 서버를 띄움 (TCP 임의 포트)")
+    ap.add_argument("--max-batch", type=int, default=64, help="--spawn 서버 설정")
+    ap.add_argument("--max-latency-ms", type=float, default=2.0, help="--spawn 서버 설정")
+    ap.add_argument("-n", type=int, default=5000, help="요청 수")
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--depth", type=int, default=4, help="연결당 동시 요청 수")
+    ap.add_argument("--rate", type=float, default=0, help="포아송 도착률 req/s (0 = 최대 속도)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# int_server_main.py
+import os
+import asyncio
+import argparse
+
+from int_engine import DEFAULT_NPZ
+from int_server import InferServer
+
+# =============================================================================
+# [정수 추론 서버 실행 - int_server.InferServer]
+#
+# 호스트 소프트웨어가 보드 없이 붙어서 개발할 수 있는 cnn_core_top 소프트웨어 트윈.
+# 프로토콜 / micro-batching 은 int_server.py 헤더 참고, 부하 테스트는 05_int_client_bench.py
+#
+# 사용 예:
+#   python 05_int_server.py                                   # 127.0.0.1:5555
+#   python 05_int_server.py --unix /tmp/cnn.sock --max-batch 128 --max-latency-ms 1
+#   python 05_int_server.py --stats-every 5                   # 5초마다 p50/p99/처리량 출력
+# =============================================================================
+
+def print_stats(r: dict):
+    print(f"[STATS] req {r['requests']}  batches {r['batches']} (mean {r['mean_batch']:.1f})  "
+          f"{r['throughput']:.0f} req/s  p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms  "
+          f"max {r['max_ms']:.2f} ms", flush=True)
+
+async def run(args):
+    srv = InferServer(args.npz, max_batch=args.max_batch, max_latency_ms=args.max_latency_ms)
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.remove(args.unix)
+        await srv.start_unix(args.unix)
+        where = args.unix
+    else:
+        await srv.start_tcp(args.host, args.port)
+        where = f"{args.host}:{args.port}"
+    print(f"[INFO] serving on {where}  (max_batch {args.max_batch}, max_latency {args.max_latency_ms} ms)",
+          flush=True)
+    try:
+        while True:
+            await asyncio.sleep(args.stats_every or 3600)
+            if args.stats_every:
+                print_stats(srv.report())
+    finally:
+        await srv.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="asyncio micro-batching inference server (shift-only int model)")
+    ap.add_argument("--npz", default=DEFAULT_NPZ)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5555)
+    ap.add_argument("--unix", default=None, help="Unix socket 경로 (지정 시 TCP 대신)")
+    ap.add_argument("--max-batch", type=int, default=64)
+    ap.add_argument("--max-latency-ms", type=float, default=2.0, help="배치를 모으는 최대 대기 시간")
+    ap.add_argument("--stats-every", type=float, default=0, help="N초마다 stats 출력 (0 = 안 함)")
+    args = ap.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# accel_device.py
+from abc import ABC, abstractmethod
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, infer_batch
+from rtl_timing_model import CLK_NS, frame_pattern, latency_report
+
+# =============================================================================
+# [가속기 디바이스 인터페이스 + 에뮬레이터 백엔드 (호스트 드라이버 개발/벤치용)]
+#
+# design_1.bd 는 Zynq PS7 과 cnn_core_top 패브릭을 붙이지만, 호스트 쪽 드라이버 추상화가 없어서
+# 보드 없이 드라이버 로직(큐잉 / 오버랩 / 처리량)을 만들고 재볼 수가 없었음.
+#
+# ====== 디바이스 모델 (시간 단위 = 패브릭 클럭 cycle, 기본 125 MHz) ======
+#   host --(입력 descriptor ring, ring_size 칸)--> DMA(MM2S) --> 디바이스 입력 버퍼 n_buffers 개
+#        --> cnn_core_top (1 pixel/clk 스트리밍) --> 결과 DMA(S2MM) --> 출력 completion ring --> host
+#
+#   DMA 입력   : dma_setup + ceil(784 / dma_bytes_per_cycle)  (기본 32bit AXI = 4 byte/clk)
+#                descriptor 순서대로 1개씩, 비어 있는 디바이스 버퍼가 있어야 시작
+#   코어       : 버퍼가 차면 784 cycle 동안 픽셀을 밀어 넣음 (util_core = 이 구간), 다음 이미지는 II cycle 뒤부터
+#                latency / II 는 rtl_timing_model (cycle 정확 모델) 에서 가져옴
+#                버퍼는 코어가 마지막 픽셀을 읽은 뒤 비워짐
+#   결과 DMA   : out_valid 이후 dma_setup + ceil(44 / dma_bytes_per_cycle)  (class + logits 10개)
+#   n_buffers=2 (double buffering) 이면 이미지 k 가 코어를 도는 동안 k+1 업로드가 겹침
+#   ring_size  : 제출했지만 아직 완료되지 않은 descriptor 수 상한 (꽉 차면 submit 이 가장 오래된 것 완료까지 대기)
+#
+# ====== host 시간 ======
+#   에뮬레이터는 가상 시계 now (cycle) 를 씀 -> 벽시계와 무관, 같은 입력이면 항상 같은 결과
+#   host_work(c) : host 가 c cycle 동안 다른 일(전처리 등)을 함
+#   wait()       : 결과가 나올 때까지 now 를 앞으로 돌림 / poll() 은 now 기준 완료분만
+#
+# ====== 결과 ======
+#   class + logits 는 int_engine.infer_batch (shift-only, 비트 단위 동일), 회수 시점에 배치로 계산
+#
+# 사용 예:
+#   dev = EmulatedAccelerator(n_buffers=2, ring_size=8)
+#   tag = dev.submit(img_u8)                 # (28,28) u8 -> tag (int)
+#   for c in dev.poll(): ...                 # Completion(tag, cls, logits, t_submit, t_done)
+#   c = dev.wait(tag)                        # 또는 dev.wait() = 가장 오래된 미완료
+#   print(dev.report())
+# =============================================================================
+
+IMG_PIXELS = 784
+RESULT_BYTES = 4 + 4 * 10
+FCLK_HZ = 1e9 / CLK_NS
+
+
+def core_timing() -> tuple:
+    """
+    rtl_timing_model 로 (latency, II) 계산
+      latency : 첫 픽셀 cycle -> out_valid cycle (tb_cnn_core_top_time.v 의 Latency)
+      II      : gap 0 으로 프레임 2개를 붙였을 때 out_valid 간격 (= 다음 프레임 입력 가능 간격)
+    """
+    rep = latency_report(frame_pattern(1))
+    latency = rep["out_valid"]["first"] - rep["data_valid"]["first"]
+    two = latency_report(frame_pattern(2, gap=0), drain=latency + 64)
+    ii = two["out_valid"]["last"] - two["out_valid"]["first"]
+    return latency, ii
+
+
+class Completion:
+    __slots__ = ("tag", "cls", "logits", "t_submit", "t_done")
+
+    def __init__(self, tag, cls, logits, t_submit, t_done):
+        self.tag, self.cls, self.logits, self.t_submit, self.t_done = tag, cls, logits, t_submit, t_done
+
+    def __repr__(self):
+        return f"Completion(tag={self.tag}, cls={self.cls}, t_submit={self.t_submit}, t_done={self.t_done})"
+
+
+class AcceleratorDevice(ABC):
+    """드라이버가 쓰는 인터페이스 (에뮬레이터 / 실제 보드 백엔드 공통, 세 메서드 모두 구현해야 인스턴스 생성 가능)"""
+
+    @abstractmethod
+    def submit(self, img_u8: np.ndarray, block: bool = True):
+        """(28,28) u8 -> tag, ring 이 꽉 찼고 block=False 면 None"""
+
+    @abstractmethod
+    def poll(self) -> list:
+        """끝났고 아직 안 가져간 Completion 목록 (제출 순서)"""
+
+    @abstractmethod
+    def wait(self, tag: int = None) -> Completion:
+        """tag (None = 가장 오래된 미회수) 가 끝날 때까지 대기 -> Completion"""
+
+
+class EmulatedAccelerator(AcceleratorDevice):
+    """
+    비트 단위 정수 모델 + RTL cycle 비용으로 동작하는 가상 디바이스
+    - submit(img, block=True) : tag, ring 이 꽉 찼고 block=False 면 None (EAGAIN)
+    - poll() : now 까지 끝났고 아직 안 가져간 completion 목록 (완료 순서 = 제출 순서)
+    - wait(tag=None) : 해당 tag (없으면 가장 오래된 것) 가 끝날 때까지 now 를 진행
+    - drain() : 전부 끝날 때까지 진행
+    - host_work(cycles) : host 쪽 작업 시간 모델
+    """
+
+    def __init__(self, npz_path: str = DEFAULT_NPZ, n_buffers: int = 2, ring_size: int = 8,
+                 dma_bytes_per_cycle: int = 4, dma_setup: int = 32, timing: tuple = None):
+        if n_buffers < 1 or ring_size < 1:
+            raise ValueError("n_buffers / ring_size must be >= 1")
+        self.W1, self.W2, self.Wd, self.bd_q15 = load_weights(npz_path)
+        self.shifts = load_shifts(npz_path)
+        self.n_buffers = n_buffers
+        self.ring_size = ring_size
+        self.latency, self.ii = timing if timing is not None else core_timing()
+        self.dma_in = dma_setup + -(-IMG_PIXELS // dma_bytes_per_cycle)
+        self.dma_out = dma_setup + -(-RESULT_BYTES // dma_bytes_per_cycle)
+        self.reset()
+
+    def reset(self):
+        self.now = 0
+        self.next_tag = 0
+        self.inflight = []                        # 제출 순서: dict(tag, img, t_submit, t_done, ...)
+        self.ready = []                           # 완료됐지만 host 가 아직 안 가져간 Completion
+        self.done = []                            # 회수된 completion 기록 (report 용)
+        self.dma_free = 0                         # 입력 DMA 엔진이 다음 전송을 시작할 수 있는 cycle
+        self.core_free = 0                        # 코어가 다음 프레임 첫 픽셀을 받을 수 있는 cycle
+        self.out_dma_free = 0
+        self.buf_free = [0] * self.n_buffers      # 디바이스 입력 버퍼별로 비워지는 cycle
+        self.busy = {"dma_in": [], "core": [], "dma_out": []}
+
+    # ---- 스케줄 (제출 순서 FIFO 이므로 제출 시점에 시간이 확정됨) ----
+    def _schedule(self, t_submit: int) -> dict:
+        b = self.next_tag % self.n_buffers
+        dma_start = max(t_submit, self.dma_free, self.buf_free[b])
+        dma_end = dma_start + self.dma_in
+        core_start = max(dma_end, self.core_free)
+        core_end = core_start + IMG_PIXELS
+        out_valid = core_start + self.latency
+        out_start = max(out_valid + 1, self.out_dma_free)
+        t_done = out_start + self.dma_out
+
+        self.dma_free = dma_end
+        self.core_free = core_start + self.ii
+        self.buf_free[b] = core_end
+        self.out_dma_free = t_done
+        self.busy["dma_in"].append((dma_start, dma_end))
+        self.busy["core"].append((core_start, core_end))
+        self.busy["dma_out"].append((out_start, t_done))
+        return {"t_done": t_done, "dma_start": dma_start, "core_start": core_start}
+
+    def submit(self, img_u8: np.ndarray, block: bool = True):
+        img = np.asarray(img_u8, dtype=np.uint8).reshape(28, 28)
+        self._collect()
+        if len(self.inflight) >= self.ring_size:
+            if not block:
+                return None
+            self.now = max(self.now, self.inflight[0]["t_done"])   # 가장 오래된 descriptor 완료까지 대기
+            self._collect()
+        tag = self.next_tag
+        ev = self._schedule(self.now)
+        self.inflight.append({"tag": tag, "img": img, "t_submit": self.now, **ev})
+        self.next_tag += 1
+        return tag
+
+    def _collect(self):
+        """now 까지 끝난 inflight -> ready (결과는 배치로 계산)"""
+        n = 0
+        while n < len(self.inflight) and self.inflight[n]["t_done"] <= self.now:
+            n += 1
+        items, self.inflight = self.inflight[:n], self.inflight[n:]
+        if not items:
+            return
+        logits = infer_batch(np.stack([it["img"] for it in items]), self.W1, self.W2, self.Wd, self.bd_q15,
+                             shifts=self.shifts)
+        out = [Completion(it["tag"], int(np.argmax(row)), row, it["t_submit"], it["t_done"])
+               for it, row in zip(items, logits)]
+        self.ready.extend(out)
+        self.done.extend(out)
+
+    def poll(self) -> list:
+        self._collect()
+        out, self.ready = self.ready, []
+        return out
+
+    def wait(self, tag: int = None) -> Completion:
+        """tag (None = 가장 오래된 미회수) 완료까지 now 진행 -> Completion, 먼저 끝난 다른 것은 poll() 로"""
+        self._collect()
+        if tag is None:
+            if self.ready:
+                return self.ready.pop(0)
+            if not self.inflight:
+                raise RuntimeError("wait(): nothing in flight")
+            tag = self.inflight[0]["tag"]
+        for i, c in enumerate(self.ready):
+            if c.tag == tag:
+                return self.ready.pop(i)
+        it = next((it for it in self.inflight if it["tag"] == tag), None)
+        if it is None:
+            raise KeyError(f"tag {tag} not in flight")
+        self.now = max(self.now, it["t_done"])
+        self._collect()
+        return self.wait(tag)
+
+    def drain(self) -> list:
+        """남은 것 전부 완료될 때까지 -> 미회수 completion 전부"""
+        if self.inflight:
+            self.now = max(self.now, self.inflight[-1]["t_done"])
+        return self.poll()
+
+    def host_work(self, cycles: int):
+        self.now += int(cycles)
+
+    # ---- 통계 ----
+    def _busy_cycles(self, key: str, t0: int, t1: int) -> int:
+        return sum(max(0, min(b, t1) - max(a, t0)) for a, b in self.busy[key])
+
+    def _overlap_cycles(self, t0: int, t1: int) -> int:
+        """입력 DMA 와 코어 입력이 동시에 바쁜 cycle 수 (이미지 k+1 업로드 || 이미지 k 계산)"""
+        ev = []
+        for i, key in enumerate(("dma_in", "core")):
+            for a, b in self.busy[key]:
+                if min(b, t1) > max(a, t0):
+                    ev.append((max(a, t0), i, 1))
+                    ev.append((min(b, t1), i, -1))
+        ev.sort()
+        cnt, last, both = [0, 0], t0, 0
+        for t, i, d in ev:
+            if cnt[0] and cnt[1]:
+                both += t - last
+            cnt[i] += d
+            last = t
+        return both
+
+    def report(self) -> dict:
+        if not self.done:
+            return {"images": 0}
+        t0 = min(c.t_submit for c in self.done)
+        t1 = max(c.t_done for c in self.done)
+        span = max(t1 - t0, 1)
+        lat = np.array([c.t_done - c.t_submit for c in self.done])
+        n = len(self.done)
+        return {
+            "images": n,
+            "cycles": span,
+            "images_per_sec": n * FCLK_HZ / span,
+            "cycles_per_image": span / n,
+            "latency_p50_us": float(np.percentile(lat, 50)) * CLK_NS / 1e3,
+            "latency_p99_us": float(np.percentile(lat, 99)) * CLK_NS / 1e3,
+            "util_dma_in": self._busy_cycles("dma_in", t0, t1) / span,
+            "util_core": self._busy_cycles("core", t0, t1) / span,
+            "util_dma_out": self._busy_cycles("dma_out", t0, t1) / span,
+            "overlap_dma_core": self._overlap_cycles(t0, t1) / span,
+        }
@@ -0,0 +1,261 @@
+/*
+ * ======================================================================================
+ * Ʈ  : Zynq-7000 PS CNN ġũ (CPU Inference) - ̽  / ġ / Ƽ 
+ *       : bench_portable.c
+ *         : main.c    CNN(u8 x i8 -> >>shift) N ġ M 忡 ϰ
+ * ó(images/sec) Ȯ մϴ. (CPU vs FPGA ó 񱳿)
+ *
+ *  (Linux host) : gcc -O2 -std=c99 -pthread bench_portable.c -o bench_portable
+ *               : ./bench_portable [threads=1] [loops=10]
+ *  (Vitis)      : main.c     BENCH_BOARD   (Xilinx Timer,  ھ)
+ *
+ *             : python 05_c_model_data.py --n-images N  ->  model_data.h
+ *                     (w1t/w2t/wdt = Ŀ   transpose weight, test_img/label/pred)
+ * ======================================================================================
+ */
+
+// bare-metal ARM (Xilinx standalone BSP) ̸  
+#if !defined(BENCH_BOARD) && defined(__arm__) && !defined(__linux__)
+#define BENCH_BOARD
+#endif
+
+#ifndef BENCH_BOARD
+#define _POSIX_C_SOURCE 199309L
+#endif
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include "model_data.h" // ġ + ġ ̹ (05_c_model_data.py)
+
+#ifdef BENCH_BOARD
+#include "platform.h"
+#include "xtime_l.h"    // Ÿ̸ ̺귯 (Xilinx Timer)
+#include "xil_cache.h"  // ĳ  ̺귯
+#else
+#include <time.h>
+#include <pthread.h>
+#endif
+
+// ==========================================
+// [] ġũ ȯ 
+// ==========================================
+#define MAX_THREADS 64
+#define DEFAULT_LOOPS 10   // ġ ü 10ȸ ݺ Ͽ հ մϴ.
+
+// ==========================================
+// [] 庰 ۾ ޸
+// ==========================================
+// main.c    1Ʈ, 帶  ۰ ʿϹǷ ü ϴ.
+typedef struct {
+    uint8_t c1_out[24 * 24 * 3];
+    uint8_t p1_out[12 * 12 * 3];
+    uint8_t c2_out[8 * 8 * 3];
+    uint8_t p2_out[4 * 4 * 3];
+    int32_t fc_out[10];
+} Workspace;
+
+typedef struct {
+    int begin, end;      //  ̹ [begin, end)
+    int loops;
+    Workspace ws;
+    uint8_t* pred;       //  (ü 迭 ,  )
+    uint8_t pad[64];     //   Task  ĳ  (false sharing) 
+} Task;
+
+// ==========================================
+// [ƿƼ]  Լ
+// ==========================================
+
+//   0~255  (Saturation Լ)
+static inline int32_t clamp_u8(int32_t v) {
+    if (v < 0) return 0;
+    if (v > 255) return 255;
+    return v;
+}
+
+//  äκ requant shift (s = 7 ̸ main.c  requant_shift7  )
+static inline uint8_t requant_shift(int32_t acc, int s) {
+    return (uint8_t)clamp_u8((acc + (1 << (s - 1))) >> s);
+}
+
+// ==========================================
+// [Ŀ] ȭ CNN  Լ
+// ==========================================
+
+// 1. ռ (Convolution 5x5) - weight (Cout, 5, 5, Cin) transpose 
+//     Ŀ (5*Cin) Է/weight   ̶   stride 1 (Ϸ ȭ )
+static void conv5x5_t(const uint8_t* in, const int8_t* wt, const uint8_t* shift, uint8_t* out,
+                      int H, int W, int Cin, int Cout) {
+    const int H_out = H - 4;
+    const int W_out = W - 4;
+    const int row = 5 * Cin;
+
+    for (int r = 0; r < H_out; r++) {
+        for (int c = 0; c < W_out; c++) {
+            const uint8_t* base = in + (r * W + c) * Cin;
+            for (int k = 0; k < Cout; k++) {
+                const int8_t* wk = wt + k * 5 * row;
+                int32_t acc = 0;
+                for (int i = 0; i < 5; i++) {
+                    const uint8_t* x = base + i * W * Cin;
+                    const int8_t* w = wk + i * row;
+                    for (int t = 0; t < row; t++)
+                        acc += (int32_t)x[t] * (int32_t)w[t];
+                }
+                out[(r * W_out + c) * Cout + k] = requant_shift(acc, shift[k]);
+            }
+        }
+    }
+}
+
+// 2. ƽ Ǯ (Max Pooling 2x2) - main.c  
+static void maxpool2x2(const uint8_t* in, uint8_t* out, int H, int W, int C) {
+    const int H_out = H / 2;
+    const int W_out = W / 2;
+
+    for (int r = 0; r < H_out; r++) {
+        for (int c = 0; c < W_out; c++) {
+            for (int k = 0; k < C; k++) {
+                const uint8_t* p = in + ((r * 2) * W + c * 2) * C + k;
+                uint8_t m = p[0];
+                if (p[C] > m) m = p[C];
+                if (p[W * C] > m) m = p[W * C];
+                if (p[W * C + C] > m) m = p[W * C + C];
+                out[(r * W_out + c) * C + k] = m;
+            }
+        }
+    }
+}
+
+// 3.   (Dense) - weight (Out, In) transpose 
+static void dense_t(const uint8_t* in, const int8_t* wt, const int32_t* b, int32_t* out, int In_Size, int Out_Size) {
+    for (int o = 0; o < Out_Size; o++) {
+        const int8_t* w = wt + o * In_Size;
+        int32_t acc = 0;
+        for (int i = 0; i < In_Size; i++)
+            acc += (int32_t)in[i] * (int32_t)w[i];
+        out[o] = acc + b[o];
+    }
+}
+
+// ̸  Ŭ (argmax10_stream.v  strict '>' 񱳿 )
+static int argmax10(const int32_t* v) {
+    int best = 0;
+    for (int i = 1; i < 10; i++)
+        if (v[i] > v[best]) best = i;
+    return best;
+}
+
+// [ Լ] ̹ 1 ߷
+static int run_inference(const uint8_t* img, Workspace* ws) {
+    conv5x5_t(img, w1t, s1, ws->c1_out, 28, 28, 1, 3);
+    maxpool2x2(ws->c1_out, ws->p1_out, 24, 24, 3);
+    conv5x5_t(ws->p1_out, w2t, s2, ws->c2_out, 12, 12, 3, 3);
+    maxpool2x2(ws->c2_out, ws->p2_out, 8, 8, 3);
+    dense_t(ws->p2_out, wdt, bd, ws->fc_out, 48, 10);
+    return argmax10(ws->fc_out);
+}
+
+static void* worker(void* arg) {
+    Task* t = (Task*)arg;
+    for (int l = 0; l < t->loops; l++)
+        for (int n = t->begin; n < t->end; n++)
+            t->pred[n] = (uint8_t)run_inference(test_img + (size_t)n * 784, &t->ws);
+    return NULL;
+}
+
+// ==========================================
+// [Ÿ̸]  = Xilinx Global Timer, host = CLOCK_MONOTONIC
+// ==========================================
+static double now_sec(void) {
+#ifdef BENCH_BOARD
+    XTime t;
+    XTime_GetTime(&t);
+    return (double)t / (double)COUNTS_PER_SECOND;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+#endif
+}
+
+// ==========================================
+// [] α׷ 
+// ==========================================
+int main(int argc, char** argv) {
+    static Task tasks[MAX_THREADS];
+    static uint8_t pred[N_TEST_IMAGES];
+    int threads = 1, loops = DEFAULT_LOOPS;
+
+#ifdef BENCH_BOARD
+    (void)argc; (void)argv;
+    init_platform();
+    Xil_ICacheEnable();
+    Xil_DCacheEnable();
+#else
+    if (argc > 1) threads = atoi(argv[1]);
+    if (argc > 2) loops = atoi(argv[2]);
+    if (threads < 1) threads = 1;
+    if (threads > MAX_THREADS) threads = MAX_THREADS;
+    if (loops < 1) loops = 1;
+#endif
+
+    // ̹    յ 
+    for (int t = 0; t < threads; t++) {
+        tasks[t].begin = (int)((long long)N_TEST_IMAGES * t / threads);
+        tasks[t].end = (int)((long long)N_TEST_IMAGES * (t + 1) / threads);
+        tasks[t].pred = pred;
+    }
+
+    // ־ (Warm-up): 1ȸ ü  (Cold Cache Miss  +   pred ä)
+    for (int t = 0; t < threads; t++) {
+        tasks[t].loops = 1;
+        worker(&tasks[t]);
+    }
+
+    // 
+    double t0 = now_sec();
+#ifdef BENCH_BOARD
+    tasks[0].loops = loops;
+    worker(&tasks[0]);
+#else
+    pthread_t tid[MAX_THREADS];
+    for (int t = 0; t < threads; t++) {
+        tasks[t].loops = loops;
+        pthread_create(&tid[t], NULL, worker, &tasks[t]);
+    }
+    for (int t = 0; t < threads; t++)
+        pthread_join(tid[t], NULL);
+#endif
+    double sec = now_sec() - t0;
+
+    // Ȯ / bit-exact (test_pred) 
+    int correct = 0, mismatch = 0;
+    for (int n = 0; n < N_TEST_IMAGES; n++) {
+        correct += (pred[n] == test_label[n]);
+        mismatch += (pred[n] != test_pred[n]);
+    }
+
+    double images = (double)N_TEST_IMAGES * loops;
+    printf("================================================\n\r");
+#ifdef BENCH_BOARD
+    printf("   [ Batch Benchmark: Zynq PS (Cortex-A9, 1 core) ]\n\r");
+#else
+    printf("   [ Batch Benchmark: host (%d threads) ]\n\r", threads);
+#endif
+    printf("================================================\n\r");
+    printf(" * Images        : %d x %d loops\n\r", N_TEST_IMAGES, loops);
+    printf(" * Time          : %.3f sec\n\r", sec);
+    printf(" * Throughput    : %.1f images/sec\n\r", images / sec);
+    printf(" * Latency (avg) : %.2f us / image / thread\n\r", sec * 1e6 * threads / images);
+    printf("------------------------------------------------\n\r");
+    printf(" * Accuracy      : %.4f (%d / %d)\n\r", (double)correct / N_TEST_IMAGES, correct, N_TEST_IMAGES);
+    printf(" * vs int_engine : %s (%d mismatch)\n\r", mismatch ? "MISMATCH" : "bit-exact", mismatch);
+    printf("================================================\n\r");
+
+#ifdef BENCH_BOARD
+    cleanup_platform();
+#endif
+    return mismatch ? 1 : 0;
+}
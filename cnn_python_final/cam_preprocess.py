@@ -0,0 +1,269 @@
+# cam_preprocess.py
+import os
+import numpy as np
+
+# =============================================================================
+# [카메라 grayscale 프레임 -> 28x28 u8 (Q0.8) 입력 전처리 - 배치 벡터화]
+#
+# NPU_CAM_GRAY 는 카메라 grayscale을 코어에 넣지만, Python 쪽에는
+# 640x480 같은 카메라 프레임을 모델 입력(28x28 u8, 검은 배경 / 흰 글씨)으로 바꾸는 경로가 없었음.
+#
+# ====== 단계 (프레임 N장을 한 번에) ======
+# 1) 극성(invert)   : 종이 위 검은 글씨(테두리가 밝음) 이면 255 - x  (auto = 테두리 평균 > 전체 평균)
+# 2) 대비 정규화     : 프레임별 배경 레벨(중앙값)과 밝은 쪽 퍼센타일로 [lo, hi] -> [0, 255] 늘이고
+#                      lo 아래(배경)는 0  (통계는 4x4 subsample 에서만 계산)
+#                      1)+2) 는 프레임별 256칸 LUT 하나로 합쳐서 full-res 는 table lookup 1번
+# 3) bounding box   : 임계값 넘는 픽셀이 min_px 개 이상인 행/열 -> 프레임별 글씨 영역
+# 4) crop / center  : bbox 중심, 한 변 = 긴 변 * 28/20 (MNIST는 28x28 안에 20x20 글씨) 인 정사각형
+# 5) area 다운샘플  : 분리형 적분 영상 - 세로 누적(full-res 1번) -> 29개 경계 행만 뽑아 28줄 band
+#                      -> band 가로 누적 -> 28x28 박스 합 (프레임 밖 = 0 배경, 박스 면적으로 나눠 반올림)
+#
+# ====== 버퍼 ======
+# FrameRing   : (capacity, H, W) u8 프레임 링 버퍼 (미리 할당, push 마다 복사 1번)
+# Preprocessor: 작업 배열(LUT / u8 프레임 / 누적 합 / 출력)을 capacity 크기로 미리 할당해서 재사용
+#   -> process() 가 돌려주는 (N,28,28) u8 은 int_engine.infer_batch 에 그대로 들어감
+#      (다음 process() 호출 때 덮어쓰므로 보관하려면 copy)
+#
+# ====== 프레임 소스 (frame, label) 제너레이터 ======
+#   synthetic : MNIST test 글씨를 확대해서 조명 기울기 + 노이즈가 있는 종이 프레임에 배치 (label = 정답)
+#   파일       : .npy (N,H,W)/(H,W), .pgm (P5), raw u8 (.raw/.gray/.y8/.bin, --size 로 크기 지정)
+#   디렉터리   : 위 파일들을 이름 순서대로
+#
+# 사용 예:
+#   from cam_preprocess import FrameRing, Preprocessor, open_source
+#   ring, pre = FrameRing(32, (480, 640)), Preprocessor(32, (480, 640))
+#   for frame, label in open_source("synthetic", (480, 640), n=256): ...
+# =============================================================================
+
+FRAME_SHAPE = (480, 640)     # (H, W) 기본 카메라 해상도
+OUT = 28                     # 모델 입력 한 변
+DIGIT_BOX = 20               # MNIST 글씨 영역 (28x28 안 20x20)
+RAW_EXTS = (".raw", ".gray", ".y8", ".bin")
+FRAME_EXTS = (".npy", ".pgm") + RAW_EXTS
+
+
+# ----------------------------
+# 1) 링 버퍼
+# ----------------------------
+class FrameRing:
+    """
+    고정 크기 프레임 링 버퍼
+    - push(frame): head 위치에 복사, 가득 차면 가장 오래된 프레임을 덮어씀
+    - view()     : 들어온 순서대로 (count, H, W) view (감기지 않았으면 복사 없음)
+    - clear()    : 배치 하나를 소비한 뒤 호출 (버퍼는 그대로 재사용)
+    """
+
+    def __init__(self, capacity: int, shape: tuple = FRAME_SHAPE):
+        self.capacity = capacity
+        self.shape = tuple(shape)
+        self.buf = np.zeros((capacity,) + self.shape, dtype=np.uint8)
+        self.head = 0
+        self.count = 0
+
+    def push(self, frame: np.ndarray) -> bool:
+        """return: 가득 찼으면 True"""
+        if frame.shape != self.shape:
+            raise ValueError(f"frame shape {frame.shape} != ring shape {self.shape}")
+        self.buf[self.head] = frame
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return self.count == self.capacity
+
+    def view(self) -> np.ndarray:
+        start = (self.head - self.count) % self.capacity
+        if start + self.count <= self.capacity:
+            return self.buf[start:start + self.count]
+        return np.roll(self.buf, -start, axis=0)[:self.count]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+
+# ----------------------------
+# 2) 전처리
+# ----------------------------
+class Preprocessor:
+    """
+    (N,H,W) u8 카메라 프레임 -> (N,28,28) u8 (검은 배경 / 흰 글씨, 글씨 중심 정렬)
+    invert  : "auto" / True / False
+    bg_cut  : 배경 레벨(중앙값)에서 밝은 쪽 퍼센타일까지 중 이 비율 아래는 0 (노이즈/종이 결 제거)
+    hi_pct  : 대비 정규화 상한 퍼센타일
+    thr     : bbox 판정 임계값 (정규화 후 u8)
+    min_px  : 행/열에 thr 넘는 픽셀이 이 개수 이상이어야 bbox에 포함 (점 노이즈 무시)
+    """
+
+    def __init__(self, capacity: int, shape: tuple = FRAME_SHAPE, invert="auto",
+                 bg_cut: float = 0.35, hi_pct: float = 99.5, thr: int = 96, min_px: int = 3):
+        self.capacity = capacity
+        self.shape = tuple(shape)
+        self.invert, self.bg_cut, self.hi_pct = invert, bg_cut, hi_pct
+        self.thr, self.min_px = thr, min_px
+        H, W = self.shape
+        self.lut = np.zeros((capacity, 256), dtype=np.uint8)
+        self.work = np.zeros((capacity, H, W), dtype=np.uint8)
+        self.sat = np.zeros((capacity, H + 1, W), dtype=np.int32)       # 세로 누적 (첫 행 0)
+        self.band = np.zeros((capacity, OUT, W + 1), dtype=np.int32)    # 28줄 가로 누적 (첫 열 0), 255*H*W < 2^31
+        self.out = np.zeros((capacity, OUT, OUT), dtype=np.uint8)
+        self.bbox = np.zeros((capacity, 4), dtype=np.int32)             # (y0, x0, y1, x1), 비었으면 -1
+        self.k = np.arange(OUT + 1, dtype=np.float64) / OUT
+
+    def _polarity(self, frames: np.ndarray) -> np.ndarray:
+        """return: (N,) bool - invert 할 프레임"""
+        N = len(frames)
+        if self.invert is True or self.invert is False:
+            return np.full(N, self.invert)
+        border = np.concatenate([frames[:, :8, :].reshape(N, -1), frames[:, -8:, :].reshape(N, -1),
+                                 frames[:, :, :8].reshape(N, -1), frames[:, :, -8:].reshape(N, -1)], axis=1)
+        return border.mean(axis=1) > frames[:, ::4, ::4].reshape(N, -1).mean(axis=1)
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """frames: (N,H,W) u8, N <= capacity  ->  (N,28,28) u8 view (내부 버퍼)"""
+        N = len(frames)
+        if N > self.capacity or frames.shape[1:] != self.shape:
+            raise ValueError(f"frames {frames.shape} vs capacity {self.capacity}, shape {self.shape}")
+        H, W = self.shape
+
+        # 1) 극성 + 2) 대비 정규화 통계 (subsample)
+        inv = self._polarity(frames)
+        sub = frames[:, ::4, ::4].reshape(N, -1).astype(np.int32)
+        sub[inv] = 255 - sub[inv]
+        med = np.median(sub, axis=1)
+        hi = np.percentile(sub, self.hi_pct, axis=1)
+        lo = med + self.bg_cut * (hi - med)
+        scale = np.round(255 * 256 / np.maximum(hi - lo, 1)).astype(np.int32)     # Q8 배율
+
+        # 프레임별 u8 -> u8 LUT (극성 + 정규화를 full-res 1 pass 로)
+        v = np.arange(256, dtype=np.int32)[None, :]
+        v = np.where(inv[:, None], 255 - v, v)
+        v = (np.maximum(v - lo.astype(np.int32)[:, None], 0) * scale[:, None]) >> 8
+        self.lut[:N] = np.minimum(v, 255)
+        x = self.work[:N]
+        for i in range(N):
+            np.take(self.lut[i], frames[i], out=x[i])
+
+        # 3) bounding box
+        fg = x > self.thr
+        rows = np.count_nonzero(fg, axis=2) >= self.min_px
+        cols = np.count_nonzero(fg, axis=1) >= self.min_px
+        found = rows.any(axis=1) & cols.any(axis=1)
+        y0 = np.argmax(rows, axis=1)
+        y1 = H - np.argmax(rows[:, ::-1], axis=1)
+        x0 = np.argmax(cols, axis=1)
+        x1 = W - np.argmax(cols[:, ::-1], axis=1)
+        bb = self.bbox[:N]
+        bb[:] = np.stack([y0, x0, y1, x1], axis=1)
+        bb[~found] = -1
+
+        # 4) 정사각형 crop (못 찾으면 프레임 중앙, 짧은 변)
+        cy = np.where(found, (y0 + y1) / 2.0, H / 2.0)
+        cx = np.where(found, (x0 + x1) / 2.0, W / 2.0)
+        side = np.where(found, np.maximum(y1 - y0, x1 - x0) * OUT / DIGIT_BOX, min(H, W))
+        side = np.maximum(side, OUT)
+        ye = np.round(cy[:, None] - side[:, None] / 2 + side[:, None] * self.k).astype(np.int64)   # (N,29)
+        xe = np.round(cx[:, None] - side[:, None] / 2 + side[:, None] * self.k).astype(np.int64)
+        yc, xc = np.clip(ye, 0, H), np.clip(xe, 0, W)
+
+        # 5) 박스 합 (분리형 적분: 세로 누적은 full-res 1번, 가로 누적은 28줄에서만, 프레임 밖 = 0)
+        C = self.sat[:N]
+        np.cumsum(x, axis=1, dtype=np.int32, out=C[:, 1:, :])
+        n = np.arange(N)[:, None, None]
+        R = C[n, yc[:, :, None], np.arange(W)[None, None, :]]                # (N,29,W)
+        band = self.band[:N]
+        np.cumsum(R[:, 1:, :] - R[:, :-1, :], axis=2, out=band[:, :, 1:])   # (N,28,W+1)
+        T = band[n, np.arange(OUT)[None, :, None], xc[:, None, :]]          # (N,28,29)
+        box = (T[:, :, 1:] - T[:, :, :-1]).astype(np.int64)
+        area = (np.diff(ye, axis=1)[:, :, None] * np.diff(xe, axis=1)[:, None, :])
+        out = self.out[:N]
+        out[...] = np.minimum((box + area // 2) // np.maximum(area, 1), 255)
+        return out
+
+
+# ----------------------------
+# 3) 프레임 소스
+# ----------------------------
+def synthetic_frames(n: int, shape: tuple = FRAME_SHAPE, seed: int = 0, digits=None):
+    """
+    MNIST test 글씨(검은 잉크)를 종이 배경 프레임에 배치 -> (frame u8 (H,W), label)
+    - 글씨 크기 6~12배 확대 (28 -> 168~336 px), 위치 랜덤, 조명 기울기 + 가우시안 노이즈
+    digits: (x_u8, y) 직접 넘기면 그것 사용 (기본 mnist_data test)
+    """
+    if digits is None:
+        from mnist_data import load_mnist_u8
+        digits = load_mnist_u8("test")
+    x_u8, y = digits
+    H, W = shape
+    rng = np.random.default_rng(seed)
+    gy, gx = np.mgrid[0:H, 0:W].astype(np.float32)
+    for i in range(n):
+        idx = int(rng.integers(len(x_u8)))
+        k = int(rng.integers(6, 13))
+        k = max(1, min(k, min(H, W) // OUT))
+        d = np.kron(x_u8[idx].astype(np.float32), np.ones((k, k), np.float32))   # 최근접 확대
+        dh, dw = d.shape
+        oy, ox = int(rng.integers(0, H - dh + 1)), int(rng.integers(0, W - dw + 1))
+
+        paper = float(rng.uniform(150, 230))
+        tilt = rng.uniform(-40, 40, size=2)
+        frame = paper + tilt[0] * (gy / H - 0.5) + tilt[1] * (gx / W - 0.5)
+        ink = float(rng.uniform(10, 60))
+        region = frame[oy:oy + dh, ox:ox + dw]
+        region -= (region - ink) * (d / 255.0)
+        frame += rng.normal(0, 6, size=shape).astype(np.float32)
+        yield np.clip(frame, 0, 255).astype(np.uint8), int(y[idx])
+
+def _read_pgm(path: str) -> np.ndarray:
+    """binary PGM (P5, 8bit) -> (H,W) u8"""
+    with open(path, "rb") as f:
+        data = f.read()
+    tokens, pos = [], 0
+    while len(tokens) < 4:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b"#":
+            pos = data.index(b"\n", pos) + 1
+            continue
+        end = pos
+        while not data[end:end + 1].isspace():
+            end += 1
+        tokens.append(data[pos:end])
+        pos = end
+    if tokens[0] != b"P5" or int(tokens[3]) > 255:
+        raise ValueError(f"{os.path.basename(path)}: 8bit binary PGM(P5)만 지원")
+    w, h = int(tokens[1]), int(tokens[2])
+    return np.frombuffer(data, dtype=np.uint8, count=w * h, offset=pos + 1).reshape(h, w)
+
+def file_frames(path: str, shape: tuple = FRAME_SHAPE):
+    """파일 1개 -> (frame, -1) 제너레이터 (.npy / .pgm / raw u8 연속 프레임)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        a = np.load(path, mmap_mode="r")
+        a = a[None] if a.ndim == 2 else a
+    elif ext == ".pgm":
+        a = _read_pgm(path)[None]
+    elif ext in RAW_EXTS:
+        a = np.memmap(path, dtype=np.uint8, mode="r")
+        a = a[:len(a) // (shape[0] * shape[1]) * shape[0] * shape[1]].reshape(-1, *shape)
+    else:
+        raise ValueError(f"지원하지 않는 프레임 파일: {path} ({FRAME_EXTS})")
+    if a.dtype != np.uint8 or a.shape[1:] != tuple(shape):
+        raise ValueError(f"{os.path.basename(path)}: {a.dtype} {a.shape[1:]} != uint8 {tuple(shape)}")
+    for f in a:
+        yield np.asarray(f), -1
+
+def open_source(spec: str, shape: tuple = FRAME_SHAPE, n: int = None, seed: int = 0):
+    """'synthetic' / 파일 / 디렉터리 -> (frame, label) 제너레이터 (n = 최대 프레임 수)"""
+    if spec == "synthetic":
+        gen = synthetic_frames(n or 256, shape, seed)
+    elif os.path.isdir(spec):
+        files = sorted(os.path.join(spec, f) for f in os.listdir(spec) if f.lower().endswith(FRAME_EXTS))
+        gen = (fr for p in files for fr in file_frames(p, shape))
+    else:
+        gen = file_frames(spec, shape)
+    for i, fr in enumerate(gen):
+        if n is not None and i >= n:
+            break
+        yield fr
@@ -0,0 +1,134 @@
+# golden_vectors.py
+import os
+import numpy as np
+
+from int_engine import DEFAULT_BATCH, forward_batch
+from hex_io import HexWriter, save_hex
+
+# =============================================================================
+# [레이어별 Golden Vector 생성 - 여러 장 / 배치 버전]
+#
+# 04_gen_golden_vectors.py 는 TEST_IDX 한 장만 for-loop로 덤프했음.
+# 여기서는 int_engine.forward_batch 로 수천 장을 한 번에 계산해서
+# 레이어별로 "이미지 순서대로 이어 붙인" $readmemh 파일을 만든다.
+#
+# ====== 출력 (prefix = golden, 샤드 없으면 tag 없음) ======
+#   golden_input_img.txt   : 이미지당 784줄  (u8)
+#   golden_conv1_out.txt   : 이미지당 1728줄 (24x24x3, HWC 순서 = 단일 이미지 파일과 동일)
+#   golden_pool1_out.txt   : 이미지당 432줄
+#   golden_conv2_out.txt   : 이미지당 192줄
+#   golden_pool2_out.txt   : 이미지당 48줄
+#   golden_fc_out.txt      : 이미지당 10줄  (i32, 2의 보수)
+#   golden_final_pred.txt  : 이미지당 1줄   (0~9)
+#   golden_images.txt      : slot -> MNIST 이미지 번호 (32bit hex, TB용)
+#   golden_index.csv       : slot, image, label, pred, 레이어별 시작 줄(offset)
+#
+#   slot k 의 레이어 L 데이터 = L 파일의 [offset, offset + lines) 줄
+#   (offset = k * lines 이지만 TB/스크립트가 계산 없이 쓰도록 csv에 그대로 적음)
+#
+# shard_size > 0 이면 shard_size장마다 golden_s000_*, golden_s001_* ... 로 나눔
+# (TB 메모리 배열 크기를 제한할 때)
+# =============================================================================
+
+# (파일 이름, golden dict 키, 이미지당 줄 수, width_bits)
+GOLDEN_LAYERS = [
+    ("input_img", "x", 784, 8),
+    ("conv1_out", "c1", 24 * 24 * 3, 8),
+    ("pool1_out", "p1", 12 * 12 * 3, 8),
+    ("conv2_out", "c2", 8 * 8 * 3, 8),
+    ("pool2_out", "p2", 4 * 4 * 3, 8),
+    ("fc_out", "logits", 10, 32),
+    ("final_pred", "pred", 1, 4),
+]
+
+
+# ----------------------------
+# 1) 계산 / 인덱스 선택
+# ----------------------------
+def golden_forward(x_u8: np.ndarray, W1, W2, Wd, bd_q15, shifts=None) -> dict:
+    """forward_batch 결과 + 입력(x) + argmax(pred). shifts: (s1, s2) requant shift (None = 7)"""
+    g = forward_batch(x_u8, W1, W2, Wd, bd_q15, shifts=shifts)
+    g["x"] = np.asarray(x_u8, dtype=np.uint8).reshape(-1, 28, 28, 1)
+    g["pred"] = np.argmax(g["logits"], axis=1).astype(np.int32)
+    return g
+
+def parse_index_spec(spec: str, n_total: int, fail_fn=None) -> np.ndarray:
+    """
+    '0' / '0,5,9' / '100-199' / '0-9,42' / 'all' / 'fail'
+    fail_fn: 'fail' 일 때 호출 -> 오답 이미지 인덱스 배열
+    return: 중복 제거 없이 입력 순서 그대로 (int64)
+    """
+    out = []
+    for tok in spec.split(","):
+        tok = tok.strip()
+        if tok == "all":
+            out.extend(range(n_total))
+        elif tok == "fail":
+            if fail_fn is None:
+                raise ValueError("'fail' needs fail_fn")
+            out.extend(int(i) for i in fail_fn())
+        elif "-" in tok:
+            a, b = tok.split("-")
+            out.extend(range(int(a), int(b) + 1))
+        elif tok:
+            out.append(int(tok))
+
+    idx = np.array(out, dtype=np.int64)
+    if len(idx) and (idx.min() < 0 or idx.max() >= n_total):
+        raise ValueError(f"index out of range [0, {n_total}): {spec}")
+    return idx
+
+
+# ----------------------------
+# 2) 저장
+# ----------------------------
+def save_single(out_dir: str, g: dict, slot: int = 0):
+    """golden dict의 slot번째 이미지를 기존 단일 파일 이름(input_img.txt, conv1_out.txt ...)으로 저장"""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, key, _, wb in GOLDEN_LAYERS:
+        save_hex(os.path.join(out_dir, f"{name}.txt"), g[key][slot], wb)
+
+def save_set(out_dir: str, x_u8: np.ndarray, indices, labels, W1, W2, Wd, bd_q15,
+             prefix: str = "golden", shard_size: int = 0, batch_size: int = DEFAULT_BATCH,
+             shifts=None) -> list:
+    """
+    x_u8[indices] 를 배치로 계산해서 레이어별 연결 파일 + index 저장
+    return: 샤드별 {"tag", "n", "images", "pred"} 리스트
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    indices = np.asarray(indices, dtype=np.int64)
+    N = len(indices)
+    shard_size = shard_size or max(N, 1)
+
+    shards = []
+    for k, s0 in enumerate(range(0, N, shard_size)):
+        s1 = min(s0 + shard_size, N)
+        tag = f"{prefix}_s{k:03d}" if shard_size < N else prefix
+        writers = {name: HexWriter(os.path.join(out_dir, f"{tag}_{name}.txt"), wb)
+                   for name, _, _, wb in GOLDEN_LAYERS}
+        preds = []
+        try:
+            for b0 in range(s0, s1, batch_size):
+                b1 = min(b0 + batch_size, s1)
+                g = golden_forward(x_u8[indices[b0:b1]], W1, W2, Wd, bd_q15, shifts)
+                for name, key, _, _ in GOLDEN_LAYERS:
+                    writers[name].write(g[key])
+                preds.append(g["pred"])
+        finally:
+            for w in writers.values():
+                w.close()
+
+        img = indices[s0:s1]
+        pred = np.concatenate(preds) if preds else np.zeros(0, dtype=np.int32)
+        save_hex(os.path.join(out_dir, f"{tag}_images.txt"), img, 32)
+        _save_index_csv(os.path.join(out_dir, f"{tag}_index.csv"), img, np.asarray(labels)[img], pred)
+        shards.append({"tag": tag, "n": s1 - s0, "images": img, "pred": pred})
+    return shards
+
+def _save_index_csv(path: str, images, labels, pred):
+    names = [name for name, _, _, _ in GOLDEN_LAYERS]
+    with open(path, "w") as f:
+        f.write("slot,image,label,pred," + ",".join(f"{n}_off" for n in names) + "\n")
+        for k, (i, y, p) in enumerate(zip(images, labels, pred)):
+            offs = ",".join(str(k * lines) for _, _, lines, _ in GOLDEN_LAYERS)
+            f.write(f"{k},{int(i)},{int(y)},{int(p)},{offs}\n")
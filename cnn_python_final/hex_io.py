@@ -0,0 +1,150 @@
+# hex_io.py
+import os
+import numpy as np
+
+# =============================================================================
+# [$readmemh 용 HEX 파일 읽기/쓰기 - 벡터화 버전]
+#
+# 기존 생성기/검증기는 값 하나마다 f"{v:02X}" 포맷 + f.write() 를 했음.
+# 10k 세트(784만 줄)에서는 이게 수십 초 걸려서, 여기서는 한 번에 처리:
+#   쓰기: 값 -> 니블(4bit) -> 문자 LUT -> (N, digits+1) u8 배열 -> tobytes()
+#   읽기: 파일 바이트 전체 -> 고정 폭이면 reshape 후 니블 LUT로 한 번에 변환
+#
+# ====== 포맷 ======
+# - 한 줄에 값 하나, 대문자 HEX, 0으로 채운 고정 폭 (width_bits / 4 자리)
+#     width_bits=8  : i8/u8  -> "F3"
+#     width_bits=32 : i32    -> "FFFFFFF3"   (2의 보수)
+#     width_bits=4  : 0..15  -> "7"          (label_1k.txt 처럼 한 자리)
+# - 음수는 하위 width_bits 비트만 남김 (= 기존 val & 0xFF / & 0xFFFFFFFF)
+#
+# 사용법:
+#   from hex_io import save_hex, load_hex, HexWriter
+#   save_hex("conv1_out.txt", c1)                   # u8
+#   save_hex("fc_out.txt", logits, width_bits=32)   # i32
+#   img = load_hex("input_img.txt", count=784)      # (784,) u8
+#   with HexWriter("input_10k.txt") as w:           # 큰 세트는 배치 단위로 스트리밍
+#       for s in range(0, N, 1000): w.write(x[s:s+1000])
+# =============================================================================
+
+HEX_CHARS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+CHUNK_LINES = 1 << 20   # 스트리밍 쓰기 단위 (줄). 1M줄 x 9B = 9MB 이하 버퍼
+
+# 문자 -> 니블 값 (HEX 문자가 아니면 -1)
+_NIBBLE = np.full(256, -1, dtype=np.int16)
+for _i, _c in enumerate(b"0123456789ABCDEF"):
+    _NIBBLE[_c] = _i
+for _i, _c in enumerate(b"abcdef"):
+    _NIBBLE[_c] = 10 + _i
+
+
+def _digits(width_bits: int) -> int:
+    if width_bits not in (4, 8, 16, 32):
+        raise ValueError(f"width_bits must be 4/8/16/32: {width_bits}")
+    return width_bits // 4
+
+
+# ----------------------------
+# 1) 쓰기
+# ----------------------------
+def hex_bytes(data, width_bits: int = 8) -> bytes:
+    """정수 배열 -> '{:0NX}\\n' 줄들을 이어 붙인 bytes (2의 보수, 하위 width_bits만)"""
+    nd = _digits(width_bits)
+    v = np.asarray(data).reshape(-1).astype(np.int64) & ((1 << width_bits) - 1)
+
+    shifts = np.arange(nd - 1, -1, -1, dtype=np.int64) * 4
+    out = np.empty((len(v), nd + 1), dtype=np.uint8)
+    out[:, :nd] = HEX_CHARS[(v[:, None] >> shifts) & 0xF]
+    out[:, nd] = ord("\n")
+    return out.tobytes()
+
+
+class HexWriter:
+    """
+    $readmemh 파일 스트리밍 쓰기.
+    write()에 들어온 배열은 CHUNK_LINES 단위로 잘라서 포맷 -> 메모리는 청크 크기만 사용
+    """
+
+    def __init__(self, path: str, width_bits: int = 8, chunk_lines: int = CHUNK_LINES):
+        self.path = path
+        self.width_bits = width_bits
+        self.chunk_lines = chunk_lines
+        self.lines = 0
+        _digits(width_bits)
+        self.f = open(path, "wb")
+
+    def write(self, data):
+        flat = np.asarray(data).reshape(-1)
+        for s in range(0, len(flat), self.chunk_lines):
+            self.f.write(hex_bytes(flat[s:s + self.chunk_lines], self.width_bits))
+        self.lines += len(flat)
+
+    def close(self):
+        if not self.f.closed:
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_hex(path: str, data, width_bits: int = 8, chunk_lines: int = CHUNK_LINES) -> int:
+    """data 전체를 한 파일로 저장 (flatten 순서). return: 줄 수"""
+    with HexWriter(path, width_bits, chunk_lines) as w:
+        w.write(data)
+    return w.lines
+
+
+# ----------------------------
+# 2) 읽기
+# ----------------------------
+def _parse_fixed(buf: np.ndarray, nd: int):
+    """모든 줄이 nd자리 + '\\n' 이면 (N,) int64, 아니면 None"""
+    if len(buf) % (nd + 1) != 0:
+        return None
+    rows = buf.reshape(-1, nd + 1)
+    if not np.all(rows[:, nd] == ord("\n")):
+        return None
+    nib = _NIBBLE[rows[:, :nd]]
+    if np.any(nib < 0):
+        return None
+
+    v = np.zeros(len(rows), dtype=np.int64)
+    for i in range(nd):
+        v = (v << 4) | nib[:, i]
+    return v
+
+def load_hex(path: str, width_bits: int = 8, signed: bool = False, count: int = None) -> np.ndarray:
+    """
+    $readmemh 형식 파일 -> 1차원 배열
+    width_bits: 8 -> u8 / i8, 32 -> u32 / i32 (signed=True면 2의 보수 해석)
+    count     : 지정하면 줄 수 검사 (다르면 ValueError)
+    - 고정 폭 파일(이 저장소에서 만든 파일)은 벡터화 경로, 그 외(폭이 섞인 파일)는 토큰 단위 fallback
+    """
+    nd = _digits(width_bits)
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    buf = buf[buf != ord("\r")]
+    if len(buf) and buf[-1] != ord("\n"):
+        buf = np.append(buf, np.uint8(ord("\n")))
+
+    v = _parse_fixed(buf, nd)
+    if v is None:
+        v = np.array([int(t, 16) for t in raw.split()], dtype=np.int64)
+
+    if count is not None and len(v) != count:
+        raise ValueError(f"{os.path.basename(path)}: expected {count} lines, got {len(v)}")
+
+    mask = (1 << width_bits) - 1
+    if np.any(v > mask):
+        raise ValueError(f"{os.path.basename(path)}: value wider than {width_bits} bits")
+
+    if signed:
+        v = v - ((v >> (width_bits - 1)) << width_bits)
+        dtype = {4: np.int8, 8: np.int8, 16: np.int16, 32: np.int32}[width_bits]
+    else:
+        dtype = {4: np.uint8, 8: np.uint8, 16: np.uint16, 32: np.uint32}[width_bits]
+    return v.astype(dtype)
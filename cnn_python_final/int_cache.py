@@ -0,0 +1,143 @@
+# int_cache.py
+import os
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, DEFAULT_BATCH, load_weights, load_shifts, infer_batch
+
+# =============================================================================
+# [입력 내용 해시 기반 LRU 추론 캐시 - 같은 입력 반복 시 재계산 생략]
+#
+# fpga_top_demo.v 는 ROM 16장을 계속 돌리고, 정지된 카메라 장면은 매 프레임 같은 28x28 crop 을 만드는데
+# Python 기준 경로는 매번 conv1 ~ dense 를 처음부터 계산함.
+#
+# ====== 키 ======
+#   (weight pack 해시, blake2b-128(784 byte 입력))
+#   weight pack 해시 = npz 파일 내용 blake2b + requant shift 사용 여부
+#   -> 입력이 1 bit 라도 다르면 다른 키 (비트 단위로 같은 입력만 hit, 노이즈 있는 프레임은 miss)
+#
+# ====== 무효화 ======
+#   호출마다 npz 의 (mtime_ns, size) 를 stat -> 바뀌었으면 내용 해시를 다시 계산
+#   해시가 다르면 weight 다시 로드 + 캐시 전체 비움 (invalidations += 1)
+#   (파일을 같은 내용으로 다시 써서 mtime 만 바뀐 경우는 캐시 유지)
+#
+# ====== LRU ======
+#   OrderedDict (hit 시 맨 뒤로), capacity 초과 시 가장 오래 안 쓴 항목부터 제거
+#   값 = logits (10,) int32 (읽기 전용 사본)
+#
+# 사용 예:
+#   from int_cache import InferenceCache
+#   cache = InferenceCache(capacity=1024)
+#   logits = cache.infer(x_u8)          # (N,28,28) u8 -> (N,10) int32, miss 만 infer_batch 로 계산
+#   print(cache.stats)                  # hits, misses, evictions, invalidations
+# =============================================================================
+
+DIGEST_BYTES = 16
+
+
+def input_key(img_u8: np.ndarray) -> bytes:
+    """(28,28) u8 -> blake2b-128 digest"""
+    return hashlib.blake2b(np.ascontiguousarray(img_u8, dtype=np.uint8).tobytes(),
+                           digest_size=DIGEST_BYTES).digest()
+
+def file_hash(path: str) -> bytes:
+    h = hashlib.blake2b(digest_size=DIGEST_BYTES)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+class InferenceCache:
+    """
+    int_engine.infer_batch 앞단 메모이제이션
+    - infer(x) : (N,28,28) u8 -> (N,10) int32 (배치 안 중복 입력도 한 번만 계산)
+    - predict(x): argmax (동점이면 낮은 클래스)
+    - stats    : hits, misses, evictions, invalidations
+    """
+
+    def __init__(self, npz_path: str = DEFAULT_NPZ, capacity: int = 1024, use_shifts: bool = True,
+                 batch_size: int = DEFAULT_BATCH):
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1 (got {capacity})")
+        self.npz_path = npz_path
+        self.capacity = capacity
+        self.use_shifts = use_shifts
+        self.batch_size = batch_size
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._stat = None
+        self.pack_hash = None
+        self._refresh()
+
+    def _refresh(self):
+        """npz 가 바뀌었으면 weight 다시 로드, 내용이 다르면 캐시 비움"""
+        try:
+            st = os.stat(self.npz_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"[ERROR] npz not found: {self.npz_path}")
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig == self._stat:
+            return
+        self._stat = sig
+        h = file_hash(self.npz_path) + bytes([self.use_shifts])
+        if h == self.pack_hash:
+            return
+        self.W1, self.W2, self.Wd, self.bd_q15 = load_weights(self.npz_path)
+        self.shifts = load_shifts(self.npz_path) if self.use_shifts else None
+        if self.pack_hash is not None:
+            self.stats["invalidations"] += 1
+        self.entries.clear()
+        self.pack_hash = h
+
+    def clear(self):
+        self.entries.clear()
+
+    def infer(self, x_u8: np.ndarray) -> np.ndarray:
+        x_u8 = np.asarray(x_u8, dtype=np.uint8)
+        if x_u8.ndim == 2:
+            x_u8 = x_u8[None]
+        self._refresh()
+
+        keys = [(self.pack_hash, input_key(img)) for img in x_u8]
+        logits = np.empty((len(x_u8), self.Wd.shape[1]), dtype=np.int32)
+        todo = {}                        # key -> 이번 배치에서 처음 나온 위치들
+        for i, k in enumerate(keys):
+            v = self.entries.get(k)
+            if v is not None:
+                self.entries.move_to_end(k)
+                logits[i] = v
+                self.stats["hits"] += 1
+            else:
+                todo.setdefault(k, []).append(i)
+        if not todo:
+            return logits
+
+        first = [idx[0] for idx in todo.values()]
+        new = infer_batch(x_u8[first], self.W1, self.W2, self.Wd, self.bd_q15,
+                          batch_size=self.batch_size, shifts=self.shifts)
+        for (k, idx), row in zip(todo.items(), new):
+            logits[idx] = row
+            self.stats["misses"] += 1
+            self.stats["hits"] += len(idx) - 1
+            row = row.copy()
+            row.flags.writeable = False
+            self.entries[k] = row
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return logits
+
+    def predict(self, x_u8: np.ndarray) -> np.ndarray:
+        return np.argmax(self.infer(x_u8), axis=1).astype(np.int32)
+
+    def hit_rate(self) -> float:
+        n = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / n if n else 0.0
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"hits {s['hits']}  misses {s['misses']}  hit rate {self.hit_rate() * 100:.1f}%  "
+                f"entries {len(self.entries)}/{self.capacity}  evictions {s['evictions']}  "
+                f"invalidations {s['invalidations']}")
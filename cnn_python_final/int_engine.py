@@ -0,0 +1,371 @@
+# int_engine.py
+import os
+import numpy as np
+
+# =============================================================================
+# [정수-only / Shift-only] 배치(Batch) 벡터화 추론 엔진
+#
+# 03_infer_int_only_shift.py 의 for-loop 구현(RTL 동작 그대로)을
+# NumPy 배열 연산으로 옮긴 것. 결과는 loop 버전과 "비트 단위로 동일"해야 함.
+#
+# ====== 세계관 (loop 버전과 동일) ======
+# activation: u8 (Q0.8)  real = u8/256
+# weight    : i8 (Q1.7)  real = i8/128
+#
+# Conv:
+#   acc = Σ(u8 * i8)                      (signed int32 누산)
+#   out_u8 = clamp( (acc + 64) >> 7 )     (ReLU + clamp 0..255 포함)
+#
+# Dense:
+#   logits_q15 = Σ(u8 * i8) + bd_q15      (int32)
+#
+# ====== requant shift (학습된 shift, npz의 s1/s2) ======
+# conv requant shift는 레이어별 / 출력 채널별로 달라질 수 있음 (qat_model shift_mode)
+#   out_u8[c] = clamp( (acc[c] + 2^(s[c]-1)) >> s[c] )
+#   s = (입력 frac) + (weight frac[c]) - (출력 frac),  기본 npz는 전부 7 (= 위 >>7)
+#   bd_q15 는 dense 누산 도메인 2^-(f_c2 + 7) 로 저장됨 (f_c2 = 8 이면 Q15 그대로)
+#
+# ====== power-of-two weight (mac="shift") ======
+# weight가 0 / ±2^e (e=0..6) 뿐이면 곱셈 대신 시프트로 MAC:
+#   u8 * (±2^e) = ±(u8 << e)
+# 4bit code = {sign, e[2:0]},  e=7 -> 0  (pow2_encode / pow2_decode)
+# 결과는 mac="mul" 과 비트 단위로 동일 (같은 정수 값)
+#
+# ====== 사용법 ======
+#   from int_engine import load_weights, infer_batch
+#   W1, W2, Wd, bd_q15 = load_weights()
+#   logits = infer_batch(x_u8, W1, W2, Wd, bd_q15)   # (N,28,28) u8 -> (N,10) int32
+#   shifts = load_shifts()                            # (s1, s2) 학습된 requant shift
+#   logits = infer_batch(x_u8, W1, W2, Wd, bd_q15, shifts=shifts)
+#   g = forward_frame(frames_u8, W1, W2, Wd, bd_q15)  # (N,H,W) 프레임 전체 -> stride 4 logits 맵
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+DEFAULT_NPZ = os.path.join(BASE, "export", "mnist_shift_only_fpga_export.npz")
+
+# 한 번에 처리할 이미지 수 (conv1 누산기 = N*24*24*3*4 byte 이므로 메모리 상한 역할)
+DEFAULT_BATCH = 4096
+
+
+# ----------------------------
+# 0) 가중치 로드
+# ----------------------------
+def load_weights(npz_path: str = DEFAULT_NPZ):
+    """
+    npz -> (W1, W2, Wd, bd_q15)
+      W1: (5,5,1,3) int8, W2: (5,5,3,3) int8, Wd: (48,10) int8, bd_q15: (10,) int32
+    """
+    if not os.path.exists(npz_path):
+        raise FileNotFoundError(f"[ERROR] npz not found: {npz_path}")
+
+    pack = np.load(npz_path)
+    W1 = pack["W1_q"].astype(np.int8)
+    W2 = pack["W2_q"].astype(np.int8)
+    Wd = pack["Wd_q"].astype(np.int8)
+    bd_q15 = pack["bd_q15"].astype(np.int32)
+    return W1, W2, Wd, bd_q15
+
+def load_shifts(npz_path: str = DEFAULT_NPZ):
+    """
+    npz -> (s1, s2) 출력 채널별 requant shift (int32)
+      - s1/s2 키가 없는 예전 npz는 전부 7 (= (acc + 64) >> 7)
+    """
+    pack = np.load(npz_path)
+    out = []
+    for key, wkey in (("s1", "W1_q"), ("s2", "W2_q")):
+        cout = pack[wkey].shape[-1]
+        s = pack[key] if key in pack else 7
+        out.append(np.broadcast_to(np.asarray(s, dtype=np.int32), (cout,)).copy())
+    return tuple(out)
+
+
+# ----------------------------
+# 1) 레이어 연산 (배치 단위)
+# ----------------------------
+def conv_acc_batch(x_u8_nhwc: np.ndarray, W_i8: np.ndarray) -> np.ndarray:
+    """
+    VALID KhxKw conv의 int32 누산값 (requant 전)
+    x: (N,H,W,Cin) uint8
+    W: (Kh,Kw,Cin,Cout) int8
+    out: (N,H-Kh+1,W-Kw+1,Cout) int32
+
+    - Kh*Kw개 탭을 하나씩 돌면서 (N,Hout,Wout,Cin) @ (Cin,Cout) 를 누적
+    - 합의 순서만 다를 뿐 정수 덧셈이므로 loop 버전과 결과 동일
+    """
+    N, H, Ww, Cin = x_u8_nhwc.shape
+    Kh, Kw, Cin2, Cout = W_i8.shape
+    assert Cin == Cin2
+
+    Hout, Wout = H - Kh + 1, Ww - Kw + 1
+    x = x_u8_nhwc.astype(np.int32)
+    W = W_i8.astype(np.int32)
+
+    acc = np.zeros((N, Hout, Wout, Cout), dtype=np.int32)
+    for ky in range(Kh):
+        for kx in range(Kw):
+            acc += x[:, ky:ky + Hout, kx:kx + Wout, :] @ W[ky, kx]
+    return acc
+
+def conv5x5_acc_batch(x_u8_nhwc: np.ndarray, W_i8: np.ndarray) -> np.ndarray:
+    """RTL 구조(5x5) 이름 유지용 - conv_acc_batch 와 동일"""
+    return conv_acc_batch(x_u8_nhwc, W_i8)
+
+# ----------------------------
+# 1-1) power-of-two weight code / 시프트 MAC
+# ----------------------------
+POW2_EMAX = 6     # |w| 최대 2^6 = 64 (Q1.7에서 0.5)
+POW2_ZERO = 7     # exponent 7 = weight 0
+
+def pow2_encode(W_i8: np.ndarray) -> np.ndarray:
+    """int8 (0 / ±2^e) -> 4bit code (uint8) = sign<<3 | e,  0 -> 0x7"""
+    w = np.asarray(W_i8).astype(np.int32)
+    mag = np.abs(w)
+    e = np.zeros(w.shape, dtype=np.int32)
+    nz = mag > 0
+    e[nz] = np.log2(mag[nz]).round().astype(np.int32)
+    if np.any(nz & ((e > POW2_EMAX) | ((1 << e) != mag))):
+        raise ValueError("weights are not 0 / ±2^e (e<=6) - pow2 모드로 학습한 npz가 아님")
+    e[~nz] = POW2_ZERO
+    return (((w < 0).astype(np.int32) << 3) | e).astype(np.uint8)
+
+def pow2_decode(code: np.ndarray) -> np.ndarray:
+    """4bit code -> int8 weight"""
+    code = np.asarray(code).astype(np.int32)
+    e = code & 0x7
+    mag = np.where(e == POW2_ZERO, 0, 1 << np.minimum(e, POW2_EMAX))
+    return np.where(code & 0x8, -mag, mag).astype(np.int8)
+
+def is_pow2(W_i8: np.ndarray) -> bool:
+    try:
+        pow2_encode(W_i8)
+    except ValueError:
+        return False
+    return True
+
+def _shift_mac(x: np.ndarray, code: np.ndarray) -> np.ndarray:
+    """
+    x: (..., Cin) int32, code: (Cin, Cout)
+    return: (..., Cout) = Σ_cin ±(x << e)  (곱셈 없음, e=7 은 0)
+    """
+    code = code.astype(np.int32)
+    e = np.minimum(code & 0x7, POW2_EMAX)
+    t = x[..., :, None] << e                       # (..., Cin, Cout)
+    t = np.where(code & 0x8, -t, t)
+    t = np.where((code & 0x7) == POW2_ZERO, 0, t)
+    return t.sum(axis=-2, dtype=np.int32)
+
+def conv_acc_shift_batch(x_u8_nhwc: np.ndarray, code: np.ndarray) -> np.ndarray:
+    """conv_acc_batch 의 시프트 MAC 버전. code: (Kh,Kw,Cin,Cout) pow2 code"""
+    N, H, Ww, Cin = x_u8_nhwc.shape
+    Kh, Kw, Cin2, Cout = code.shape
+    assert Cin == Cin2
+
+    Hout, Wout = H - Kh + 1, Ww - Kw + 1
+    x = x_u8_nhwc.astype(np.int32)
+
+    acc = np.zeros((N, Hout, Wout, Cout), dtype=np.int32)
+    for ky in range(Kh):
+        for kx in range(Kw):
+            acc += _shift_mac(x[:, ky:ky + Hout, kx:kx + Wout, :], code[ky, kx])
+    return acc
+
+def dense_acc_shift_batch(flat_u8: np.ndarray, code: np.ndarray) -> np.ndarray:
+    """dense_acc_batch 의 시프트 MAC 버전. code: (flat,10) pow2 code"""
+    return _shift_mac(flat_u8.astype(np.int32), code)
+
+
+ROUNDING_MODES = ("half_up", "floor")
+
+def requant_tmp(acc: np.ndarray, shift: int = 7, rounding: str = "half_up") -> np.ndarray:
+    """
+    tmp = (acc + 2^(shift-1)) >> shift   (half_up, RTL 기본)
+        = acc >> shift                   (floor, 반올림 상수 없음)
+    - clamp 전 "진짜 값" (통계용으로 따로 노출)
+    - numpy의 >> 는 signed 정수에서 산술 시프트(= RTL의 >>>)
+    - shift가 배열이면 마지막 축(출력 채널)별 shift, 음수면 왼쪽 시프트
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"unknown rounding mode: {rounding}")
+    if np.ndim(shift) == 0 and shift >= 0:             # 스칼라 오른쪽 시프트 (기본 경로)
+        if rounding == "half_up" and shift > 0:
+            return (acc + (1 << (shift - 1))) >> shift
+        return acc >> shift
+    s = np.asarray(shift, dtype=acc.dtype)               # 채널별 배열 또는 음수 스칼라
+    sr, sl = np.maximum(s, 0), np.maximum(-s, 0)
+    rnd = np.where(sr > 0, 1 << np.maximum(sr - 1, 0), 0).astype(acc.dtype) if rounding == "half_up" else 0
+    return ((acc + rnd) >> sr) << sl
+
+def requant_tmp_shift7(acc: np.ndarray) -> np.ndarray:
+    """tmp = (acc + 64) >> 7"""
+    return requant_tmp(acc, 7, "half_up")
+
+def align_bias_q15(bd_q15: np.ndarray, shift1: int = 7, shift2: int = 7) -> np.ndarray:
+    """
+    conv requant shift가 7이 아니면 dense 누산기의 스케일도 바뀜
+      - c1 real = u8 * 2^(s1-15), c2 real = u8 * 2^(s1+s2-22)
+      - dense acc real = acc * 2^(s1+s2-29)   (s1=s2=7 이면 Q15)
+    -> Q15 bias를 같은 도메인으로 시프트 (오른쪽이면 half_up 반올림)
+    """
+    e = 14 - shift1 - shift2
+    b = bd_q15.astype(np.int64)
+    if e >= 0:
+        b = b << e
+    else:
+        b = (b + (1 << (-e - 1))) >> -e
+    return b.astype(np.int32)
+
+def clamp_u8_batch(tmp: np.ndarray) -> np.ndarray:
+    """ReLU + clamp: 음수는 0, 255 초과는 255"""
+    return np.clip(tmp, 0, 255).astype(np.uint8)
+
+def requant_shift7_batch(acc: np.ndarray) -> np.ndarray:
+    """out_u8 = clamp( (acc + 64) >> 7 )"""
+    return clamp_u8_batch(requant_tmp_shift7(acc))
+
+def maxpool2x2_batch(x_u8_nhwc: np.ndarray) -> np.ndarray:
+    """
+    2x2 maxpool stride=2
+    x: (N,H,W,C) uint8
+    - H/W가 홀수면 마지막 행/열은 버림 (Keras MaxPooling2D VALID = floor, RTL 구조는 항상 짝수)
+    """
+    N, H, Ww, C = x_u8_nhwc.shape
+    Ho, Wo = H // 2, Ww // 2
+    x = x_u8_nhwc[:, :Ho * 2, :Wo * 2, :]
+    return x.reshape(N, Ho, 2, Wo, 2, C).max(axis=(2, 4))
+
+def dense_acc_batch(flat_u8: np.ndarray, Wd_i8: np.ndarray) -> np.ndarray:
+    """
+    acc[n, j] = Σ_i flat_u8[n, i] * Wd_i8[i, j]   (bias 전)
+    flat: (N,48) uint8  ->  (N,10) int32   (구조 탐색 config면 (N,flat))
+    """
+    return flat_u8.astype(np.int32) @ Wd_i8.astype(np.int32)
+
+def dense_logits_q15_batch(flat_u8: np.ndarray, Wd_i8: np.ndarray, bd_q15: np.ndarray) -> np.ndarray:
+    """logits_q15[n, j] = acc[n, j] + bd_q15[j]  ->  (N,10) int32"""
+    return dense_acc_batch(flat_u8, Wd_i8) + bd_q15.astype(np.int32)
+
+
+# ----------------------------
+# 2) 전체 추론 (RTL 데이터 흐름 그대로)
+# ----------------------------
+MAC_MODES = ("mul", "shift")
+
+def forward_batch(x_u8: np.ndarray, W1, W2, Wd, bd_q15, stats=None, mac: str = "mul", shifts=None) -> dict:
+    """
+    x: (N,28,28) uint8
+    stats: (선택) int_stats.SatStats - 레이어별 acc/tmp/출력 통계를 배치 단위로 누적
+    mac  : "mul" (u8*i8) / "shift" (pow2 weight 전용, ±(u8<<e) - weight가 pow2가 아니면 ValueError)
+    shifts: (s1, s2) conv1/conv2 requant shift (스칼라 또는 출력 채널별 배열), None이면 7
+    return: 레이어별 중간 결과
+      c1 (N,24,24,3), p1 (N,12,12,3), c2 (N,8,8,3), p2 (N,4,4,3)  uint8
+      logits (N,10) int32
+    - 커널 크기/채널 수는 W1/W2/Wd shape에서 결정 (qat_model config 아무거나 가능)
+    """
+    if mac == "shift":
+        conv_acc = lambda x, W: conv_acc_shift_batch(x, pow2_encode(W))
+        dense_acc = lambda x, W: dense_acc_shift_batch(x, pow2_encode(W))
+    elif mac == "mul":
+        conv_acc, dense_acc = conv_acc_batch, dense_acc_batch
+    else:
+        raise ValueError(f"unknown mac mode: {mac}")
+
+    s1, s2 = shifts if shifts is not None else (7, 7)
+
+    a0 = x_u8.reshape(-1, 28, 28, 1)
+
+    acc1 = conv_acc(a0, W1)
+    tmp1 = requant_tmp(acc1, s1)
+    c1 = clamp_u8_batch(tmp1)
+    p1 = maxpool2x2_batch(c1)
+
+    acc2 = conv_acc(p1, W2)
+    tmp2 = requant_tmp(acc2, s2)
+    c2 = clamp_u8_batch(tmp2)
+    p2 = maxpool2x2_batch(c2)
+
+    acc_d = dense_acc(p2.reshape(len(p2), -1), Wd)
+    logits = acc_d + bd_q15.astype(np.int32)
+
+    if stats is not None:
+        stats.update_conv("c1", acc1, tmp1)
+        stats.update_conv("c2", acc2, tmp2)
+        stats.update_out("c1", c1)
+        stats.update_out("p1", p1)
+        stats.update_out("c2", c2)
+        stats.update_out("p2", p2)
+        stats.update_dense("fc", acc_d, logits)
+
+    return {"c1": c1, "p1": p1, "c2": c2, "p2": p2, "logits": logits}
+
+def infer_batch(x_u8: np.ndarray, W1, W2, Wd, bd_q15, batch_size: int = DEFAULT_BATCH, stats=None,
+                mac: str = "mul", shifts=None) -> np.ndarray:
+    """
+    x: (N,28,28) uint8  ->  logits_q15 (N,10) int32
+    - batch_size 단위로 잘라서 처리 (메모리 상한)
+    """
+    N = len(x_u8)
+    logits = np.empty((N, Wd.shape[1]), dtype=np.int32)
+    for s in range(0, N, batch_size):
+        e = min(s + batch_size, N)
+        logits[s:e] = forward_batch(x_u8[s:e], W1, W2, Wd, bd_q15, stats=stats, mac=mac,
+                                    shifts=shifts)["logits"]
+    return logits
+
+def predict_batch(x_u8: np.ndarray, W1, W2, Wd, bd_q15, batch_size: int = DEFAULT_BATCH,
+                  mac: str = "mul", shifts=None) -> np.ndarray:
+    """argmax(logits) (N,) int32 - 동점이면 낮은 클래스 (argmax10_stream.v의 '>' 비교와 동일)"""
+    logits = infer_batch(x_u8, W1, W2, Wd, bd_q15, batch_size, mac=mac, shifts=shifts)
+    return np.argmax(logits, axis=1).astype(np.int32)
+
+
+# ----------------------------
+# 3) loop 구현과 교차검증
+# ----------------------------
+def crosscheck(x_u8: np.ndarray, ref_logits_fn, W1, W2, Wd, bd_q15, n: int = 100, shifts=None) -> list:
+    """
+    앞에서부터 n장에 대해 ref_logits_fn(img_u8_28x28) -> (10,) 과 엔진 결과를 비교
+    return: 불일치 이미지 인덱스 리스트 (비어 있어야 정상)
+    """
+    n = min(n, len(x_u8))
+    logits = infer_batch(x_u8[:n], W1, W2, Wd, bd_q15, shifts=shifts)
+
+    bad = []
+    for i in range(n):
+        ref = np.asarray(ref_logits_fn(x_u8[i]), dtype=np.int32)
+        if not np.array_equal(ref, logits[i]):
+            bad.append(i)
+    return bad
+
+
+# ----------------------------
+# 4) full-frame (sliding window) 추론
+# ----------------------------
+FRAME_STRIDE = 4   # 2x2 pool 2번 -> 28x28 창이 p2 격자에 정렬되는 간격
+
+def forward_frame(frames_u8: np.ndarray, W1, W2, Wd, bd_q15, shifts=None) -> dict:
+    """
+    frames: (N,H,W) uint8 (모델 입력 도메인: 검은 배경 / 흰 글씨), H,W >= 28
+    conv1 -> pool -> conv2 -> pool 을 프레임 전체에 1번만 계산하고,
+    dense(48->10)는 p2 맵 위의 PxP 창 (P = 4) = "PxP conv, Cout=10" 으로 적용
+      logits[n, i, j] == forward_batch(frames[n, 4i:4i+28, 4j:4j+28])["logits"]   (비트 단위 동일)
+    - VALID conv는 위치마다 같은 값, 창 시작이 4의 배수면 두 maxpool의 2x2 짝도 같음
+    return: c1/p1/c2/p2 맵 (N,...,C) uint8, logits (N,Ho,Wo,10) int32
+    """
+    s1, s2 = shifts if shifts is not None else (7, 7)
+    N, H, Ww = frames_u8.shape[:3]
+    a0 = frames_u8.reshape(N, H, Ww, 1)
+
+    c1 = clamp_u8_batch(requant_tmp(conv_acc_batch(a0, W1), s1))
+    p1 = maxpool2x2_batch(c1)
+    c2 = clamp_u8_batch(requant_tmp(conv_acc_batch(p1, W2), s2))
+    p2 = maxpool2x2_batch(c2)
+
+    C2 = W2.shape[-1]
+    P = int(round(np.sqrt(Wd.shape[0] // C2)))
+    Wk = Wd.reshape(P, P, C2, Wd.shape[1])          # flatten 순서 (H,W,C) 그대로
+    logits = conv_acc_batch(p2, Wk) + bd_q15.astype(np.int32)
+    return {"c1": c1, "p1": p1, "c2": c2, "p2": p2, "logits": logits}
@@ -0,0 +1,211 @@
+# int_incremental.py
+import numpy as np
+
+from int_engine import conv_acc_batch, requant_tmp, clamp_u8_batch, maxpool2x2_batch, forward_frame
+
+# =============================================================================
+# [카메라 스트림용 증분(incremental) 재추론 - 바뀐 영역만 다시 계산]
+#
+# 연속 프레임은 대부분 이전 프레임과 같은데, 지금은 매번 conv1 ~ dense 를 처음부터 계산.
+# 여기서는 이전 입력과 diff -> dirty rectangle 을 레이어마다 전파해서 그 영역만 다시 계산.
+#
+# ====== 전파 규칙 (행/열 반개구간 [a, b)) ======
+#   VALID KxK conv : 입력 [a, b)  -> 출력 [max(0, a-K+1), min(Hout, b))
+#                    출력 [o0, o1) 재계산에 필요한 입력 = [o0, o1+K-1)
+#   2x2 maxpool    : 입력 [a, b)  -> 출력 [a//2, min(Hout, ceil(b/2)))
+#   dense(48->10)  : int_engine.forward_frame 과 같이 p2 위 PxP conv 로 보고 같은 규칙
+#   레이어마다 출력 rect 가 겹치면 bbox 하나로 합쳐서 계산 (같은 원소 중복 계산 없음)
+#
+# ====== 조기 종료 ======
+#   레이어마다 다시 계산한 값과 캐시를 비교해서 "실제로 바뀐" 부분의 bbox 만 다음 레이어로 넘김
+#   -> ReLU/clamp/maxpool 에 흡수된 변화는 거기서 멈춤, pool2 가 안 바뀌면 dense 는 건너뜀
+#   dirty rect 를 c2 까지 기하적으로만 전파한 면적이 c2 의 full_above 비율을 넘으면
+#   (작은 프레임 / 노이즈 많은 장면: 수용영역 때문에 입력 몇 px 이 c2 대부분을 덮음)
+#   부분 계산 오버헤드가 더 크므로 forward_frame 전체 계산으로 대체
+#
+# 결과는 매 프레임 forward_frame (전체 계산) 과 비트 단위로 같음 (정수 연산, 같은 요소를 같은 식으로 계산)
+#
+# 사용 예:
+#   from int_incremental import IncrementalEngine
+#   eng = IncrementalEngine(W1, W2, Wd, bd_q15, shifts=load_shifts())
+#   for frame in stream:            # (H,W) u8, 28x28 이면 logits (1,1,10)
+#       logits = eng.update(frame)  # (Ho,Wo,10) int32 (내부 캐시 view)
+#   print(eng.stats)
+# =============================================================================
+
+LAYERS = ("c1", "p1", "c2", "p2", "logits")
+
+
+# ----------------------------
+# 1) rect 유틸 (y0, y1, x0, x1) 반개구간
+# ----------------------------
+def _empty(r) -> bool:
+    return r[0] >= r[1] or r[2] >= r[3]
+
+def conv_out_rect(r, k: int, Hout: int, Wout: int):
+    return (max(0, r[0] - k + 1), min(Hout, r[1]), max(0, r[2] - k + 1), min(Wout, r[3]))
+
+def pool_out_rect(r, Hout: int, Wout: int):
+    return (r[0] // 2, min(Hout, (r[1] + 1) // 2), r[2] // 2, min(Wout, (r[3] + 1) // 2))
+
+def merge_rects(rects: list) -> list:
+    """겹치는 rect 는 bbox 하나로 합침 (같은 출력을 두 번 계산하지 않도록)"""
+    rects = [r for r in rects if not _empty(r)]
+    merged = True
+    while merged and len(rects) > 1:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a[0] < b[1] and b[0] < a[1] and a[2] < b[3] and b[2] < a[3]:
+                    rects[i] = (min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3]))
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
+
+def mask_bbox(mask: np.ndarray, oy: int = 0, ox: int = 0):
+    """(H,W[,C]) bool -> 바뀐 곳 bbox (오프셋 더함), 없으면 None"""
+    if mask.ndim == 3:
+        mask = mask.any(axis=2)
+    rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+    if len(rows) == 0:
+        return None
+    return (oy + rows[0], oy + rows[-1] + 1, ox + cols[0], ox + cols[-1] + 1)
+
+def dirty_rects(mask: np.ndarray, tile: int) -> list:
+    """
+    입력 diff mask (H,W) -> dirty rect 목록
+    tile x tile 격자로 묶고, 타일 행마다 연속된 dirty 타일 구간을 rect 하나로 (떨어진 변화는 따로)
+    """
+    H, W = mask.shape
+    th, tw = -(-H // tile), -(-W // tile)
+    pad = np.zeros((th * tile, tw * tile), dtype=bool)
+    pad[:H, :W] = mask
+    t = pad.reshape(th, tile, tw, tile).any(axis=(1, 3))
+    rects = []
+    for i in np.flatnonzero(t.any(axis=1)):
+        row = np.concatenate([[False], t[i], [False]])
+        edges = np.flatnonzero(row[1:] != row[:-1])
+        for a, b in zip(edges[::2], edges[1::2]):
+            rects.append((i * tile, min(H, (i + 1) * tile), a * tile, min(W, b * tile)))
+    return rects
+
+
+# ----------------------------
+# 2) 증분 엔진
+# ----------------------------
+class IncrementalEngine:
+    """
+    프레임 1개 스트림 (H,W) u8 -> logits 맵 (Ho,Wo,10) int32
+    - 첫 프레임 / 크기가 바뀌면 / dirty 면적 > full_above 이면 forward_frame 전체 계산
+    - stats: frames, full, unchanged(입력 동일), dense_skipped(pool2 불변),
+             work[layer] = 다시 계산한 출력 원소 수, total[layer] = 전체 계산했다면의 원소 수
+    """
+
+    def __init__(self, W1, W2, Wd, bd_q15, shifts=None, tile: int = 4, full_above: float = 0.5):
+        self.W1, self.W2, self.Wd, self.bd = W1, W2, Wd, bd_q15.astype(np.int32)
+        self.s1, self.s2 = shifts if shifts is not None else (7, 7)
+        C2 = W2.shape[-1]
+        self.P = int(round(np.sqrt(Wd.shape[0] // C2)))
+        self.Wk = Wd.reshape(self.P, self.P, C2, Wd.shape[1])
+        self.tile = tile
+        self.full_above = full_above
+        self.reset()
+
+    def reset(self):
+        self.prev = None
+        self.maps = None
+        self.stats = {"frames": 0, "full": 0, "unchanged": 0, "dense_skipped": 0,
+                      "work": {k: 0 for k in LAYERS}, "total": {k: 0 for k in LAYERS}}
+
+    # 레이어별 부분 재계산 -> 실제로 바뀐 bbox 목록
+    def _conv(self, src, dst, W, shift, rects, tag) -> list:
+        k = W.shape[0]
+        Hout, Wout = dst.shape[:2]
+        out = []
+        for o in merge_rects([conv_out_rect(r, k, Hout, Wout) for r in rects]):
+            x = src[o[0]:o[1] + k - 1, o[2]:o[3] + k - 1][None]
+            new = clamp_u8_batch(requant_tmp(conv_acc_batch(x, W), shift))[0]
+            out.append(self._store(dst, o, new, tag))
+        return [b for b in out if b is not None]
+
+    def _pool(self, src, dst, rects, tag) -> list:
+        Hout, Wout = dst.shape[:2]
+        out = []
+        for o in merge_rects([pool_out_rect(r, Hout, Wout) for r in rects]):
+            new = maxpool2x2_batch(src[2 * o[0]:2 * o[1], 2 * o[2]:2 * o[3]][None])[0]
+            out.append(self._store(dst, o, new, tag))
+        return [b for b in out if b is not None]
+
+    def _dense(self, src, dst, rects):
+        Hout, Wout = dst.shape[:2]
+        for o in merge_rects([conv_out_rect(r, self.P, Hout, Wout) for r in rects]):
+            x = src[o[0]:o[1] + self.P - 1, o[2]:o[3] + self.P - 1][None]
+            dst[o[0]:o[1], o[2]:o[3]] = conv_acc_batch(x, self.Wk)[0] + self.bd
+            self.stats["work"]["logits"] += (o[1] - o[0]) * (o[3] - o[2]) * dst.shape[2]
+
+    def _store(self, dst, o, new, tag):
+        cur = dst[o[0]:o[1], o[2]:o[3]]
+        self.stats["work"][tag] += new.size
+        bb = mask_bbox(cur != new, o[0], o[2])
+        cur[...] = new
+        return bb
+
+    def update(self, frame_u8: np.ndarray) -> np.ndarray:
+        frame = np.asarray(frame_u8, dtype=np.uint8)
+        st = self.stats
+        st["frames"] += 1
+
+        if self.prev is None or self.prev.shape != frame.shape:
+            return self._full(frame)
+
+        diff = frame != self.prev
+        if not diff.any():
+            for k in LAYERS:
+                st["total"][k] += self.maps[k].size
+            st["unchanged"] += 1
+            st["dense_skipped"] += 1
+            return self.maps["logits"]
+        rects = dirty_rects(diff, self.tile)
+        if self._c2_area(rects) > self.full_above * self.maps["c2"][..., 0].size:
+            return self._full(frame)
+
+        for k in LAYERS:
+            st["total"][k] += self.maps[k].size
+        self.prev[diff] = frame[diff]
+        m = self.maps
+        rects = self._conv(self.prev[..., None], m["c1"], self.W1, self.s1, rects, "c1")
+        rects = self._pool(m["c1"], m["p1"], rects, "p1")
+        rects = self._conv(m["p1"], m["c2"], self.W2, self.s2, rects, "c2")
+        rects = self._pool(m["c2"], m["p2"], rects, "p2")
+        if rects:
+            self._dense(m["p2"], m["logits"], rects)
+        else:
+            st["dense_skipped"] += 1
+        return m["logits"]
+
+    def _c2_area(self, rects) -> int:
+        """조기 종료 없이 c2 까지 전파했을 때 재계산 면적 (전체 계산 대체 판단용)"""
+        m = self.maps
+        k1, k2 = self.W1.shape[0], self.W2.shape[0]
+        rects = merge_rects([conv_out_rect(r, k1, *m["c1"].shape[:2]) for r in rects])
+        rects = merge_rects([pool_out_rect(r, *m["p1"].shape[:2]) for r in rects])
+        rects = merge_rects([conv_out_rect(r, k2, *m["c2"].shape[:2]) for r in rects])
+        return sum((r[1] - r[0]) * (r[3] - r[2]) for r in rects)
+
+    def _full(self, frame):
+        g = forward_frame(frame[None], self.W1, self.W2, self.Wd, self.bd, shifts=(self.s1, self.s2))
+        self.maps = {k: g[k][0].copy() for k in LAYERS}
+        self.prev = frame.copy()
+        self.stats["full"] += 1
+        for k in LAYERS:
+            self.stats["work"][k] += self.maps[k].size
+            self.stats["total"][k] += self.maps[k].size
+        return self.maps["logits"]
+
+    def work_fraction(self) -> dict:
+        """레이어별 (다시 계산한 원소 / 매 프레임 전체 계산 원소)"""
+        return {k: float(self.stats["work"][k] / max(self.stats["total"][k], 1)) for k in LAYERS}
@@ -0,0 +1,220 @@
+# int_server.py
+import time
+import json
+import struct
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from int_engine import DEFAULT_NPZ, load_weights, load_shifts, infer_batch
+
+# =============================================================================
+# [asyncio 추론 서버 - cnn_core_top 대신 쓰는 소프트웨어 트윈 (micro-batching)]
+#
+# 예측을 얻으려면 스크립트를 끝까지 돌리거나 보드를 올려야 했음.
+# 여기서는 Unix socket / localhost TCP 로 이미지 1장씩 받아서, 동시에 들어온 요청을
+# max_latency 안에서 배치로 묶어 int_engine.infer_batch (shift-only, 비트 단위 동일) 로 계산.
+#
+# ====== 프로토콜 (바이너리, little-endian) ======
+#   요청  'I' + 784 byte u8 (28x28 row-major)   -> 응답 'R' + class u8 + logits_q15 int32 x 10  (42 byte)
+#   요청  'S'                                    -> 응답 'S' + u32 길이 + JSON (stats)
+#   한 연결에서 여러 요청을 응답 기다리지 않고 보내도 됨 (pipelining, 응답은 요청 순서대로)
+#   잘못된 opcode 를 받으면 연결을 닫음
+#
+# ====== micro-batching ======
+#   첫 요청이 들어온 시각 + max_latency_ms 까지, 또는 max_batch 장이 모일 때까지 모아서 한 번에 추론
+#   추론은 전용 스레드 1개에서 (이벤트 루프는 그동안 다음 배치를 받음)
+#
+# ====== stats ======
+#   requests, batches, mean_batch, throughput (req/s, 첫 요청 ~ 마지막 응답),
+#   p50/p99/max 지연 (ms, 요청 수신 ~ 결과 준비, 최근 window 개)
+#
+# 사용 예:
+#   srv = InferServer(max_batch=64, max_latency_ms=2.0)
+#   await srv.start_tcp("127.0.0.1", 5555)      # 또는 await srv.start_unix("/tmp/cnn.sock")
+#   cls, logits = await request(reader, writer, img_u8)
+# =============================================================================
+
+IMG_BYTES = 28 * 28
+N_CLASS = 10
+OP_INFER, OP_STATS, OP_RESULT = b"I", b"S", b"R"
+RESULT = struct.Struct(f"<cB{N_CLASS}i")
+
+
+def percentile_ms(lat: list, q: float) -> float:
+    return float(np.percentile(lat, q) * 1e3) if len(lat) else 0.0
+
+
+class InferServer:
+    """
+    동시 요청 -> micro-batch -> infer_batch
+    max_batch: 배치 상한, max_latency_ms: 첫 요청 이후 더 기다리는 최대 시간
+    """
+
+    def __init__(self, npz_path: str = DEFAULT_NPZ, max_batch: int = 64, max_latency_ms: float = 2.0,
+                 window: int = 100000):
+        self.W1, self.W2, self.Wd, self.bd_q15 = load_weights(npz_path)
+        self.shifts = load_shifts(npz_path)
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1e3
+        self.lat = deque(maxlen=window)
+        self.stats = {"requests": 0, "batches": 0, "connections": 0}
+        self.t_first = self.t_last = None
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._queue = None
+        self._batcher = None
+        self._conns = set()
+        self.server = None
+
+    # ---- 배치 루프 ----
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        q = self._queue
+        while True:
+            items = [await q.get()]
+            deadline = items[0][2] + self.max_latency
+            while len(items) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    while len(items) < self.max_batch and not q.empty():
+                        items.append(q.get_nowait())
+                    break
+                try:
+                    items.append(await asyncio.wait_for(q.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            x = np.frombuffer(b"".join(it[0] for it in items), dtype=np.uint8).reshape(-1, 28, 28)
+            logits = await loop.run_in_executor(self._pool, self._infer, x)
+            pred = np.argmax(logits, axis=1)
+            now = time.perf_counter()
+            for (_, fut, t0), c, row in zip(items, pred, logits):
+                self.lat.append(now - t0)
+                if not fut.done():
+                    fut.set_result(RESULT.pack(OP_RESULT, int(c), *row.tolist()))
+            self.stats["requests"] += len(items)
+            self.stats["batches"] += 1
+            self.t_last = now
+
+    def _infer(self, x: np.ndarray) -> np.ndarray:
+        return infer_batch(x, self.W1, self.W2, self.Wd, self.bd_q15, shifts=self.shifts)
+
+    async def submit(self, img: bytes) -> bytes:
+        """이미지 784 byte -> 응답 42 byte (연결 없이 같은 루프 안에서 직접 호출할 때)"""
+        if len(img) != IMG_BYTES:
+            raise ValueError(f"image must be {IMG_BYTES} bytes (got {len(img)})")
+        fut = asyncio.get_running_loop().create_future()
+        t0 = time.perf_counter()
+        if self.t_first is None:
+            self.t_first = t0
+        self._queue.put_nowait((img, fut, t0))
+        return await fut
+
+    # ---- 연결 처리 ----
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        self._conns.add(asyncio.current_task())
+        pending = asyncio.Queue()
+
+        async def write_loop():
+            while True:
+                fut = await pending.get()
+                if fut is None:
+                    break
+                writer.write(await fut)
+                await writer.drain()
+
+        wtask = asyncio.ensure_future(write_loop())
+        try:
+            while True:
+                op = await reader.read(1)
+                if op == OP_INFER:
+                    img = await reader.readexactly(IMG_BYTES)
+                    pending.put_nowait(asyncio.ensure_future(self.submit(img)))
+                elif op == OP_STATS:
+                    fut = asyncio.get_running_loop().create_future()
+                    body = json.dumps(self.report()).encode()
+                    fut.set_result(OP_STATS + struct.pack("<I", len(body)) + body)
+                    pending.put_nowait(fut)
+                else:
+                    break                # EOF 또는 잘못된 opcode
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            wtask.cancel()
+        finally:
+            self._conns.discard(asyncio.current_task())
+            pending.put_nowait(None)
+            try:
+                await wtask
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            writer.close()
+
+    async def _start(self):
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.ensure_future(self._batch_loop())
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 5555):
+        await self._start()
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def start_unix(self, path: str):
+        await self._start()
+        self.server = await asyncio.start_unix_server(self._handle, path)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+        for t in list(self._conns):
+            t.cancel()
+        await asyncio.gather(*self._conns, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._pool.shutdown(wait=False)
+
+    def report(self) -> dict:
+        lat = list(self.lat)
+        n = self.stats["requests"]
+        span = (self.t_last - self.t_first) if n and self.t_last > self.t_first else 0.0
+        return {
+            **self.stats,
+            "mean_batch": n / self.stats["batches"] if self.stats["batches"] else 0.0,
+            "throughput": n / span if span else 0.0,
+            "p50_ms": percentile_ms(lat, 50),
+            "p99_ms": percentile_ms(lat, 99),
+            "max_ms": max(lat) * 1e3 if lat else 0.0,
+            "max_batch": self.max_batch,
+            "max_latency_ms": self.max_latency * 1e3,
+        }
+
+
+# ----------------------------
+# 클라이언트 헬퍼
+# ----------------------------
+async def send_image(writer: asyncio.StreamWriter, img_u8: np.ndarray):
+    writer.write(OP_INFER + np.ascontiguousarray(img_u8, dtype=np.uint8).tobytes())
+
+async def read_result(reader: asyncio.StreamReader):
+    """-> (class, logits_q15 (10,) int32)"""
+    msg = RESULT.unpack(await reader.readexactly(RESULT.size))
+    if msg[0] != OP_RESULT:
+        raise ValueError(f"unexpected response opcode {msg[0]!r}")
+    return msg[1], np.array(msg[2:], dtype=np.int32)
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, img_u8: np.ndarray):
+    await send_image(writer, img_u8)
+    await writer.drain()
+    return await read_result(reader)
+
+async def fetch_stats(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> dict:
+    writer.write(OP_STATS)
+    await writer.drain()
+    hdr = await reader.readexactly(5)
+    if hdr[:1] != OP_STATS:
+        raise ValueError(f"unexpected response opcode {hdr[:1]!r}")
+    n = struct.unpack("<I", hdr[1:])[0]
+    return json.loads(await reader.readexactly(n))
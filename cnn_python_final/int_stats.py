@@ -0,0 +1,178 @@
+# int_stats.py
+import json
+import numpy as np
+
+# =============================================================================
+# [포화/클램프 통계 - 배치 벡터화 버전]
+#
+# 03_infer_shift_only_int_stats.py 의 sat_stats / out_stats 딕셔너리는
+# 출력 픽셀 하나마다 requant_shift7 안에서 갱신돼서 너무 느렸음.
+# 여기서는 int_engine.forward_batch(..., stats=SatStats()) 로 배치 전체를 한 번에 누적.
+#
+# ====== 수집 항목 ======
+# conv (c1/c2), 출력 채널별:
+#   - tmp(=requant 후, clamp 전) 전체 히스토그램  (bincount, 범위는 자동 확장)
+#   - relu0 (tmp < 0), hi_clamp (tmp > 255)  -> 히스토그램에서 바로 계산
+#   - acc(int32 누산) min / max
+# 출력 u8 배열 (c1/p1/c2/p2), 채널별:
+#   - n, value==0, value==255
+# dense (fc), 클래스별:
+#   - acc(bias 전) min / max, logits(bias 후) min / max
+#
+# 결과: to_dict() -> JSON, save_npz() -> 히스토그램 원본
+# =============================================================================
+
+CONV_TAGS = ["c1", "c2"]
+OUT_TAGS = ["c1", "p1", "c2", "p2"]
+
+
+class ChannelHist:
+    """채널별 정수 히스토그램. bins = [lo, lo + nbins) 를 필요할 때마다 넓힘"""
+
+    def __init__(self, channels: int):
+        self.channels = channels
+        self.lo = 0
+        self.counts = np.zeros((channels, 0), dtype=np.int64)
+
+    def _grow(self, vmin: int, vmax: int):
+        nb = self.counts.shape[1]
+        if nb == 0:
+            self.lo = vmin
+            self.counts = np.zeros((self.channels, vmax - vmin + 1), dtype=np.int64)
+            return
+
+        hi = self.lo + nb - 1
+        new_lo, new_hi = min(self.lo, vmin), max(hi, vmax)
+        if (new_lo, new_hi) == (self.lo, hi):
+            return
+        grown = np.zeros((self.channels, new_hi - new_lo + 1), dtype=np.int64)
+        grown[:, self.lo - new_lo:self.lo - new_lo + nb] = self.counts
+        self.lo, self.counts = new_lo, grown
+
+    def update(self, v: np.ndarray):
+        """v: (..., C) 정수 배열"""
+        v = v.reshape(-1, self.channels)
+        if v.size == 0:
+            return
+        self._grow(int(v.min()), int(v.max()))
+
+        nb = self.counts.shape[1]
+        idx = (v - self.lo).astype(np.int64) + np.arange(self.channels, dtype=np.int64) * nb
+        self.counts += np.bincount(idx.ravel(), minlength=self.channels * nb).reshape(self.channels, nb)
+
+    def values(self) -> np.ndarray:
+        return np.arange(self.lo, self.lo + self.counts.shape[1], dtype=np.int64)
+
+    def count_where(self, mask_fn) -> np.ndarray:
+        """채널별로 mask_fn(values)가 True인 bin의 합"""
+        if self.counts.shape[1] == 0:
+            return np.zeros(self.channels, dtype=np.int64)
+        return self.counts[:, mask_fn(self.values())].sum(axis=1)
+
+
+class SatStats:
+    def __init__(self, conv_channels: int = 3, out_channels: int = 3, dense_units: int = 10):
+        self.tmp_hist = {k: ChannelHist(conv_channels) for k in CONV_TAGS}
+        self.acc_min = {k: np.full(conv_channels, np.iinfo(np.int64).max) for k in CONV_TAGS}
+        self.acc_max = {k: np.full(conv_channels, np.iinfo(np.int64).min) for k in CONV_TAGS}
+
+        self.out = {k: {"n": np.zeros(out_channels, dtype=np.int64),
+                        "z": np.zeros(out_channels, dtype=np.int64),
+                        "m255": np.zeros(out_channels, dtype=np.int64)} for k in OUT_TAGS}
+
+        self.fc = {
+            "acc_min": np.full(dense_units, np.iinfo(np.int64).max),
+            "acc_max": np.full(dense_units, np.iinfo(np.int64).min),
+            "logit_min": np.full(dense_units, np.iinfo(np.int64).max),
+            "logit_max": np.full(dense_units, np.iinfo(np.int64).min),
+        }
+        self.images = 0
+
+    # ----------------------------
+    # forward_batch 에서 호출하는 hook
+    # ----------------------------
+    def update_conv(self, tag: str, acc: np.ndarray, tmp: np.ndarray):
+        C = acc.shape[-1]
+        a = acc.reshape(-1, C)
+        self.acc_min[tag] = np.minimum(self.acc_min[tag], a.min(axis=0))
+        self.acc_max[tag] = np.maximum(self.acc_max[tag], a.max(axis=0))
+        self.tmp_hist[tag].update(tmp)
+        if tag == CONV_TAGS[0]:
+            self.images += len(acc)
+
+    def update_out(self, tag: str, a_u8: np.ndarray):
+        C = a_u8.shape[-1]
+        a = a_u8.reshape(-1, C)
+        o = self.out[tag]
+        o["n"] += a.shape[0]
+        o["z"] += np.count_nonzero(a == 0, axis=0)
+        o["m255"] += np.count_nonzero(a == 255, axis=0)
+
+    def update_dense(self, tag: str, acc: np.ndarray, logits: np.ndarray):
+        f = self.fc
+        f["acc_min"] = np.minimum(f["acc_min"], acc.min(axis=0))
+        f["acc_max"] = np.maximum(f["acc_max"], acc.max(axis=0))
+        f["logit_min"] = np.minimum(f["logit_min"], logits.min(axis=0))
+        f["logit_max"] = np.maximum(f["logit_max"], logits.max(axis=0))
+
+    # ----------------------------
+    # 결과 정리
+    # ----------------------------
+    def sat_summary(self, tag: str) -> dict:
+        h = self.tmp_hist[tag]
+        total = h.counts.sum(axis=1)
+        relu0 = h.count_where(lambda v: v < 0)
+        hi_clamp = h.count_where(lambda v: v > 255)
+        return {
+            "total": total, "relu0": relu0, "hi_clamp": hi_clamp,
+            "tmp_min": h.lo, "tmp_max": h.lo + h.counts.shape[1] - 1,
+            "acc_min": self.acc_min[tag], "acc_max": self.acc_max[tag],
+        }
+
+    def to_dict(self) -> dict:
+        """JSON 직렬화용 (numpy -> list/int)"""
+        d = {"images": self.images, "sat": {}, "out": {}, "fc": {}}
+        for k in CONV_TAGS:
+            s = self.sat_summary(k)
+            d["sat"][k] = {
+                "total": int(s["total"].sum()),
+                "relu0": int(s["relu0"].sum()),
+                "hi_clamp": int(s["hi_clamp"].sum()),
+                "tmp_min": int(s["tmp_min"]),
+                "tmp_max": int(s["tmp_max"]),
+                "per_channel": {
+                    "total": s["total"].tolist(),
+                    "relu0": s["relu0"].tolist(),
+                    "hi_clamp": s["hi_clamp"].tolist(),
+                    "acc_min": s["acc_min"].tolist(),
+                    "acc_max": s["acc_max"].tolist(),
+                },
+            }
+        for k in OUT_TAGS:
+            o = self.out[k]
+            d["out"][k] = {
+                "n": int(o["n"].sum()), "z": int(o["z"].sum()), "m255": int(o["m255"].sum()),
+                "per_channel": {kk: vv.tolist() for kk, vv in o.items()},
+            }
+        d["fc"] = {k: v.tolist() for k, v in self.fc.items()}
+        return d
+
+    def save_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def save_npz(self, path: str):
+        """히스토그램 원본: {tag}_tmp_hist (C, nbins), {tag}_tmp_lo (bin 0의 tmp 값)"""
+        arrays = {}
+        for k in CONV_TAGS:
+            h = self.tmp_hist[k]
+            arrays[f"{k}_tmp_hist"] = h.counts
+            arrays[f"{k}_tmp_lo"] = np.int64(h.lo)
+            arrays[f"{k}_acc_min"] = self.acc_min[k]
+            arrays[f"{k}_acc_max"] = self.acc_max[k]
+        for k in OUT_TAGS:
+            for kk, vv in self.out[k].items():
+                arrays[f"{k}_out_{kk}"] = vv
+        for kk, vv in self.fc.items():
+            arrays[f"fc_{kk}"] = vv
+        np.savez(path, **arrays)
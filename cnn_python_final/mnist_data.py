@@ -0,0 +1,137 @@
+# mnist_data.py
+import os
+import gzip
+import urllib.request
+import numpy as np
+
+# =============================================================================
+# [MNIST 로더 - TensorFlow 없이, mmap 캐시]
+#
+# 정수 전용 도구들(03_*, 04_*)이 tf.keras.datasets.mnist.load_data() 하나 때문에
+# TensorFlow를 import 하면서 시작이 몇 초씩 걸리고 메모리도 GB 단위로 먹었음.
+#
+# ====== 동작 ======
+# 1) 캐시(.npy)가 있으면 np.load(mmap_mode='r') 로 바로 반환 (zero-copy u8 view)
+# 2) 없으면 아래 순서로 원본을 찾아서 한 번만 캐시 생성
+#    - mnist.npz  (작업 폴더 / 이 파일 폴더 / ~/.keras/datasets, 05_gen_rom_* 과 같은 파일)
+#    - IDX 파일    (train-images-idx3-ubyte[.gz] 등 4개)
+#    - 둘 다 없으면 05_gen_rom_* 과 같은 URL에서 mnist.npz 다운로드
+#
+# 사용법:
+#   from mnist_data import load_mnist_u8
+#   x_test_u8, y_test = load_mnist_u8("test")   # (10000,28,28) u8 memmap, (10000,) u8 memmap
+#   x_all, y_all = load_mnist_u8("all")         # train 60k + test 10k
+# =============================================================================
+
+try:
+    BASE = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    BASE = os.getcwd()
+
+MNIST_URL = "https://storage.googleapis.com/tensorflow/tf-keras-datasets/mnist.npz"
+CACHE_DIR = os.path.join(BASE, "export", "mnist_cache")
+
+NPZ_CANDIDATES = [
+    os.path.join(os.getcwd(), "mnist.npz"),
+    os.path.join(BASE, "mnist.npz"),
+    os.path.join(os.path.expanduser("~"), ".keras", "datasets", "mnist.npz"),
+]
+
+IDX_FILES = {
+    "x_train": "train-images-idx3-ubyte",
+    "y_train": "train-labels-idx1-ubyte",
+    "x_test": "t10k-images-idx3-ubyte",
+    "y_test": "t10k-labels-idx1-ubyte",
+}
+
+SPLITS = ("train", "test", "all")
+
+
+# ----------------------------
+# 1) 원본 읽기 (npz / IDX)
+# ----------------------------
+def _read_idx(path: str) -> np.ndarray:
+    """IDX(.gz 포함) -> uint8 배열 (이미지: (N,28,28), 라벨: (N,))"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        raw = f.read()
+
+    magic = int.from_bytes(raw[0:4], "big")
+    ndim = magic & 0xFF
+    if (magic >> 8) != 0x08 or ndim not in (1, 3):
+        raise ValueError(f"not a uint8 IDX file: {path} (magic=0x{magic:08X})")
+
+    dims = [int.from_bytes(raw[4 + 4 * i:8 + 4 * i], "big") for i in range(ndim)]
+    return np.frombuffer(raw, dtype=np.uint8, offset=4 + 4 * ndim).reshape(dims)
+
+def _find_idx_dir(search_dirs: list):
+    for d in search_dirs:
+        if all(os.path.exists(os.path.join(d, n)) or os.path.exists(os.path.join(d, n + ".gz"))
+               for n in IDX_FILES.values()):
+            return d
+    return None
+
+def _load_source(npz_path: str = None) -> dict:
+    """원본 4개 배열 {x_train, y_train, x_test, y_test} (uint8)"""
+    candidates = [npz_path] if npz_path else NPZ_CANDIDATES
+    for p in candidates:
+        if p and os.path.exists(p):
+            print(f"[mnist_data] source: {p}")
+            with np.load(p) as d:
+                return {k: d[k].astype(np.uint8) for k in IDX_FILES}
+
+    idx_dir = _find_idx_dir([os.getcwd(), BASE, os.path.join(BASE, "mnist")])
+    if idx_dir:
+        print(f"[mnist_data] source: IDX files in {idx_dir}")
+        out = {}
+        for k, name in IDX_FILES.items():
+            p = os.path.join(idx_dir, name)
+            out[k] = _read_idx(p if os.path.exists(p) else p + ".gz")
+        return out
+
+    local = os.path.join(BASE, "mnist.npz")
+    print(f"[mnist_data] downloading {MNIST_URL} -> {local}")
+    urllib.request.urlretrieve(MNIST_URL, local)
+    with np.load(local) as d:
+        return {k: d[k].astype(np.uint8) for k in IDX_FILES}
+
+
+# ----------------------------
+# 2) 캐시
+# ----------------------------
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{key}.npy")
+
+def _save_atomic(path: str, a: np.ndarray):
+    tmp = path + ".tmp.npy"
+    np.save(tmp, np.ascontiguousarray(a, dtype=np.uint8))
+    os.replace(tmp, path)
+
+def build_cache(cache_dir: str = CACHE_DIR, npz_path: str = None):
+    """원본 -> {x,y}_{train,test,all}.npy 생성 (덮어씀)"""
+    os.makedirs(cache_dir, exist_ok=True)
+    src = _load_source(npz_path)
+
+    for k, a in src.items():
+        _save_atomic(_cache_path(cache_dir, k), a)
+    _save_atomic(_cache_path(cache_dir, "x_all"), np.concatenate([src["x_train"], src["x_test"]]))
+    _save_atomic(_cache_path(cache_dir, "y_all"), np.concatenate([src["y_train"], src["y_test"]]))
+    print(f"[mnist_data] cache built: {cache_dir}")
+
+
+# ----------------------------
+# 3) 공개 API
+# ----------------------------
+def load_mnist_u8(split: str = "test", cache_dir: str = CACHE_DIR, npz_path: str = None):
+    """
+    split: train / test / all
+    return: (x (N,28,28) uint8, y (N,) uint8) - 읽기 전용 memmap (복사 없음)
+    """
+    if split not in SPLITS:
+        raise ValueError(f"split must be one of {SPLITS}: {split}")
+
+    xp, yp = _cache_path(cache_dir, f"x_{split}"), _cache_path(cache_dir, f"y_{split}")
+    if not (os.path.exists(xp) and os.path.exists(yp)):
+        build_cache(cache_dir, npz_path)
+
+    return np.load(xp, mmap_mode="r"), np.load(yp, mmap_mode="r")
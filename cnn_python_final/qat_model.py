@@ -0,0 +1,510 @@
+# qat_model.py
+import time
+import numpy as np
+import tensorflow as tf
+
+from int_engine import predict_batch
+
+# =============================================================================
+# [Shift-only QAT 모델 부품]
+#
+# 01_train_export_shift_only.py 에 있던 fake-quant / QuantConv2D / QuantDense /
+# 모델 구성 / export 를 import 가능한 모듈로 분리 (구조 탐색 01_arch_search.py 와 공유)
+#
+# ====== config ======
+#   f1, k1 : conv1 필터 수 / 커널 크기 (k1 x k1)
+#   f2, k2 : conv2 필터 수 / 커널 크기
+#   dense_bias : dense bias 사용 여부 (False면 export bd_q15 = 0)
+#   weight_quant : "i8"   = int8 Q1.7 (현재 RTL, 곱셈기 MAC)
+#                  "pow2" = 0 / ±2^e (e=0..6, Q1.7 격자 위) -> MAC를 시프트로 (DSP 없는 datapath)
+#   shift_mode : "fixed"   = 모든 conv requant (acc + 64) >> 7 (현재 RTL)
+#                "layer"   = conv 레이어별 power-of-two scale 학습 -> 레이어별 shift
+#                "channel" = weight scale을 출력 채널별로 학습 -> 채널별 shift
+#     (학습되는 scale: weight 2^kw[c], conv 출력 activation 2^ka  ->  export s1/s2, 1-2 참고)
+#   DEFAULT_CONFIG = 현재 RTL (3ch 5x5 -> 3ch 5x5 -> 48->10, bias 있음)
+#
+# 공간 크기: conv VALID (H-k+1), maxpool 2x2 VALID (floor(H/2))
+#   예) 28 -k1=5-> 24 -> 12 -k2=5-> 8 -> 4  => flatten 4*4*3 = 48
+# =============================================================================
+
+DEFAULT_CONFIG = {"f1": 3, "k1": 5, "f2": 3, "k2": 5, "dense_bias": True, "weight_quant": "i8",
+                  "shift_mode": "fixed"}
+WEIGHT_QUANT_MODES = ("i8", "pow2")
+SHIFT_MODES = ("fixed", "layer", "channel")
+N_CLASSES = 10
+
+
+# ----------------------------
+# 1) STE(학습용 라운딩)
+#    - forward: round
+#    - backward: gradient는 identity로 흘림
+# ----------------------------
+def ste_round(x: tf.Tensor) -> tf.Tensor:
+    return x + tf.stop_gradient(tf.round(x) - x)
+
+def fake_quant_u8_q08(x: tf.Tensor) -> tf.Tensor:
+    """
+    activation을 u8(Q0.8) 격자에 '강제'하는 함수
+      - real -> u8: u8 = round(real*256)
+      - clamp 0..255
+      - 다시 real로: u8/256
+    """
+    # ReLU 가정(음수는 0으로)
+    x = tf.maximum(x, 0.0)
+
+    q = ste_round(x * 256.0)           # u8 grid로 스냅
+    q = tf.clip_by_value(q, 0.0, 255.0)
+    return q / 256.0                   # 다시 real로(격자는 Q0.8)
+
+def fake_quant_i8_q17(w: tf.Tensor) -> tf.Tensor:
+    """
+    weight를 int8(Q1.7) 격자에 '강제'
+      - real -> i8: i8 = round(real*128)
+      - clamp -128..127
+      - 다시 real로: i8/128
+    """
+    q = ste_round(w * 128.0)
+    q = tf.clip_by_value(q, -128.0, 127.0)
+    return q / 128.0
+
+# pow2 격자: Q1.7 정수 값 0 / ±1, ±2, ..., ±64  (4bit code = sign + exponent, int_engine.pow2_encode)
+#   - |q| < 0.5            -> 0
+#   - 그 외 가장 가까운 2^e  (2^e 와 2^(e+1) 의 경계 = 1.5 * 2^e, 경계 위는 큰 쪽)
+#     e = (|q| >= 1.5) + (|q| >= 3) + ... + (|q| >= 48)   <- log 없이 비교만 (TF/NumPy 결과 동일)
+#   - |q| > 96 (= 1.5 * 64) 은 64로 포화 -> 이 구간은 gradient 0 (i8 의 clip 과 같은 역할)
+POW2_EMAX = 6
+POW2_CLIP = 1.5 * (1 << POW2_EMAX)
+
+def _snap_pow2(q: tf.Tensor) -> tf.Tensor:
+    """Q1.7 정수 단위 값 q -> 0 / ±2^e (gradient 없음)"""
+    mag = tf.abs(q)
+    p = tf.ones_like(q)
+    for k in range(POW2_EMAX):
+        p = tf.where(mag >= 1.5 * (1 << k), p * 2.0, p)
+    return tf.stop_gradient(tf.where(mag < 0.5, tf.zeros_like(q), tf.sign(q) * p))
+
+def fake_quant_pow2_q17(w: tf.Tensor) -> tf.Tensor:
+    """
+    weight를 power-of-two(Q1.7 위의 0 / ±2^e) 격자에 '강제'
+      - clip -96..96 (포화 구간 gradient 0)
+      - forward: 가장 가까운 0 / ±2^e, backward: STE(identity)
+    """
+    q = tf.clip_by_value(w * 128.0, -POW2_CLIP, POW2_CLIP)
+    q = q + tf.stop_gradient(_snap_pow2(q) - q)
+    return q / 128.0
+
+# ----------------------------
+# 1-1) (--fast) fused fake-quant
+#    - forward: 위 함수와 같은 값
+#    - backward: 위 STE 체인과 같은 mask를 한 번에 계산
+#        u8: maximum(x,0) -> x>=0 에서만 통과, clip -> round(x*256) <= 255 에서만 통과
+#        i8: clip -> -128 <= round(w*128) <= 127 에서만 통과
+# ----------------------------
+@tf.custom_gradient
+def fused_fake_quant_u8_q08(x: tf.Tensor):
+    r = tf.round(tf.maximum(x, 0.0) * 256.0)
+    y = tf.minimum(r, 255.0) / 256.0
+
+    def grad(dy):
+        return dy * tf.cast((x >= 0.0) & (r <= 255.0), dy.dtype)
+    return y, grad
+
+@tf.custom_gradient
+def fused_fake_quant_i8_q17(w: tf.Tensor):
+    r = tf.round(w * 128.0)
+    y = tf.clip_by_value(r, -128.0, 127.0) / 128.0
+
+    def grad(dy):
+        return dy * tf.cast((r >= -128.0) & (r <= 127.0), dy.dtype)
+    return y, grad
+
+@tf.custom_gradient
+def fused_fake_quant_pow2_q17(w: tf.Tensor):
+    q = w * 128.0
+    y = _snap_pow2(tf.clip_by_value(q, -POW2_CLIP, POW2_CLIP)) / 128.0
+
+    def grad(dy):
+        return dy * tf.cast(tf.abs(q) <= POW2_CLIP, dy.dtype)
+    return y, grad
+
+def quant_u8(x: tf.Tensor, fused: bool = False) -> tf.Tensor:
+    return fused_fake_quant_u8_q08(x) if fused else fake_quant_u8_q08(x)
+
+def quant_i8(w: tf.Tensor, fused: bool = False) -> tf.Tensor:
+    return fused_fake_quant_i8_q17(w) if fused else fake_quant_i8_q17(w)
+
+def quant_w(w: tf.Tensor, fused: bool = False, weight_quant: str = "i8") -> tf.Tensor:
+    """weight_quant 에 따라 i8(Q1.7) / pow2 fake-quant"""
+    if weight_quant == "pow2":
+        return fused_fake_quant_pow2_q17(w) if fused else fake_quant_pow2_q17(w)
+    return quant_i8(w, fused)
+
+# ----------------------------
+# 1-2) 학습되는 power-of-two scale (shift_mode = "layer" / "channel")
+#    - 변수 log2_s (float) -> k = ste_round(log2_s) -> scale 2^k
+#      activation: real = u8 * 2^(k-8)   (frac = 8 - k,  k=0 이면 Q0.8)
+#      weight    : real = i8 * 2^(k-7)   (frac = 7 - k,  k=0 이면 Q1.7)
+#    - 격자 자체는 위 u8 / i8 / pow2 fake-quant 그대로 쓰고 앞뒤로 2^k 만 곱함
+#      -> scale gradient = 양자화 오차 (clip 구간이면 scale을 키우는 방향)
+#    - 정수 쪽: conv acc frac = 입력 frac + weight frac
+#      => requant shift = 입력 frac + weight frac[c] - 출력 frac  (곱셈 없음)
+#    - fused(custom_gradient) 버전 없음 (scale gradient가 필요해서 STE 체인 사용)
+# ----------------------------
+def fake_quant_u8_scaled(x: tf.Tensor, k: tf.Tensor) -> tf.Tensor:
+    s = tf.pow(2.0, k)
+    return fake_quant_u8_q08(x / s) * s
+
+def fake_quant_w_scaled(w: tf.Tensor, k: tf.Tensor, weight_quant: str = "i8") -> tf.Tensor:
+    s = tf.pow(2.0, k)
+    q = fake_quant_pow2_q17(w / s) if weight_quant == "pow2" else fake_quant_i8_q17(w / s)
+    return q * s
+
+
+# ----------------------------
+# 2) QuantConv2D / QuantDense
+#    - 내부 파라미터는 float로 학습
+#    - forward에서만 fake-quant로 "정수 세계관"을 흉내냄
+# ----------------------------
+#    - quant_input=False: 입력이 이미 앞단(QuantActScaled / 입력 u8)에서 격자에 올라와 있을 때
+#      (학습 scale 모드에서는 입력이 Q0.8이 아니므로 다시 u8(Q0.8) 스냅하면 안 됨)
+# ----------------------------
+def _check_weight_quant(weight_quant: str) -> str:
+    if weight_quant not in WEIGHT_QUANT_MODES:
+        raise ValueError(f"unknown weight_quant: {weight_quant} (one of {WEIGHT_QUANT_MODES})")
+    return weight_quant
+
+def _check_shift_mode(shift_mode: str) -> str:
+    if shift_mode not in SHIFT_MODES:
+        raise ValueError(f"unknown shift_mode: {shift_mode} (one of {SHIFT_MODES})")
+    return shift_mode
+
+class QuantConv2D(tf.keras.layers.Layer):
+    def __init__(self, filters, kernel_size, use_bias=False, name=None, fused=False, weight_quant="i8",
+                 shift_mode="fixed", quant_input=True):
+        super().__init__(name=name)
+        self.filters = int(filters)
+        self.kernel_size = tuple(kernel_size)
+        self.use_bias = bool(use_bias)
+        self.fused = bool(fused)
+        self.weight_quant = _check_weight_quant(weight_quant)
+        self.shift_mode = _check_shift_mode(shift_mode)
+        self.quant_input = bool(quant_input)
+
+    def build(self, input_shape):
+        kh, kw = self.kernel_size
+        cin = int(input_shape[-1])
+
+        self.w = self.add_weight(
+            name="kernel",
+            shape=(kh, kw, cin, self.filters),
+            initializer="glorot_uniform",
+            trainable=True
+        )
+        if self.use_bias:
+            self.b = self.add_weight(
+                name="bias",
+                shape=(self.filters,),
+                initializer="zeros",
+                trainable=True
+            )
+        else:
+            self.b = None
+
+        # (shift_mode != fixed) weight scale 지수: 레이어 1개 또는 출력 채널별
+        if self.shift_mode != "fixed":
+            self.log2_s = self.add_weight(
+                name="log2_scale",
+                shape=(self.filters,) if self.shift_mode == "channel" else (),
+                initializer="zeros",
+                trainable=True
+            )
+        else:
+            self.log2_s = None
+
+    def scale_exp(self) -> np.ndarray:
+        """weight scale 지수 k (출력 채널별, int) -> weight frac = 7 - k"""
+        if self.log2_s is None:
+            return np.zeros(self.filters, dtype=np.int32)
+        k = np.round(self.log2_s.numpy()).astype(np.int32)
+        return np.broadcast_to(k, (self.filters,)).copy()
+
+    def call(self, x):
+        # 입력 activation을 u8(Q0.8) 격자에 맞춤
+        xq = quant_u8(x, self.fused) if self.quant_input else x
+
+        # weight를 i8(Q1.7) 또는 pow2 격자에 맞춤 (학습 scale이면 2^k 배 격자)
+        if self.log2_s is not None:
+            wq = fake_quant_w_scaled(self.w, ste_round(self.log2_s), self.weight_quant)
+        else:
+            wq = quant_w(self.w, self.fused, self.weight_quant)
+
+        # conv 연산(실제는 float지만, 값은 Q격자에 맞춰져 있음)
+        y = tf.nn.conv2d(xq, wq, strides=1, padding="VALID")
+
+        # conv bias는 FPGA에서 안 쓰는 게 목표(use_bias=False)라서 보통 없음
+        if self.b is not None:
+            y = y + self.b
+
+        return y
+
+class QuantDense(tf.keras.layers.Layer):
+    def __init__(self, units, use_bias=True, name=None, fused=False, weight_quant="i8", quant_input=True):
+        super().__init__(name=name)
+        self.units = int(units)
+        self.use_bias = bool(use_bias)
+        self.fused = bool(fused)
+        self.weight_quant = _check_weight_quant(weight_quant)
+        self.quant_input = bool(quant_input)
+
+    def build(self, input_shape):
+        cin = int(input_shape[-1])
+        self.w = self.add_weight(
+            name="kernel",
+            shape=(cin, self.units),
+            initializer="glorot_uniform",
+            trainable=True
+        )
+        if self.use_bias:
+            self.b = self.add_weight(
+                name="bias",
+                shape=(self.units,),
+                initializer="zeros",
+                trainable=True
+            )
+        else:
+            self.b = None
+
+    def call(self, x):
+        # 입력 activation u8(Q0.8)
+        xq = quant_u8(x, self.fused) if self.quant_input else x
+        # weight i8(Q1.7) 또는 pow2
+        wq = quant_w(self.w, self.fused, self.weight_quant)
+
+        y = tf.matmul(xq, wq)
+        if self.b is not None:
+            # (선택) bias도 Q15로 fake-quant하면 더 1:1에 가까워짐
+            # bq = ste_round(self.b * 32768.0) / 32768.0
+            # y = y + bq
+            y = y + self.b
+        return y
+
+class QuantActU8(tf.keras.layers.Layer):
+    """(--fast) 레이어 사이 u8 스냅을 Layer 하나로 (fused op)"""
+
+    def call(self, x):
+        return quant_u8(x, fused=True)
+
+def act_quant(x, name, fused=False):
+    return QuantActU8(name=name)(x) if fused else fake_quant_u8_q08(x)
+
+class QuantActScaled(tf.keras.layers.Layer):
+    """(shift_mode != fixed) 학습되는 scale 2^k 의 u8 스냅. frac = 8 - k"""
+
+    def build(self, input_shape):
+        self.log2_s = self.add_weight(name="log2_scale", shape=(), initializer="zeros", trainable=True)
+
+    def frac(self) -> int:
+        return 8 - int(np.round(self.log2_s.numpy()))
+
+    def call(self, x):
+        return fake_quant_u8_scaled(x, ste_round(self.log2_s))
+
+
+# ----------------------------
+# 3) 모델 구성 (config -> Keras 모델)
+#    - conv bias 없음(=FPGA 동일)
+#    - loss에서 from_logits=True 사용 => 마지막 Dense는 softmax 없이 logits 출력
+# ----------------------------
+def layer_shapes(config: dict) -> dict:
+    """config -> 레이어별 (H, W, C)"""
+    h1 = 28 - config["k1"] + 1
+    p1 = h1 // 2
+    h2 = p1 - config["k2"] + 1
+    p2 = h2 // 2
+    if h1 < 1 or h2 < 1 or p2 < 1:
+        raise ValueError(f"kernel too large for 28x28 input: {config}")
+    return {
+        "c1": (h1, h1, config["f1"]), "p1": (p1, p1, config["f1"]),
+        "c2": (h2, h2, config["f2"]), "p2": (p2, p2, config["f2"]),
+        "flat": p2 * p2 * config["f2"],
+    }
+
+def model_cost(config: dict) -> dict:
+    """
+    하드웨어 비용 지표
+      macs         : 이미지 1장당 곱셈-누산 수 (conv1 + conv2 + dense)
+      weight_bytes : int8 가중치 (pow2면 4bit code 2개/byte) + (dense bias 있으면) int32 bias
+      (pow2 의 MAC 은 곱셈기 없는 shift-add)
+    """
+    s = layer_shapes(config)
+    h1, _, f1 = s["c1"]
+    h2, _, f2 = s["c2"]
+    k1, k2 = config["k1"], config["k2"]
+
+    macs = h1 * h1 * k1 * k1 * 1 * f1 + h2 * h2 * k2 * k2 * f1 * f2 + s["flat"] * N_CLASSES
+    n_w = k1 * k1 * 1 * f1 + k2 * k2 * f1 * f2 + s["flat"] * N_CLASSES
+    w_bytes = (n_w + 1) // 2 if config.get("weight_quant", "i8") == "pow2" else n_w
+    return {
+        "macs": int(macs),
+        "weight_bytes": int(w_bytes + (4 * N_CLASSES if config["dense_bias"] else 0)),
+    }
+
+def build_model(config: dict = DEFAULT_CONFIG, fused: bool = False) -> tf.keras.Model:
+    c = dict(DEFAULT_CONFIG, **config)
+    layer_shapes(c)   # 크기 검사
+    wq, sm = c["weight_quant"], _check_shift_mode(c["shift_mode"])
+    learn = sm != "fixed"
+
+    inp = tf.keras.Input(shape=(28, 28, 1), name="in")
+
+    # ---- conv1 ----
+    x = QuantConv2D(c["f1"], (c["k1"], c["k1"]), use_bias=False, name="qconv1", fused=fused,
+                    weight_quant=wq, shift_mode=sm)(inp)
+    x = tf.keras.layers.ReLU()(x)
+    # conv1 결과는 FPGA에서 u8로 저장된다고 가정 => Q0.8로 스냅 (학습 scale이면 2^k 배 격자)
+    x = QuantActScaled(name="q_c1")(x) if learn else act_quant(x, "q_c1", fused)
+
+    # ---- pool1 ----
+    x = tf.keras.layers.MaxPooling2D((2, 2))(x)
+    # pool 출력도 FPGA에서 u8로 저장(단순화/안정)
+    # (학습 scale: max는 격자 값을 그대로 고르므로 c1 과 같은 격자, 다시 스냅하지 않음)
+    if not learn:
+        x = act_quant(x, "q_p1", fused)
+
+    # ---- conv2 ----
+    x = QuantConv2D(c["f2"], (c["k2"], c["k2"]), use_bias=False, name="qconv2", fused=fused,
+                    weight_quant=wq, shift_mode=sm, quant_input=not learn)(x)
+    x = tf.keras.layers.ReLU()(x)
+    x = QuantActScaled(name="q_c2")(x) if learn else act_quant(x, "q_c2", fused)
+
+    # ---- pool2 ----
+    x = tf.keras.layers.MaxPooling2D((2, 2))(x)
+    if not learn:
+        x = act_quant(x, "q_p2", fused)
+
+    # ---- flatten + dense ----
+    x = tf.keras.layers.Flatten()(x)            # 기본 config: 4*4*3 = 48
+    logits = QuantDense(N_CLASSES, use_bias=c["dense_bias"], name="qdense", fused=fused,
+                        weight_quant=wq, quant_input=not learn)(x)
+
+    return tf.keras.Model(inp, logits, name="shift_only_cnn")
+
+
+# ----------------------------
+# 4) u8 tf.data 파이프라인 (--fast)
+#   - cache: u8 원본만 캐시, float 변환은 batch 뒤 map에서 (배치 단위 벡터 연산)
+# ----------------------------
+def u8_to_input(x, y):
+    return tf.cast(x, tf.float32)[..., None] / 256.0, y
+
+def make_u8_dataset(x_u8, y, batch_size, shuffle, seed=0):
+    ds = tf.data.Dataset.from_tensor_slices((x_u8, y)).cache()
+    if shuffle:
+        ds = ds.shuffle(len(x_u8), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.map(u8_to_input, num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+# ----------------------------
+# 5) Export: FPGA가 바로 먹을 형태
+#    - weights: int8(Q1.7)  (pow2 모드도 int8 값 그대로 저장, 값이 0 / ±2^e 뿐)
+#    - dense bias: int32(Q15)
+#    - w_quant: "i8" / "pow2"  (02_export_hex_for_fpga.py 가 pow2 면 4bit code도 저장)
+#    - s1 / s2: conv1 / conv2 출력 채널별 requant shift (fixed 면 전부 7)
+#      act_frac: [입력, c1, c2] activation frac bits (fixed 면 [8, 8, 8])
+#      dense bias는 dense 누산 도메인 2^-(f_c2 + 7) 로 저장 (fixed 면 Q15)
+# ----------------------------
+def float_to_i8_q17(w_float: np.ndarray) -> np.ndarray:
+    q = np.round(w_float * 128.0)
+    q = np.clip(q, -128, 127).astype(np.int8)
+    return q
+
+def float_to_pow2_q17(w_float: np.ndarray) -> np.ndarray:
+    """fake_quant_pow2_q17 forward 와 같은 값 -> int8 (0 / ±2^e)"""
+    q = np.clip(w_float.astype(np.float32) * 128.0, -POW2_CLIP, POW2_CLIP)
+    mag = np.abs(q)
+    e = sum((mag >= 1.5 * (1 << k)).astype(np.int32) for k in range(POW2_EMAX))
+    return np.where(mag < 0.5, 0, np.sign(q) * (1 << e)).astype(np.int8)
+
+def quantize_export(model) -> dict:
+    """현재 float 가중치 -> {W1_q, W2_q, Wd_q (int8), bd_q15 (int32), w_quant, s1, s2, act_frac}"""
+    conv1, conv2 = model.get_layer("qconv1"), model.get_layer("qconv2")
+    W1_f = conv1.w.numpy()                             # (k1,k1,1,f1)
+    W2_f = conv2.w.numpy()                             # (k2,k2,f1,f2)
+    dense = model.get_layer("qdense")
+    Wd_f = dense.w.numpy()                             # (flat,10)
+    bd_f = dense.b.numpy() if dense.b is not None else np.zeros(dense.units, np.float32)
+    to_q = float_to_pow2_q17 if dense.weight_quant == "pow2" else float_to_i8_q17
+
+    # activation frac (입력 = Q0.8) / weight scale 지수 (출력 채널별)
+    if conv1.shift_mode == "fixed":
+        f_c1 = f_c2 = 8
+    else:
+        f_c1, f_c2 = model.get_layer("q_c1").frac(), model.get_layer("q_c2").frac()
+    kw1, kw2 = conv1.scale_exp(), conv2.scale_exp()
+
+    return {
+        # weight / 2^k 를 Q1.7 격자로 (k=0 이면 기존과 동일)
+        "W1_q": to_q(W1_f / np.exp2(kw1)),
+        "W2_q": to_q(W2_f / np.exp2(kw2)),
+        "Wd_q": to_q(Wd_f),
+        # Dense bias를 acc 도메인(f_c2=8 이면 Q15=1/32768)으로 저장
+        "bd_q15": np.round(bd_f * 2.0 ** (f_c2 + 7)).astype(np.int32),
+        "w_quant": np.array(dense.weight_quant),
+        # requant shift = 입력 frac + weight frac(7 - k) - 출력 frac
+        "s1": (8 + (7 - kw1) - f_c1).astype(np.int32),
+        "s2": (f_c1 + (7 - kw2) - f_c2).astype(np.int32),
+        "act_frac": np.array([8, f_c1, f_c2], dtype=np.int32),
+    }
+
+
+# ----------------------------
+# 6) callback
+# ----------------------------
+class EpochTimer(tf.keras.callbacks.Callback):
+    """epoch당 시간 (기본 모드 vs --fast 비교용)"""
+
+    def on_train_begin(self, logs=None):
+        self.times = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.t0 = time.time()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.times.append(time.time() - self.t0)
+
+class IntExactAccuracy(tf.keras.callbacks.Callback):
+    """
+    epoch마다 정수-exact 정확도
+      - 가중치를 quantize_export 로 양자화 -> int_engine 으로 validation split 추론 (s1/s2 shift 포함)
+      - logs["val_int_accuracy"] 에 기록 -> EarlyStopping이 이 값을 봄 (callback 리스트 맨 앞에 둬야 함)
+      - export_path 가 있으면 최고 기록이 갱신될 때마다 npz 저장
+    """
+
+    def __init__(self, x_val_u8, y_val, export_path=None, verbose=1):
+        super().__init__()
+        self.x_val_u8 = x_val_u8
+        self.y_val = np.asarray(y_val, dtype=np.int32)
+        self.export_path = export_path
+        self.verbose = verbose
+        self.best = -1.0
+        self.best_epoch = 0
+        self.best_pack = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        pack = quantize_export(self.model)
+        pred = predict_batch(self.x_val_u8, pack["W1_q"], pack["W2_q"], pack["Wd_q"], pack["bd_q15"],
+                             shifts=(pack["s1"], pack["s2"]))
+        acc = float(np.mean(pred == self.y_val))
+        if logs is not None:
+            logs["val_int_accuracy"] = acc
+
+        msg = f" - val_int_accuracy: {acc:.4f}"
+        if acc > self.best:
+            self.best, self.best_epoch, self.best_pack = acc, epoch + 1, pack
+            if self.export_path:
+                np.savez(self.export_path, **pack)
+                msg += f" (best, saved {self.export_path})"
+        if self.verbose:
+            print(msg)
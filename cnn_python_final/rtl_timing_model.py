@@ -0,0 +1,302 @@
+# rtl_timing_model.py
+import argparse
+import numpy as np
+
+# =============================================================================
+# [cnn_core_top 사이클 정확(cycle-accurate) 타이밍 모델]
+#
+# 목적: Vivado 시뮬레이션 없이 레이어별 latency를 바로 확인
+#   - tb_cnn_core_top_time.v 는 (end_time - start_time) / 8ns 로 latency를 잼
+#   - 여기서는 RTL의 valid 경로(카운터/파이프라인 레지스터)만 그대로 옮겨서
+#     data_valid 패턴 하나에 대해 각 레이어 valid가 뜨는 사이클을 계산
+#   - 데이터 값은 다루지 않음 (값은 int_engine 이 담당)
+#
+# ====== 사이클 규칙 ======
+# - cycle t = posedge t 직후 ~ posedge t+1 직전 (레지스터 값이 "보이는" 구간)
+# - data_valid[t] : cycle t 동안 DUT 입력에 걸린 값 (posedge t+1에서 샘플)
+# - 모든 모듈 출력은 레지스터 -> posedge t+1에서 cycle t의 입력으로 갱신
+# - tb_cnn_core_top_time.v 기준: 첫 픽셀이 보이는 cycle = 0 이므로
+#   out_valid가 처음 보이는 cycle 번호 == TB의 "Latency (cyc)"
+#
+# ====== RTL 대응 ======
+# conv1_linebuf / conv2_linebuf : window_valid <= in_valid && row>=4 && col>=4
+# conv1_calc / conv2_calc       : valid_st1 -> st2 -> st3 -> out_valid (4단)
+# maxpool1_layer / maxpool2_layer: calc_en <= in_valid && row[0] && col[0]
+#                                 out_valid <= calc_en
+# fully_connected               : valid_st0 -> valid_st1(cnt_in_st1==15) -> out_busy
+#                                 -> 10클럭 (cls, logit, last) 스트림
+# comparator                    : out_valid <= in_valid && in_last
+# =============================================================================
+
+CLK_NS = 8  # 125 MHz
+
+
+# ----------------------------
+# 1) 레이어별 valid 모델
+#    - out : 현재 cycle에 보이는 출력 valid
+#    - clock(in_valid) : posedge 한 번 (cycle t 입력 -> cycle t+1 출력)
+# ----------------------------
+class LineBufWindow:
+    """conv1_linebuf.v / conv2_linebuf.v (IMG_WIDTH x IMG_WIDTH, K_SIZE=5)"""
+
+    def __init__(self, width: int, k: int = 5):
+        self.width = width
+        self.k = k
+        self.col = 0
+        self.row = 0
+        self.out = 0
+
+    def clock(self, in_valid: int):
+        if in_valid:
+            self.out = int(self.row >= self.k - 1 and self.col >= self.k - 1)
+            if self.col == self.width - 1:
+                self.col = 0
+                self.row = 0 if self.row == self.width - 1 else self.row + 1
+            else:
+                self.col += 1
+        else:
+            self.out = 0
+
+
+class ValidPipe:
+    """conv1_calc.v / conv2_calc.v : valid_st1 -> valid_st2 -> valid_st3 -> out_valid"""
+
+    def __init__(self, depth: int = 4):
+        self.regs = [0] * depth
+
+    @property
+    def out(self) -> int:
+        return self.regs[-1]
+
+    def clock(self, in_valid: int):
+        self.regs = [int(in_valid)] + self.regs[:-1]
+
+
+class MaxPoolStream:
+    """maxpool1_layer (IMG_WIDTH=24) / maxpool2_layer (IMG_WIDTH=8)"""
+
+    def __init__(self, width: int):
+        self.width = width
+        self.col = 0
+        self.row = 0
+        self.calc_en = 0
+        self.out = 0
+
+    def clock(self, in_valid: int):
+        # out_valid는 "이전" calc_en 으로 결정 (1클럭 지연)
+        self.out = self.calc_en
+
+        if in_valid:
+            self.calc_en = int((self.row & 1) and (self.col & 1))
+            if self.col == self.width - 1:
+                self.col = 0
+                self.row = 0 if self.row == self.width - 1 else self.row + 1
+            else:
+                self.col += 1
+        else:
+            self.calc_en = 0
+
+
+class FcStream:
+    """fc48x10_stream.v (module fully_connected) : 16 입력 클럭 -> 10 출력 클럭"""
+
+    N_IN = 16
+    N_OUT = 10
+
+    def __init__(self):
+        self.cnt_in = 0
+        self.valid_st0 = 0
+        self.cnt_in_st0 = 0
+        self.valid_st1 = 0
+        self.cnt_in_st1 = 0
+        self.out_busy = 0
+        self.cnt_out = 0
+        self.out = 0          # out_valid
+        self.out_last = 0
+        self.out_cls = 0
+
+    def clock(self, in_valid: int):
+        # 현재 레지스터 값 (nonblocking 대입이므로 전부 "이전 값" 기준으로 계산)
+        cnt_in, valid_st0, cnt_in_st0 = self.cnt_in, self.valid_st0, self.cnt_in_st0
+        valid_st1, cnt_in_st1 = self.valid_st1, self.cnt_in_st1
+        out_busy, cnt_out = self.out_busy, self.cnt_out
+
+        # [입력 파이프라인]
+        if in_valid:
+            self.valid_st0 = 1
+            self.cnt_in_st0 = cnt_in
+            self.cnt_in = 0 if cnt_in == self.N_IN - 1 else cnt_in + 1
+        else:
+            self.valid_st0 = 0
+
+        # [Stage 0 -> Stage 1]
+        self.valid_st1 = valid_st0
+        self.cnt_in_st1 = cnt_in_st0
+
+        # [출력 타이밍] 마지막 누산이 끝난 다음 클럭부터 출력
+        if valid_st1 and cnt_in_st1 == self.N_IN - 1:
+            self.out_busy = 1
+            self.cnt_out = 0
+
+        # [출력 스트림] (RTL과 같은 순서로 덮어씀)
+        if out_busy:
+            self.out = 1
+            self.out_cls = cnt_out
+            if cnt_out == self.N_OUT - 1:
+                self.out_last = 1
+                self.out_busy = 0
+                self.cnt_out = 0
+            else:
+                self.out_last = 0
+                self.cnt_out = cnt_out + 1
+        else:
+            self.out = 0
+            self.out_last = 0
+
+
+class ArgmaxStream:
+    """argmax10_stream.v (module comparator) : in_last 클럭 다음에 out_valid 펄스"""
+
+    def __init__(self):
+        self.out = 0
+
+    def clock(self, in_valid: int, in_last: int):
+        self.out = int(in_valid and in_last)
+
+
+# ----------------------------
+# 2) cnn_core_top 전체 모델
+# ----------------------------
+STAGES = ["conv1_linebuf", "conv1", "pool1", "conv2_linebuf", "conv2", "pool2", "fc", "out_valid"]
+
+class CnnCoreTimingModel:
+    def __init__(self):
+        self.lb1 = LineBufWindow(28)
+        self.calc1 = ValidPipe(4)
+        self.pool1 = MaxPoolStream(24)
+        self.lb2 = LineBufWindow(12)
+        self.calc2 = ValidPipe(4)
+        self.pool2 = MaxPoolStream(8)
+        self.fc = FcStream()
+        self.cmp = ArgmaxStream()
+        self.cycle = 0
+
+    def outputs(self) -> dict:
+        """현재 cycle에 보이는 각 단 출력 valid"""
+        return {
+            "conv1_linebuf": self.lb1.out,
+            "conv1": self.calc1.out,
+            "pool1": self.pool1.out,
+            "conv2_linebuf": self.lb2.out,
+            "conv2": self.calc2.out,
+            "pool2": self.pool2.out,
+            "fc": self.fc.out,
+            "out_valid": self.cmp.out,
+        }
+
+    def clock(self, data_valid: int):
+        o = self.outputs()
+        # 모든 단을 "현재 cycle 출력" 기준으로 동시에 갱신
+        self.lb1.clock(data_valid)
+        self.calc1.clock(o["conv1_linebuf"])
+        self.pool1.clock(o["conv1"])
+        self.lb2.clock(o["pool1"])
+        self.calc2.clock(o["conv2_linebuf"])
+        self.pool2.clock(o["conv2"])
+        self.cmp.clock(o["fc"], self.fc.out_last)
+        self.fc.clock(o["pool2"])
+        self.cycle += 1
+
+    def run(self, data_valid, drain: int = 64) -> dict:
+        """
+        data_valid: 0/1 시퀀스 (index = cycle)
+        drain     : 입력이 끝난 뒤 추가로 돌릴 cycle 수 (FC/argmax 출력까지)
+        return    : {stage: np.ndarray(valid가 1인 cycle 번호들)}
+        """
+        data_valid = np.asarray(data_valid, dtype=np.int8)
+        T = len(data_valid) + drain
+        trace = {k: np.zeros(T, dtype=np.int8) for k in ["data_valid"] + STAGES}
+
+        for t in range(T):
+            dv = int(data_valid[t]) if t < len(data_valid) else 0
+            trace["data_valid"][t] = dv
+            for k, v in self.outputs().items():
+                trace[k][t] = v
+            self.clock(dv)
+
+        return {k: np.flatnonzero(v) for k, v in trace.items()}
+
+
+# ----------------------------
+# 3) data_valid 패턴
+# ----------------------------
+def frame_pattern(n_frames: int = 1, gap: int = 0, stall_every: int = 0, stall_len: int = 1,
+                  stall_prob: float = 0.0, seed: int = 0) -> np.ndarray:
+    """
+    784픽셀 프레임 n_frames개 + 프레임 사이 gap 클럭
+    stall_every > 0 이면 유효 픽셀 stall_every개마다 data_valid=0 을 stall_len 클럭 삽입
+    stall_prob > 0 이면 픽셀 사이마다 확률 stall_prob 로 data_valid=0 1클럭 (랜덤 bubble, seed 고정)
+    """
+    rng = np.random.default_rng(seed) if stall_prob > 0 else None
+    pat = []
+    for f in range(n_frames):
+        for p in range(784):
+            pat.append(1)
+            if stall_every and (p + 1) % stall_every == 0 and p != 783:
+                pat.extend([0] * stall_len)
+            if rng is not None and p != 783 and rng.random() < stall_prob:
+                pat.append(0)
+        if f != n_frames - 1:
+            pat.extend([0] * gap)
+    return np.array(pat, dtype=np.int8)
+
+def latency_report(data_valid, drain: int = 64) -> dict:
+    """
+    return: {stage: {"count", "first", "last"}}  (cycle 번호, 첫 data_valid 기준이 아니라 절대 cycle)
+    """
+    cycles = CnnCoreTimingModel().run(data_valid, drain=drain)
+    rep = {}
+    for k, c in cycles.items():
+        rep[k] = {
+            "count": int(len(c)),
+            "first": int(c[0]) if len(c) else None,
+            "last": int(c[-1]) if len(c) else None,
+        }
+    return rep
+
+
+def main():
+    ap = argparse.ArgumentParser(description="cycle-accurate latency model of cnn_core_top")
+    ap.add_argument("--frames", type=int, default=1)
+    ap.add_argument("--gap", type=int, default=0, help="프레임 사이 data_valid=0 클럭 수")
+    ap.add_argument("--stall-every", type=int, default=0, help="유효 픽셀 N개마다 stall 삽입 (0=없음)")
+    ap.add_argument("--stall-len", type=int, default=1)
+    ap.add_argument("--clk-ns", type=float, default=CLK_NS)
+    args = ap.parse_args()
+
+    dv = frame_pattern(args.frames, args.gap, args.stall_every, args.stall_len)
+    rep = latency_report(dv)
+    t0 = rep["data_valid"]["first"]
+
+    print("================ cnn_core_top TIMING MODEL ================")
+    print(f" frames={args.frames} gap={args.gap} stall_every={args.stall_every} "
+          f"stall_len={args.stall_len} clk={args.clk_ns}ns")
+    print("-----------------------------------------------------------")
+    print(f" {'stage':<14}{'count':>7}{'first':>8}{'last':>8}{'last(ns)':>10}")
+    for k in ["data_valid"] + STAGES:
+        r = rep[k]
+        if r["count"] == 0:
+            print(f" {k:<14}{0:>7}{'-':>8}{'-':>8}{'-':>10}")
+            continue
+        print(f" {k:<14}{r['count']:>7}{r['first'] - t0:>8}{r['last'] - t0:>8}"
+              f"{(r['last'] - t0) * args.clk_ns:>10.0f}")
+    print("-----------------------------------------------------------")
+    if rep["out_valid"]["count"]:
+        lat = rep["out_valid"]["first"] - t0
+        print(f" Latency (cyc): {lat} cycles  ({lat * args.clk_ns:.0f} ns)  <- tb_cnn_core_top_time.v 와 비교")
+    else:
+        print(" [WARN] out_valid never asserted")
+    print("===========================================================")
+
+if __name__ == "__main__":
+    main()
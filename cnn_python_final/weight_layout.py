@@ -0,0 +1,164 @@
+# weight_layout.py
+import os
+import numpy as np
+
+from hex_io import HEX_CHARS
+
+# =============================================================================
+# [RTL 병렬도 기반 weight 메모리 레이아웃 + wide word 패킹]
+#
+# 02_export_hex_for_fpga.py 는 1줄 = 1 byte, conv2만 손으로 transpose(2,0,1) 했음.
+# 여기서는 "RTL이 한 사이클에 몇 개를 어떤 순서로 읽는가" 를 descriptor로 적고
+# 그대로 word 단위로 묶어서 $readmemh / Xilinx .coe / .mem 로 저장.
+#   -> BRAM 1번 읽기 = word 1개 = 병렬 MAC 입력 전체
+#
+# ====== descriptor (dict, 레이어별) ======
+#   order     : conv  "channel_first" = (Cin, Kh, Kw)  (현재 conv2_calc w_mem 순서)
+#                     "interleaved"   = (Kh, Kw, Cin)  (탭마다 입력 채널 묶음)
+#               dense "input_major"   = (48, 10)       (현재 fc48x10_stream, 입력 1개당 10출력)
+#                     "output_major"  = (10, 48)
+#   unroll    : word 1개에 들어가는 원소 수 (마지막 word가 모자라면 pad 로 채움)
+#   pad       : (선택) 모자라는 원소 값, 기본 0. pow2 code 는 0 이 weight +1 이므로
+#               "0 weight" code(= pow2_encode(0) = 7) 를 줘야 함 (02_export_weight_layout 이 자동 지정)
+#   elem_bits : 원소 폭 (i8 weight = 8, pow2 code = 4, i32 bias = 32)
+#   word_bits : (선택) word 폭. 기본 unroll*elem_bits, 더 크면 상위 비트를 0으로 채움
+#
+# ====== word 안의 원소 순서 ======
+#   원소 k = word[k*elem_bits +: elem_bits]  (원소 0 = LSB)
+#   -> Verilog: w[k] = word[8*k +: 8]  (unroll=1 이면 기존 파일과 같음)
+#
+# 사용 예:
+#   from weight_layout import LAYOUTS, layout_words, write_mem
+#   words = layout_words(W2[..., 0], "conv2", LAYOUTS["wide"]["conv2"])
+#   write_mem("conv2_weight_1", words, "coe")
+# =============================================================================
+
+CONV_ORDERS = ("channel_first", "interleaved")
+DENSE_ORDERS = ("input_major", "output_major")
+MEM_FORMATS = ("txt", "coe", "mem")
+
+# 레이어 -> descriptor. "rtl" = 현재 RTL (02_export_hex_for_fpga.py 출력과 같은 바이트)
+LAYOUTS = {
+    "rtl": {
+        "conv1": {"order": "channel_first", "unroll": 1, "elem_bits": 8},
+        "conv2": {"order": "channel_first", "unroll": 1, "elem_bits": 8},
+        "dense": {"order": "input_major", "unroll": 1, "elem_bits": 8},
+        "bias":  {"order": "input_major", "unroll": 1, "elem_bits": 32},
+    },
+    # 커널 1개(25탭) / FC 입력 1개(10출력) = 1 word
+    "wide": {
+        "conv1": {"order": "channel_first", "unroll": 25, "elem_bits": 8},
+        "conv2": {"order": "channel_first", "unroll": 25, "elem_bits": 8},
+        "dense": {"order": "input_major", "unroll": 10, "elem_bits": 8},
+        "bias":  {"order": "input_major", "unroll": 10, "elem_bits": 32},
+    },
+    # conv2 탭마다 3채널 동시, FC 위치(cnt_in)마다 3채널 x 10출력 동시 (fc48x10_stream 1 step)
+    "interleaved": {
+        "conv1": {"order": "interleaved", "unroll": 25, "elem_bits": 8},
+        "conv2": {"order": "interleaved", "unroll": 3, "elem_bits": 8},
+        "dense": {"order": "input_major", "unroll": 30, "elem_bits": 8},
+        "bias":  {"order": "input_major", "unroll": 10, "elem_bits": 32},
+    },
+}
+
+
+# ----------------------------
+# 1) descriptor
+# ----------------------------
+def word_bits(desc: dict) -> int:
+    """descriptor의 word 폭 (기본 unroll*elem_bits). HEX 자리 맞춤을 위해 4의 배수만 허용"""
+    need = desc["unroll"] * desc["elem_bits"]
+    wb = desc.get("word_bits") or need
+    if desc["elem_bits"] % 4 or wb % 4:
+        raise ValueError(f"elem_bits/word_bits must be multiples of 4: {desc}")
+    if wb < need:
+        raise ValueError(f"word_bits={wb} < unroll*elem_bits={need}")
+    return wb
+
+def order_flat(w: np.ndarray, layer: str, order: str) -> np.ndarray:
+    """
+    layer 원본 배열 -> RTL 읽기 순서로 flatten
+      conv : (Kh, Kw, Cin) 커널 1개 (출력 채널 1개)
+      dense: (In, Out) 전체 / bias: (Out,)
+    """
+    w = np.asarray(w)
+    if layer in ("conv1", "conv2"):
+        if order not in CONV_ORDERS:
+            raise ValueError(f"{layer} order must be one of {CONV_ORDERS}: {order}")
+        if w.ndim == 2:
+            w = w[:, :, None]
+        return (w.transpose(2, 0, 1) if order == "channel_first" else w).reshape(-1)
+    if order not in DENSE_ORDERS:
+        raise ValueError(f"{layer} order must be one of {DENSE_ORDERS}: {order}")
+    return (w.T if order == "output_major" and w.ndim == 2 else w).reshape(-1)
+
+
+# ----------------------------
+# 2) 패킹 / 언패킹
+# ----------------------------
+def pack_words(flat: np.ndarray, unroll: int, elem_bits: int, pad: int = 0) -> np.ndarray:
+    """(N,) -> (ceil(N/unroll), unroll) 하위 elem_bits만 남긴 uint64 (모자라는 원소는 pad)"""
+    mask = (1 << elem_bits) - 1
+    v = np.asarray(flat).reshape(-1).astype(np.int64) & mask
+    n_words = -(-len(v) // unroll)
+    out = np.full(n_words * unroll, int(pad) & mask, dtype=np.uint64)
+    out[:len(v)] = v
+    return out.reshape(n_words, unroll)
+
+def layout_words(w: np.ndarray, layer: str, desc: dict) -> np.ndarray:
+    """레이어 배열 + descriptor -> (words, unroll) 원소 배열"""
+    return pack_words(order_flat(w, layer, desc["order"]), desc["unroll"], desc["elem_bits"], desc.get("pad", 0))
+
+def words_hex(words: np.ndarray, elem_bits: int, wbits: int) -> list:
+    """(words, unroll) -> word별 HEX 문자열 (MSB 먼저, 원소 0 = LSB, 상위 패딩 0)"""
+    nd = elem_bits // 4
+    shifts = np.arange(nd - 1, -1, -1, dtype=np.uint64) * np.uint64(4)
+    # (words, unroll, nd) 니블 -> 원소 순서를 뒤집어 MSB 원소부터
+    nib = (words[:, ::-1, None] >> shifts) & np.uint64(0xF)
+    chars = HEX_CHARS[nib.astype(np.int64)].reshape(len(words), -1)
+    pad = "0" * (wbits // 4 - chars.shape[1])
+    return [pad + r.tobytes().decode() for r in chars]
+
+def unpack_hex(lines: list, unroll: int, elem_bits: int, signed: bool = True) -> np.ndarray:
+    """words_hex 역변환 (검증용). return: (words*unroll,) int64"""
+    nd = elem_bits // 4
+    out = []
+    for s in lines:
+        s = s[-unroll * nd:]
+        for k in range(unroll):
+            out.append(int(s[len(s) - (k + 1) * nd:len(s) - k * nd], 16))
+    v = np.array(out, dtype=np.int64)
+    if signed:
+        v = v - ((v >> (elem_bits - 1)) << elem_bits)
+    return v
+
+
+# ----------------------------
+# 3) 파일 포맷
+# ----------------------------
+def format_mem(lines: list, fmt: str) -> str:
+    """
+    txt : $readmemh (1줄 = 1 word)
+    coe : Xilinx Block Memory Generator 초기화 파일
+    mem : Vivado / updatemem .mem (주소 @0 부터)
+    """
+    if fmt == "txt":
+        return "".join(s + "\n" for s in lines)
+    if fmt == "coe":
+        body = ",\n".join(lines)
+        return "memory_initialization_radix=16;\nmemory_initialization_vector=\n" + body + ";\n"
+    if fmt == "mem":
+        return "@0\n" + "".join(s + "\n" for s in lines)
+    raise ValueError(f"fmt must be one of {MEM_FORMATS}: {fmt}")
+
+def write_mem(path_noext: str, words: np.ndarray, desc: dict, formats=("txt",)) -> dict:
+    """words -> 포맷별 파일 저장. return: {"depth", "width", "files"}"""
+    wb = word_bits(desc)
+    lines = words_hex(words, desc["elem_bits"], wb)
+    files = []
+    for fmt in formats:
+        path = f"{path_noext}.{fmt}"
+        with open(path, "w", newline="\n") as f:
+            f.write(format_mem(lines, fmt))
+        files.append(os.path.basename(path))
+    return {"depth": len(lines), "width": wb, "files": files}